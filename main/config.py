@@ -12,6 +12,31 @@ SOUND_DIR = os.path.join(SCRIPT_DIR, "sounds")
 for p in (LOG_DIR, REPORT_DIR, MODEL_DIR, SOUND_DIR):
     os.makedirs(p, exist_ok=True)
 
+# Trip log writer: rows are buffered and written by a background thread
+LOG_BATCH_SIZE = 64          # write once this many rows are pending...
+LOG_FLUSH_INTERVAL_S = 2.0   # ...or after this many seconds
+TRIP_LOG_BINARY = True       # also write a compact .tlb sidecar (utils/binlog.py) next to each CSV
+LOG_INDEX_MIN_BYTES = 1 << 20  # persist row-offset indexes (.rows.idx, utils/log_reader.py) for logs this large
+
+# Trip reports: "embed" copies the event log into the report, "reference" only names the log file
+REPORT_LOG_MODE = "embed"
+REPORT_CHUNK_BYTES = 1 << 20     # report generation streams the log this much at a time
+REPORT_MAX_SAMPLE_GAP_S = 5.0    # state samples further apart than this (e.g. paused) don't count as time in a state
+REPORT_PREVIEW_CHUNK_BYTES = 64 << 10   # Reports tab preview is streamed into the viewer this much per Tk turn...
+REPORT_PREVIEW_MAX_BYTES = 4 << 20      # ...up to this much; Export gives the full file
+
+# SQLite catalog of trips (utils/trip_index.py), updated as logs/reports are written
+TRIP_INDEX_ENABLED = True
+TRIP_INDEX_DB = os.path.join(SCRIPT_DIR, "trip_index.sqlite3")
+
+# Analytics: parsed logs are cached in memory (LRU) and as .states.npz next to CSV-only logs
+ANALYTICS_CACHE_ENTRIES = 256
+ANALYTICS_NPZ_CACHE = True
+ANALYTICS_LIVE_INTERVAL_MS = 3000   # "Live" mode re-check period (only appended rows are parsed)
+INGEST_WORKERS = 0                  # analytics parse processes (0 = one per CPU core)
+INGEST_PARALLEL_MIN_FILES = 4       # fewer uncached logs than this are parsed on the loader thread
+ANALYTICS_MARKER_MAX_POINTS = 300   # draw point markers only when a series shows this few points
+
 # Appearance
 # Appearance mode can be "System", "Dark", or "Light"
 APPEARANCE_MODE = "System"
@@ -52,3 +77,47 @@ WHATSAPP_ACTIVE_WINDOW_MIN = 15       # minutes to consider "active" after a sen
 
 # Optional: Tasker webhook for accurate live location
 TASKER_WEBHOOK_URL = "https://tasker.joaoapps.com/api/26/webhook/<YOUR_TASKER_KEY>/trigger/drowsy_alert"
+
+# --- Camera capture ---
+# Number of preallocated frame slots in the capture ring buffer (newest frame wins)
+CAPTURE_RING_SLOTS = 3
+# How often the UI loop polls the capture buffer for a new frame (ms)
+FRAME_POLL_MS = 10
+# Upper bound on video repaint rate, independent of capture and inference (0 = every frame)
+DISPLAY_MAX_FPS = 30
+# Per-frame render budget for the video label; slower frames are counted in the display stats
+DISPLAY_RENDER_TARGET_MS = 2.0
+
+# --- Inference scheduling ---
+# Run the model every N frames, N adapting to the measured inference cost;
+# drops to every frame while a drowsy streak / yawn is in progress.
+SCHED_ENABLED = True
+SCHED_MAX_SKIP = 4          # never skip more than N-1 frames in a row
+SCHED_CPU_BUDGET = 0.5      # fraction of wall time inference may occupy
+
+# --- Inference backend ---
+# "auto" picks the first available of: OpenVINO IR, ONNX, ultralytics .pt
+# or force one of "openvino", "onnx", "ultralytics"
+INFERENCE_BACKEND = "auto"
+MODEL_PT_FILE = "final_model.pt"
+MODEL_ONNX_FILE = "final_model.onnx"
+MODEL_OPENVINO_DIR = "final_model_openvino_model"   # folder produced by `yolo export format=openvino`
+MODEL_CLASS_NAMES = ["attentive", "yawn", "drowsy"]  # fallback when the export carries no metadata
+# model input size (square, multiple of 32); 320/416 are much cheaper on CPU.
+# Independent of the UI zoom. Exported models with a static input use their own size.
+INFERENCE_IMGSZ = 640
+# False = stretch the capture straight to INFERENCE_IMGSZ (no letterbox pass)
+INFERENCE_LETTERBOX = False
+NMS_IOU = 0.45
+ONNX_INTRA_OP_THREADS = 0   # 0 = let onnxruntime decide
+
+# Face ROI tracking: full-frame detection every N results, padded face crops in between
+ROI_TRACKING = False
+ROI_FULL_EVERY_N = 15
+ROI_PAD = 0.35          # crop padding per side, as a fraction of the face box size
+ROI_MIN_IMGSZ = 128     # smallest crop input size (px)
+
+# INT8 artifacts produced by quantize_model.py; used instead of fp32 when present
+PREFER_QUANTIZED_MODEL = True
+MODEL_INT8_ONNX_FILE = "final_model_int8.onnx"
+MODEL_OPENVINO_INT8_DIR = "final_model_int8_openvino_model"
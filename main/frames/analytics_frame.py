@@ -1,153 +1,219 @@
 # frames/analytics_frame.py
 import os
-import math
-import pandas as pd
-import datetime as dt
+import numpy as np
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from typing import List, Tuple, Dict, Optional
-
-from utils.file_utils import list_log_files
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import matplotlib.dates as mdates
+from typing import Tuple, Dict
+
+from utils.trip_index import indexed_log_files, fresh_minute_rollups
+from utils.log_parse import EMPTY_EVENTS, parse_csv_text
+from utils.log_cache import ParsedLogCache, file_key
+from utils.ingest import IngestJob
+from utils.log_reader import parse_time_range
 import config
 
-# --- Helper: infer state from a row dictionary / series ---
-def infer_state_from_row(row: pd.Series) -> Optional[str]:
+# --- Helper: aggregate events into time buckets (bucket_seconds granularity) ---
+STATE_SERIES = ("Attentive", "Yawn", "Drowsy")   # codes 1, 2, 3
+
+
+def bucket_state_counts(ts_ns: np.ndarray, codes: np.ndarray, bucket_seconds: int = 60) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
     """
-    Try to infer one of 'Attentive', 'Yawn', 'Drowsy' from a row.
-    Look at several possible fields and match substrings.
-    Returns the canonical label or None if unknown.
+    Aggregate events (ts_ns int64, codes uint8) into buckets of bucket_seconds
+    aligned to multiples of the bucket width.
+    Returns (bins, counts): bucket starts as datetime64[ns] and int64 count
+    arrays keyed 'Attentive','Yawn','Drowsy', ready for ax.plot.
+
+    Only occupied buckets and their immediate neighbours are returned, so
+    gaps still plot as drops to zero without materializing every empty
+    bucket of a long, sparse range.
     """
-    candidates = []
-    # prefer explicit state-like columns
-    for col in ("state", "State", "status", "Status", "EventType", "Event", "Type", "Details"):
-        if col in row and pd.notna(row[col]):
-            candidates.append(str(row[col]))
-
-    text = " ".join(candidates).lower()
-
-    # mapping rules
-    if "drows" in text or "sleep" in text or "doze" in text or "microsleep" in text:
-        return "Drowsy"
-    if "yawn" in text or "yawning" in text:
-        return "Yawn"
-    if "attent" in text or "focused" in text:
-        return "Attentive"
-    if "awake" in text:
-        return "Attentive"
-
-    if "attentive" in text:
-        return "Attentive"
-    return None
-
-# --- Helper: read CSV and return list of (timestamp, state) tuples ---
-def extract_state_events_from_csv(path: str, timestamp_cols: List[str] = None) -> List[Tuple[dt.datetime, str]]:
-    if timestamp_cols is None:
-        timestamp_cols = ["Timestamp", "timestamp", "Time", "time", "ts", "datetime", "DateTime", "Date"]
-
-    events = []
-    try:
-        df = pd.read_csv(path, dtype=str, low_memory=False)
-    except Exception:
-        return events
-
-    # find timestamp column
-    time_col = None
-    for c in timestamp_cols:
-        if c in df.columns:
-            time_col = c
-            break
-    if time_col is None:
-        for c in df.columns:
-            if any(k in c.lower() for k in ("time", "timestamp", "date")):
-                time_col = c
-                break
-
-    for _, row in df.iterrows():
-        ts = None
-        if time_col and row.get(time_col) and not pd.isna(row.get(time_col)):
-            raw = str(row.get(time_col))
-            parse_success = False
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d_%H-%M-%S", "%d-%m-%Y %H:%M:%S",
-                        "%m/%d/%Y %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%d/%m/%Y %H:%M:%S"):
-                try:
-                    ts = dt.datetime.strptime(raw, fmt)
-                    parse_success = True
-                    break
-                except Exception:
-                    pass
-            if not parse_success:
-                try:
-                    ts = pd.to_datetime(raw, errors="coerce")
-                    if isinstance(ts, pd.Timestamp) and pd.isna(ts):
-                        ts = None
-                except Exception:
-                    ts = None
-        else:
-            ts = None
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    codes = np.asarray(codes, dtype=np.uint8)
+    valid = (codes >= 1) & (codes <= len(STATE_SERIES))
+    ts_ns, codes = ts_ns[valid], codes[valid]
+    if ts_ns.size == 0:
+        return np.zeros(0, dtype="datetime64[ns]"), {lab: np.zeros(0, dtype=np.int64) for lab in STATE_SERIES}
 
-        state = infer_state_from_row(row)
-        if state and ts:
-            try:
-                if isinstance(ts, pd.Timestamp):
-                    events.append((ts.to_pydatetime(), state))
-                elif isinstance(ts, dt.datetime):
-                    events.append((ts, state))
-                else:
-                    events.append((pd.to_datetime(ts).to_pydatetime(), state))
-            except Exception:
-                continue
+    width = max(1, int(bucket_seconds)) * 1_000_000_000
+    start = (int(ts_ns.min()) // width) * width
+    idx = (ts_ns - start) // width
+    keys, pos = _bucket_keys(idx)
 
-    return events
+    nstates = len(STATE_SERIES) + 1
+    table = np.bincount(pos * nstates + codes, minlength=keys.size * nstates).reshape(keys.size, nstates)
 
-# --- Helper: aggregate events into time buckets (bucket_seconds granularity) ---
-def bucket_state_counts(events: List[Tuple[dt.datetime, str]], bucket_seconds: int = 60) -> Tuple[List[dt.datetime], Dict[str, List[int]]]:
+    bins = (start + keys * width).astype("datetime64[ns]")
+    counts = {lab: table[:, i + 1].astype(np.int64) for i, lab in enumerate(STATE_SERIES)}
+    return bins, counts
+
+
+def _bucket_keys(idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Occupied bucket indices plus their neighbours (sorted), and each idx's position in them."""
+    occupied = np.unique(idx)
+    keys = np.unique(np.concatenate((occupied, occupied - 1, occupied + 1)))
+    keys = keys[(keys >= 0) & (keys <= int(occupied[-1]))]
+    return keys, np.searchsorted(keys, idx)
+
+
+def bucket_minute_counts(minutes: np.ndarray, table: np.ndarray, bucket_seconds: int = 60) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Same as bucket_state_counts for per-minute rollups from the trip index:
+    minutes (wall minutes since the epoch) and their (n, 3) Attentive/Yawn/
+    Drowsy counts, summed into buckets of bucket_seconds (a multiple of 60).
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    table = np.asarray(table, dtype=np.int64).reshape(-1, len(STATE_SERIES))
+    if minutes.size == 0:
+        return np.zeros(0, dtype="datetime64[ns]"), {lab: np.zeros(0, dtype=np.int64) for lab in STATE_SERIES}
+
+    width = max(1, int(bucket_seconds) // 60)
+    start = (int(minutes.min()) // width) * width
+    keys, pos = _bucket_keys((minutes - start) // width)
+    sums = np.zeros((keys.size, len(STATE_SERIES)), dtype=np.int64)
+    np.add.at(sums, pos, table)
+
+    bins = ((start + keys * width) * 60_000_000_000).astype("datetime64[ns]")
+    counts = {lab: sums[:, i] for i, lab in enumerate(STATE_SERIES)}
+    return bins, counts
+
+
+class BucketCounts:
     """
-    Aggregate events into contiguous buckets of bucket_seconds.
-    Returns list of bucket start datetimes and counts dict with keys 'Attentive','Yawn','Drowsy'.
+    Attentive/Yawn/Drowsy counts per occupied bucket of bucket_seconds
+    (keys = ts_ns // width), grown in place as time-ordered rows are added,
+    so a growing log costs only its new rows.
     """
-    if not events:
-        return [], {"Attentive": [], "Yawn": [], "Drowsy": []}
-
-    # sort
-    events = sorted(events, key=lambda x: x[0])
-
-    # Align start to bucket boundary (floor)
-    epoch = events[0][0]
-    start = epoch - dt.timedelta(seconds=(epoch.second % bucket_seconds), microseconds=epoch.microsecond)
-    end = events[-1][0]
-    # ensure last bucket includes last event
-    total_seconds = int(math.ceil((end - start).total_seconds())) + 1
-    bucket_count = int(math.ceil(total_seconds / float(bucket_seconds)))
-
-    bins = [start + dt.timedelta(seconds=bucket_seconds * i) for i in range(bucket_count + 1)]
-    labels = ["Attentive", "Yawn", "Drowsy"]
-    counts = {lab: [0] * (len(bins) - 1) for lab in labels}
-
-    for ts, state in events:
-        if ts < bins[0]:
-            continue
-        i = int((ts - bins[0]).total_seconds() // bucket_seconds)
-        if i < 0 or i >= (len(bins) - 1):
-            continue
-        st_norm = state
-        if isinstance(st_norm, str) and st_norm.lower() == "awake":
-            st_norm = "Attentive"
-        # normalize some possible variants
-        if isinstance(st_norm, str):
-            if st_norm.lower() in ("attentive", "active", "awake"):
-                st_norm = "Attentive"
-            elif "yawn" in st_norm.lower():
-                st_norm = "Yawn"
-            elif "drows" in st_norm.lower() or "sleep" in st_norm.lower():
-                st_norm = "Drowsy"
-        if st_norm not in counts:
-            continue
-        counts[st_norm][i] += 1
-
-    return bins[:-1], counts
+
+    def __init__(self, bucket_seconds: int):
+        self.width = max(1, int(bucket_seconds)) * 1_000_000_000
+        self.size = 0
+        self._keys = np.zeros(64, dtype=np.int64)
+        self._table = np.zeros((64, len(STATE_SERIES)), dtype=np.int64)
+
+    @property
+    def keys(self) -> np.ndarray:
+        return self._keys[:self.size]
+
+    @property
+    def table(self) -> np.ndarray:
+        return self._table[:self.size]
+
+    def accepts(self, ts_ns: np.ndarray) -> bool:
+        """True when rows at ts_ns (sorted) fall in or after the last counted bucket."""
+        return self.size == 0 or ts_ns.size == 0 or int(ts_ns[0]) // self.width >= int(self._keys[self.size - 1])
+
+    def _append(self, keys: np.ndarray, table: np.ndarray):
+        end = self.size + keys.size
+        if end > self._keys.size:
+            cap = max(end, 2 * self._keys.size)
+            grown_keys = np.zeros(cap, dtype=np.int64)
+            grown_table = np.zeros((cap, len(STATE_SERIES)), dtype=np.int64)
+            grown_keys[:self.size], grown_table[:self.size] = self.keys, self.table
+            self._keys, self._table = grown_keys, grown_table
+        self._keys[self.size:end], self._table[self.size:end] = keys, table
+        self.size = end
+
+    def add(self, ts_ns: np.ndarray, codes: np.ndarray):
+        """Count rows sorted by time, none before the last counted bucket (see accepts)."""
+        valid = (codes >= 1) & (codes <= len(STATE_SERIES))
+        ts_ns, codes = ts_ns[valid], codes[valid]
+        if ts_ns.size == 0:
+            return
+        idx = ts_ns // self.width
+        step = np.r_[False, idx[1:] != idx[:-1]]
+        keys = idx[np.r_[True, step[1:]]]
+        pos = np.cumsum(step)
+        nstates = len(STATE_SERIES)
+        table = np.bincount(pos * nstates + (codes.astype(np.int64) - 1),
+                            minlength=keys.size * nstates).reshape(keys.size, nstates)
+        if self.size and keys[0] == self._keys[self.size - 1]:
+            self._table[self.size - 1] += table[0]
+            keys, table = keys[1:], table[1:]
+        self._append(keys, table)
+
+    @classmethod
+    def combine(cls, bucket_seconds: int, parts) -> "BucketCounts":
+        """Sum of several BucketCounts of the same width (e.g. one per log)."""
+        out = cls(bucket_seconds)
+        parts = [p for p in parts if p.size]
+        if not parts:
+            return out
+        keys = np.concatenate([p.keys for p in parts])
+        table = np.concatenate([p.table for p in parts])
+        if len(parts) > 1:
+            keys, inv = np.unique(keys, return_inverse=True)
+            summed = np.zeros((keys.size, len(STATE_SERIES)), dtype=np.int64)
+            np.add.at(summed, inv, table)
+            table = summed
+        out._append(keys, table)
+        return out
+
+    def series(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """(bins, counts) as bucket_state_counts returns them for the same rows."""
+        if self.size == 0:
+            return np.zeros(0, dtype="datetime64[ns]"), {lab: np.zeros(0, dtype=np.int64) for lab in STATE_SERIES}
+        start = int(self._keys[0])
+        keys, pos = _bucket_keys(self.keys - start)
+        table = np.zeros((keys.size, len(STATE_SERIES)), dtype=np.int64)
+        table[pos] = self.table
+        bins = ((start + keys) * self.width).astype("datetime64[ns]")
+        return bins, {lab: table[:, i] for i, lab in enumerate(STATE_SERIES)}
+
+
+class _LogRun:
+    """One loaded log: its latest arrays and its bucket counts per width, kept current with its tail."""
+
+    def __init__(self, generation, ts_ns: np.ndarray, codes: np.ndarray):
+        self.generation = generation
+        self.ts_ns, self.codes = ts_ns, codes
+        self.buckets = {}   # bucket_seconds -> BucketCounts
+
+    def counts(self, bucket_seconds: int) -> BucketCounts:
+        b = self.buckets.get(bucket_seconds)
+        if b is None:
+            b = self.buckets[bucket_seconds] = BucketCounts(bucket_seconds)
+            b.add(self.ts_ns, self.codes)
+        return b
+
+    def extend(self, ts_ns: np.ndarray, codes: np.ndarray):
+        """Newer arrays of the same reader generation (an append); returns the new rows."""
+        n = self.ts_ns.size
+        tail = ts_ns[n:], codes[n:]
+        for b in self.buckets.values():
+            b.add(*tail)
+        self.ts_ns, self.codes = ts_ns, codes
+        return tail
+
+# --- Helper: level-of-detail downsampling for plotting ---
+def downsample_minmax(x: np.ndarray, y: np.ndarray, lo: float, hi: float, width_px: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Min/max-per-pixel envelope of a series (x sorted) over the view [lo, hi]:
+    each horizontal pixel column keeps only its lowest and highest point, so
+    at most ~2 points per pixel are drawn and spikes are never lost.
+    One point beyond each edge is kept so lines run to the border.
+    """
+    n = x.size
+    if n == 0:
+        return x, y
+    i0 = max(0, int(np.searchsorted(x, lo, side="left")) - 1)
+    i1 = min(n, int(np.searchsorted(x, hi, side="right")) + 1)
+    xs, ys = x[i0:i1], y[i0:i1]
+    width_px = max(1, int(width_px))
+    if xs.size <= 2 * width_px:
+        return xs, ys
+    span = (hi - lo) or 1.0
+    px = np.clip(np.floor((xs - lo) / span * width_px), -1, width_px).astype(np.int64)
+    # x is sorted, so pixel columns are contiguous; sort by (pixel, y) -> first = min, last = max
+    order = np.lexsort((ys, px))
+    spx = px[order]
+    starts = np.flatnonzero(np.r_[True, spx[1:] != spx[:-1]])
+    ends = np.r_[starts[1:], order.size] - 1
+    keep = np.unique(np.concatenate((order[starts], order[ends], [0, xs.size - 1])))
+    return xs[keep], ys[keep]
 
 # --- Analytics Frame ---
 class AnalyticsFrame(ctk.CTkFrame):
@@ -161,6 +227,25 @@ class AnalyticsFrame(ctk.CTkFrame):
         # default bucket seconds -> 1 second for per-second demos
         self.bucket_seconds = 1
 
+        # parsed arrays per log (memory LRU + .npz sidecars) and the loaded selection
+        self._cache = ParsedLogCache(parse_csv_text)
+        self._data = (EMPTY_EVENTS[0], EMPTY_EVENTS[1], 0)
+        self._source = "window"     # what _aggregate buckets: "window" (_data), "logs" (_runs) or "minutes"
+        self._runs = {}             # path -> _LogRun for whole logs
+        self._totals = {}           # bucket_seconds -> BucketCounts summed over _runs
+        self._minutes = None        # (minutes, counts) from the trip index instead of parsed arrays
+        self._bucketed = None
+        self._loaded_sig = None
+        self._live_job = None
+        self._ingest = None
+        self._ingest_nfiles = 0
+        self._ingest_live = False
+        self._time_range = None     # (start, end) window read via utils/log_reader.py, None = whole logs
+
+        # plotted series at full resolution (x as matplotlib date numbers)
+        self._series = {}
+        self._lod_job = None
+
         top = ctk.CTkFrame(self)
         top.pack(fill="x", padx=8, pady=(8,6))
         ctk.CTkLabel(top, text="Analytics", font=ctk.CTkFont(size=14, weight="bold")).pack(side="left")
@@ -172,7 +257,7 @@ class AnalyticsFrame(ctk.CTkFrame):
         self.file_var = ctk.StringVar(value="All Files")
         files = []
         try:
-            files = list_log_files(self.log_dir) or []
+            files = indexed_log_files(self.log_dir) or []
         except Exception:
             # fallback: list files in dir
             try:
@@ -198,9 +283,14 @@ class AnalyticsFrame(ctk.CTkFrame):
         self.chk_drowsy = ctk.CTkCheckBox(controls, text="Drowsy", variable=self.show_drowsy_var, command=self.on_toggle_series)
         self.chk_drowsy.pack(side="left", padx=(6,4))
 
-        self.refresh_btn = ctk.CTkButton(controls, text="Refresh", width=90, command=self.refresh)
+        self.refresh_btn = ctk.CTkButton(controls, text="Refresh", width=90, command=lambda: self.refresh(force_sync=True))
         self.refresh_btn.pack(side="left", padx=(6,4))
 
+        # live mode: re-check the logs every few seconds; only appended rows are parsed
+        self.live_var = tk.IntVar(value=0)
+        self.chk_live = ctk.CTkCheckBox(controls, text="Live", variable=self.live_var, command=self.on_toggle_live)
+        self.chk_live.pack(side="left", padx=(6,4))
+
         # bucket selector: entries may be seconds (e.g., "1S") or minutes (plain "1" or "5")
         bucket_values = ["1S", "5S", "10S", "30S", "1", "2", "5", "10", "30", "60"]
         self.bucket_combo = ctk.CTkComboBox(controls, values=bucket_values, width=90, command=self.on_bucket_change)
@@ -208,6 +298,11 @@ class AnalyticsFrame(ctk.CTkFrame):
         self.bucket_combo.pack(side="left", padx=(6,4))
         ctk.CTkLabel(controls, text="bucket").pack(side="left", padx=(4,0))
 
+        # time window ("14:02-14:07"): only those rows of each log are read
+        self.range_entry = ctk.CTkEntry(controls, width=130, placeholder_text="Time: 14:02-14:07")
+        self.range_entry.pack(side="left", padx=(10,4))
+        self.range_entry.bind("<Return>", lambda e: self.on_range_change())
+
         # figure area
         self.fig = Figure(figsize=(8,3), dpi=100)
         self.ax = self.fig.add_subplot(111)
@@ -219,6 +314,7 @@ class AnalyticsFrame(ctk.CTkFrame):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill="both", expand=True, padx=8, pady=8)
+        self._build_plot()
 
         # footer
         footer = ctk.CTkFrame(self, height=28)
@@ -226,6 +322,14 @@ class AnalyticsFrame(ctk.CTkFrame):
         self.status_lbl = ctk.CTkLabel(footer, text="Ready")
         self.status_lbl.pack(side="left", padx=6)
 
+        # zoom / pan; the visible range is re-downsampled on every view change
+        try:
+            self.toolbar = NavigationToolbar2Tk(self.canvas, footer, pack_toolbar=False)
+            self.toolbar.update()
+            self.toolbar.pack(side="right")
+        except Exception:
+            self.toolbar = None
+
         # initial draw
         self.refresh()
 
@@ -244,11 +348,25 @@ class AnalyticsFrame(ctk.CTkFrame):
                 m = int(str(val).strip())
                 if m <= 0: m = 1
                 self.bucket_seconds = m * 60
-            self.refresh()
+            if self._source == "minutes" and not self._minute_view():
+                # per-minute rollups can't be split into seconds: load the parsed logs
+                self._loaded_sig = None
+                self.refresh()
+                return
+            self.redraw()
         except Exception:
             # ignore invalid and keep previous
             pass
 
+    def on_range_change(self):
+        text = self.range_entry.get().strip()
+        rng = parse_time_range(text) if text else None
+        if text and rng is None:
+            messagebox.showwarning("Time range", f"Could not read a time range from '{text}'.\nUse e.g. 14:02-14:07.")
+            return
+        self._time_range = rng
+        self.refresh()
+
     def on_file_change(self, val):
         try:
             self.refresh()
@@ -256,22 +374,61 @@ class AnalyticsFrame(ctk.CTkFrame):
             pass
 
     def on_toggle_series(self):
-        self.refresh()
+        # series visibility only: no re-plot, just a blit of the visible lines
+        self._apply_visibility()
+        self._blit()
+
+    def on_toggle_live(self):
+        if self.live_var.get():
+            self._schedule_live()
+        elif self._live_job is not None:
+            try:
+                self.after_cancel(self._live_job)
+            except Exception:
+                pass
+            self._live_job = None
 
-    def refresh(self):
-        # clear axes
-        self.ax.clear()
-        self.ax.set_title("Driver State Analytics")
-        self.ax.set_xlabel("Time")
-        self.ax.set_ylabel("Count")
+    def _schedule_live(self):
+        if self._live_job is None:
+            self._live_job = self.after(int(getattr(config, "ANALYTICS_LIVE_INTERVAL_MS", 3000)), self._live_tick)
 
+    def _live_tick(self):
+        self._live_job = None
+        try:
+            if not self.live_var.get() or not self.winfo_exists():
+                return
+        except Exception:
+            return
+        try:
+            self.refresh(live=True)
+        except Exception:
+            pass
+        self._schedule_live()
+
+    def _minute_view(self) -> bool:
+        """Whole logs in buckets of whole minutes: the trip index rollups can serve them."""
+        return self._time_range is None and self.bucket_seconds % 60 == 0
+
+    def refresh(self, force_sync=False, live=False):
+        """
+        Load the selected logs and redraw.
+        Minute-or-wider buckets are summed from the trip index's per-minute
+        rollups when it is up to date with the logs. Otherwise the logs are
+        loaded (through the parsed-log cache) by a background IngestJob
+        (process pool for logs that need a full parse); the chart updates
+        when it completes.
+        With live=True nothing is re-plotted unless a log changed on disk,
+        and then only the rows appended to it are bucketed (see _absorb).
+        """
+        if live and self._ingest is not None:
+            return
         # determine which files to use based on selector
         selected = self.file_var.get() if hasattr(self, "file_var") else "All Files"
 
-        # gather available files using list_log_files
+        # available files come from the trip index (utils/trip_index.py)
         available = []
         try:
-            available = list_log_files(self.log_dir) or []
+            available = indexed_log_files(self.log_dir, force=force_sync) or []
         except Exception:
             try:
                 available = [f for f in os.listdir(self.log_dir) if f.lower().endswith(".csv")]
@@ -294,75 +451,289 @@ class AnalyticsFrame(ctk.CTkFrame):
                 else:
                     files = available
 
-        all_events: List[Tuple[dt.datetime, str]] = []
-        for f in files:
-            # if list_log_files returns full paths, accept them; else join with log_dir
-            path = f if os.path.isabs(f) else os.path.join(self.log_dir, f)
-            if not os.path.exists(path):
-                continue
+        # if the listing returns full paths, accept them; else join with log_dir
+        paths = [f if os.path.isabs(f) else os.path.join(self.log_dir, f) for f in files]
+        paths = [p for p in paths if os.path.exists(p)]
+        sig = (self._time_range,) + tuple(file_key(p) for p in paths)
+        if live and sig == self._loaded_sig:
+            return
+        self._loaded_sig = sig
+
+        if self._ingest is not None:
+            self._ingest.cancel()
+            self._ingest = None
+        if self._minute_view():
+            rows = fresh_minute_rollups(self.log_dir, [os.path.basename(p) for p in paths])
+            if rows is not None:
+                minutes = np.fromiter((r["minute"] for r in rows), dtype=np.int64, count=len(rows))
+                table = np.array([(r["attentive"], r["yawn"], r["drowsy"]) for r in rows], dtype=np.int64)
+                self._data = (EMPTY_EVENTS[0], EMPTY_EVENTS[1], len(files))
+                self._minutes = (minutes, table)
+                self._source = "minutes"
+                self._bucketed = None
+                self.redraw(live=live)
+                return
+        self._ingest = IngestJob(paths, self._cache, time_range=self._time_range,
+                                 per_log=self._time_range is None).start()
+        self._ingest_nfiles = len(files)
+        self._ingest_live = live
+        self.after(50, self._poll_ingest, self._ingest)
+
+    def _poll_ingest(self, job):
+        if job is not self._ingest:
+            return  # superseded by a newer refresh
+        if not job.done:
+            done, total = job.progress()
             try:
-                evs = extract_state_events_from_csv(path)
-                all_events.extend(evs)
+                self.status_lbl.configure(text=f"Loading logs... {done}/{total}")
             except Exception:
-                continue
+                return
+            self.after(100, self._poll_ingest, job)
+            return
+        self._ingest = None
+        if job.per_log:
+            self._absorb(job.result or [])
+            self._data = (EMPTY_EVENTS[0], EMPTY_EVENTS[1], self._ingest_nfiles)
+            self._source = "logs"
+        else:
+            all_ts, all_codes = job.result if job.result is not None else EMPTY_EVENTS
+            self._data = (all_ts, all_codes, self._ingest_nfiles)
+            self._source = "window"
+        self._minutes = None
+        self._bucketed = None
+        self.redraw(live=self._ingest_live)
+
+    def _absorb(self, runs):
+        """
+        Take per-log snapshots (path, generation, ts_ns, codes) from an IngestJob.
+        A log of the same reader generation only appended rows: those are
+        added to its bucket counts and to the totals. Anything else (new or
+        dropped logs, a rewritten log) rebuilds the totals on next use.
+        """
+        current, tails = {}, []
+        rebuild = {r[0] for r in runs} != set(self._runs)
+        for path, generation, ts_ns, codes in runs:
+            run = self._runs.get(path)
+            if run is not None and run.generation == generation and ts_ns.size >= run.ts_ns.size:
+                tail = run.extend(ts_ns, codes)
+                if tail[0].size:
+                    tails.append(tail)
+            else:
+                run = _LogRun(generation, ts_ns, codes)
+                rebuild = True
+            current[path] = run
+        self._runs = current
+        if rebuild:
+            self._totals = {}
+            return
+        tails.sort(key=lambda t: int(t[0][0]))
+        for width, total in list(self._totals.items()):
+            for ts_ns, codes in tails:
+                if not total.accepts(ts_ns):
+                    # appended rows fall before another log's latest bucket
+                    del self._totals[width]
+                    break
+                total.add(ts_ns, codes)
+
+    def _loaded_rows(self) -> int:
+        if self._source == "minutes":
+            return self._minutes[0].size
+        if self._source == "logs":
+            return sum(run.ts_ns.size for run in self._runs.values())
+        return self._data[0].size
+
+    def _aggregate(self):
+        """Bucketed counts for the loaded data, memoized per bucket width."""
+        if self._bucketed is None or self._bucketed[0] != self.bucket_seconds:
+            if self._source == "minutes":
+                bins, counts = bucket_minute_counts(*self._minutes, bucket_seconds=self.bucket_seconds)
+            elif self._source == "logs":
+                total = self._totals.get(self.bucket_seconds)
+                if total is None:
+                    total = BucketCounts.combine(self.bucket_seconds,
+                                                 [run.counts(self.bucket_seconds) for run in self._runs.values()])
+                    self._totals[self.bucket_seconds] = total
+                bins, counts = total.series()
+            else:
+                all_ts, all_codes, _ = self._data
+                bins, counts = bucket_state_counts(all_ts, all_codes, bucket_seconds=self.bucket_seconds)
+            self._bucketed = (self.bucket_seconds, bins, counts)
+        return self._bucketed[1], self._bucketed[2]
 
-        if not all_events:
-            self.ax.text(0.5, 0.5, "No state events found in logs.\nEnsure CSVs have a Timestamp column and state/event info.",
-                         ha="center", va="center", transform=self.ax.transAxes)
-            self.canvas.draw()
-            self.status_lbl.configure(text="No data found")
+    # ---------- plotting ----------
+    SERIES = (("Attentive", "Active"), ("Yawn", "Yawn"), ("Drowsy", "Drowsy"))
+
+    def _build_plot(self):
+        """
+        Create the persistent artists once: one animated Line2D per series,
+        the legend, grid and a message text. Updates only call set_data /
+        set_visible; a full canvas draw happens only when the axes limits or
+        tick format change, everything else is blitted over the cached
+        background (see _on_draw / _blit).
+        """
+        self.ax.grid(True, linestyle='--', alpha=0.4)
+        self.ax.xaxis_date()
+        self._lines = {}
+        for key, label in self.SERIES:
+            line, = self.ax.plot([], [], label=label, linewidth=2, animated=True)
+            self._lines[key] = line
+        self.ax.legend(loc="upper left")
+        self._msg = self.ax.text(0.5, 0.5, "", ha="center", va="center", transform=self.ax.transAxes,
+                                 animated=True, visible=False)
+        self._fmt_seconds = None
+        self._bg = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def _on_draw(self, event):
+        if event.canvas.is_saving():
+            # savefig (toolbar Save) skips animated artists too: draw them into the export,
+            # on the saving renderer, and leave the screen background alone
+            self._draw_animated(event.renderer)
             return
+        # full draws (ours, resize, toolbar zoom/pan) skip animated artists: cache and overlay them
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self, renderer=None):
+        artists = [line for line in self._lines.values() if line.get_visible()]
+        if self._msg.get_visible():
+            artists.append(self._msg)
+        for artist in artists:
+            if renderer is None:
+                self.ax.draw_artist(artist)
+            else:
+                artist.draw(renderer)
 
-        bins, counts = bucket_state_counts(all_events, bucket_seconds=self.bucket_seconds)
-        x = bins
+    def _blit(self):
+        if self._bg is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
 
-        # Ensure we have the keys and default zero series
-        if "Attentive" not in counts:
-            counts["Attentive"] = [0] * len(x)
-        if "Yawn" not in counts:
-            counts["Yawn"] = [0] * len(x)
-        if "Drowsy" not in counts:
-            counts["Drowsy"] = [0] * len(x)
+    def _show_message(self, text):
+        self._msg.set_text(text)
+        self._msg.set_visible(bool(text))
 
-        # Plot based on checkboxes
-        plotted = 0
+    def _apply_visibility(self):
+        """Checkbox state -> line visibility (and the 'no series' message)."""
         try:
-            if self.show_attentive_var.get():
-                self.ax.plot(x, counts["Attentive"], label="Active", linewidth=2, marker='o')
-                plotted += 1
-            if self.show_yawn_var.get():
-                self.ax.plot(x, counts["Yawn"], label="Yawn", linewidth=2, marker='o')
-                plotted += 1
-            if self.show_drowsy_var.get():
-                self.ax.plot(x, counts["Drowsy"], label="Drowsy", linewidth=2, marker='o')
-                plotted += 1
+            flags = {"Attentive": self.show_attentive_var.get(), "Yawn": self.show_yawn_var.get(),
+                     "Drowsy": self.show_drowsy_var.get()}
         except Exception:
-            # fallback: plot any available series
-            for k, series in counts.items():
-                self.ax.plot(x, series, label=k, linewidth=2, marker='o')
-
-        if plotted == 0:
-            # nothing selected — show a helpful message
-            self.ax.text(0.5, 0.5, "No series selected.\nUse checkboxes to choose series to display.",
-                         ha="center", va="center", transform=self.ax.transAxes)
+            flags = {k: True for k in self._lines}
+        for key, line in self._lines.items():
+            line.set_visible(bool(flags.get(key)) and key in self._series)
+        nfiles = self._data[2]
+        if not self._series:
+            return
+        if not any(flags.values()):
+            self._show_message("No series selected.\nUse checkboxes to choose series to display.")
+            self.status_lbl.configure(text=f"No series selected — {nfiles} file(s) loaded")
+        else:
+            self._show_message("")
+            self.status_lbl.configure(text=self._status_text())
+
+    def _status_text(self):
+        total_count = int(sum(int(y.sum()) for _, y in self._series.values()))
+        live = "Live · " if self.live_var.get() else ""
+        window = f" between {self._time_range[0] or '…'} and {self._time_range[1] or '…'}" if self._time_range else ""
+        return f"{live}Plotted {total_count} events from {self._data[2]} file(s){window}"
+
+    def _set_limits(self, x, ymax, live=False):
+        """Axes limits for the full data range; live views keep headroom so appends can be blitted."""
+        if x.size == 0:
+            return
+        x0, x1 = float(x[0]), float(x[-1])
+        span = max(x1 - x0, self.bucket_seconds / 86400.0)
+        if live:
+            x1 += span * 0.1
+        self.ax.set_xlim(x0, x1 if x1 > x0 else x0 + span)
+        self.ax.set_ylim(0, max(1.0, ymax * (1.25 if live else 1.05)))
+
+    def redraw(self, live=False):
+        """
+        Push the loaded data into the persistent lines; never touches the disk.
+        With live=True, appended data that still fits the current view is
+        blitted without a full canvas draw.
+        """
+        if self._loaded_rows() == 0:
+            self._series = {}
+            for line in self._lines.values():
+                line.set_data([], [])
+                line.set_visible(False)
+            self._show_message("No state events found in logs.\nEnsure CSVs have a Timestamp column and state/event info.")
             self.canvas.draw()
-            self.status_lbl.configure(text=f"No series selected — {len(files)} file(s) loaded")
+            self.status_lbl.configure(text="No data found")
             return
 
+        bins, counts = self._aggregate()
+        x = mdates.date2num(bins)
+        self._series = {key: (x, counts[key]) for key, _ in self.SERIES}
+        ymax = float(max(int(y.max()) if y.size else 0 for _, y in self._series.values()))
+
+        lo, hi = self.ax.get_xlim()
+        ylo, yhi = self.ax.get_ylim()
+        fits = live and x.size and lo <= x[0] and x[-1] <= hi and ymax <= yhi
+        if not fits:
+            self._set_limits(x, ymax, live=live)
+            # new data extent: the toolbar's Home should return here
+            if getattr(self, "toolbar", None) is not None:
+                self.toolbar.update()
+        self._update_lines()
+        self._apply_visibility()
+
         # format x-axis nicely: show seconds if bucket_seconds < 60
+        seconds = self.bucket_seconds < 60
+        if seconds != self._fmt_seconds:
+            try:
+                self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S" if seconds else "%H:%M"))
+                self.fig.autofmt_xdate(rotation=30)
+            except Exception:
+                pass
+            self._fmt_seconds = seconds
+            fits = False
+
+        if fits:
+            self._blit()
+        else:
+            self.canvas.draw()
+
+    # ---------- level of detail ----------
+    def _width_px(self) -> int:
         try:
-            import matplotlib.dates as mdates
-            if self.bucket_seconds < 60:
-                fmt = mdates.DateFormatter("%H:%M:%S")
-            else:
-                fmt = mdates.DateFormatter("%H:%M")
-            self.ax.xaxis.set_major_formatter(fmt)
-            self.fig.autofmt_xdate(rotation=30)
+            return max(50, int(self.ax.bbox.width))
         except Exception:
-            pass
-
-        self.ax.legend(loc="upper left")
-        self.ax.grid(True, linestyle='--', alpha=0.4)
-        self.canvas.draw()
-        total_count = sum(sum(v) for v in counts.values())
-        self.status_lbl.configure(text=f"Plotted {total_count} events from {len(files)} file(s)")
+            return 800
+
+    @staticmethod
+    def _marker_for(npoints: int) -> str:
+        # markers only while they are distinguishable
+        return "o" if npoints <= int(getattr(config, "ANALYTICS_MARKER_MAX_POINTS", 300)) else ""
+
+    def _on_xlim_changed(self, ax):
+        # zoom/pan fire this repeatedly; recompute once the event burst is over
+        if self._lod_job is None:
+            self._lod_job = self.after_idle(self._apply_lod)
+
+    def _update_lines(self):
+        """Downsample every series to the current view and push it into its line."""
+        lo, hi = self.ax.get_xlim()
+        width = self._width_px()
+        for key, line in self._lines.items():
+            if key not in self._series:
+                continue
+            x, y = self._series[key]
+            dx, dy = downsample_minmax(x, y, lo, hi, width)
+            line.set_data(dx, dy)
+            line.set_marker(self._marker_for(dx.size))
+
+    def _apply_lod(self):
+        self._lod_job = None
+        if not self._series:
+            return
+        self._update_lines()
+        # the toolbar's zoom/pan already triggered a full draw; overlay the new lines
+        self._blit()
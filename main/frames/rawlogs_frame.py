@@ -1,85 +1,328 @@
 # frames/rawlogs_frame.py
 import os
-import pandas as pd
+import numpy as np
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk, messagebox
-from utils.file_utils import list_log_files, delete_file
+from utils.file_utils import list_binary_log_files, delete_file
+from utils import binlog, log_reader
+from utils.trip_index import indexed_log_files, forget_file
+from utils.log_cache import npz_path
 import config
 
+ALL_EVENTS = "All events"
+MAX_COLS = 12
+POLL_MS = 200
+
+
 class RawLogsFrame(ctk.CTkFrame):
+    """
+    Virtualized log table: the Treeview only ever holds the rows that fit on
+    screen; scrolling reads that window from disk through a byte-offset index
+    (utils/log_reader.py), so opening a 1 GB log costs the same as a small one.
+    The Time box narrows the view to a range ("14:02-14:07") or jumps to a
+    time ("14:02"), both by binary search on the timestamp column.
+    """
+
     def __init__(self, parent, log_dir=config.LOG_DIR):
         super().__init__(parent)
         self.log_dir = log_dir
 
+        self._source = None       # log_reader row source of the selected log
+        self._filter = None       # log_reader.EventFilter, or None for all rows
+        self._range = None        # (start, end) passed to rows_between, or None for the whole log
+        self._top = 0             # first visible row (of the filtered view)
+        self._follow_tail = False
+        self._page_rows = 25
+        self._poll_job = None
+
         top = ctk.CTkFrame(self)
         top.pack(fill="x", pady=(6,8), padx=6)
 
-        ctk.CTkLabel(top, text="Raw Event Logs (.csv)", font=ctk.CTkFont(size=13, weight="bold")).pack(side="left")
+        ctk.CTkLabel(top, text="Raw Event Logs (.csv / .tlb)", font=ctk.CTkFont(size=13, weight="bold")).pack(side="left")
 
         right = ctk.CTkFrame(top)
         right.pack(side="right")
 
         self.combo = ctk.CTkComboBox(right, values=[], command=self.on_select, width=300)
         self.combo.pack(side="left", padx=(0,6))
-        self.refresh_btn = ctk.CTkButton(right, text="Refresh", width=80, command=self.refresh_files)
+        self.refresh_btn = ctk.CTkButton(right, text="Refresh", width=80, command=lambda: self.refresh_files(force=True))
         self.refresh_btn.pack(side="left", padx=(0,6))
         self.delete_btn = ctk.CTkButton(right, text="Delete Selected", width=120, command=self.delete_selected)
         self.delete_btn.pack(side="left")
 
+        # ---- navigation / filter ----
+        nav = ctk.CTkFrame(self)
+        nav.pack(fill="x", padx=6)
+        self.event_combo = ctk.CTkComboBox(nav, values=[ALL_EVENTS] + [n for n in binlog.EVENT_NAMES if n],
+                                           command=self.on_filter, width=170)
+        self.event_combo.set(ALL_EVENTS)
+        self.event_combo.pack(side="left", padx=(0,10))
+        for text, cmd in (("⏮ First", self.go_first), ("◀ Prev", lambda: self.scroll_pages(-1)),
+                          ("Next ▶", lambda: self.scroll_pages(1)), ("Tail ⏭", self.go_tail)):
+            ctk.CTkButton(nav, text=text, width=70, command=cmd).pack(side="left", padx=(0,4))
+        self.time_entry = ctk.CTkEntry(nav, width=150, placeholder_text="Time: 14:02-14:07")
+        self.time_entry.pack(side="left", padx=(10,4))
+        self.time_entry.bind("<Return>", lambda e: self.on_time())
+        ctk.CTkButton(nav, text="Go", width=40, command=self.on_time).pack(side="left")
+        self.status_label = ctk.CTkLabel(nav, text="", anchor="e")
+        self.status_label.pack(side="right", padx=6)
+
         table_frame = ctk.CTkFrame(self)
         table_frame.pack(fill="both", expand=True, padx=6, pady=6)
 
-        # native ttk Treeview for good performance
+        # native ttk Treeview; the vertical scrollbar drives the virtual window, not the widget
         self.tree = ttk.Treeview(table_frame, show="headings")
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_scrollbar)
         hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=vsb.set, xscroll=hsb.set)
-        self.tree.pack(side="top", fill="both", expand=True)
-        vsb.pack(side="right", fill="y")
+        self.tree.configure(xscroll=hsb.set)
+        self.vsb.pack(side="right", fill="y")
         hsb.pack(side="bottom", fill="x")
+        self.tree.pack(side="top", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_pages(-1))
+        self.tree.bind("<Next>", lambda e: self.scroll_pages(1))
+        self.tree.bind("<Home>", lambda e: self.go_first())
+        self.tree.bind("<End>", lambda e: self.go_tail())
 
         self.refresh_files()
 
-    def refresh_files(self):
-        files = list_log_files(self.log_dir)
-        if not files:
-            files = []
+    def refresh_files(self, force=False):
+        files = indexed_log_files(self.log_dir, force=force) or []
+        # binary logs whose CSV is gone are still viewable
+        csvs = set(files)
+        files += [f for f in list_binary_log_files(self.log_dir)
+                  if os.path.basename(binlog.csv_path_for(f)) not in csvs]
         self.combo.configure(values=files)
         if files:
             self.combo.set(files[0])
             self.load_table(os.path.join(self.log_dir, files[0]))
         else:
+            self._close()
             self.tree.delete(*self.tree.get_children())
             self.tree["columns"] = ()
+            self.status_label.configure(text="")
 
     def on_select(self, value):
         if not value:
             return
         self.load_table(os.path.join(self.log_dir, value))
 
+    def _close(self, wait=False):
+        if self._filter is not None:
+            self._filter.stop(wait=wait)
+        self._filter = None
+        self._source = None
+        if self._poll_job is not None:
+            try:
+                self.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+
     def load_table(self, path):
+        self._close()
         try:
-            df = pd.read_csv(path)
+            self._source = log_reader.open_log(path)
         except Exception as e:
             self.tree.delete(*self.tree.get_children())
             self.tree["columns"] = ("Error",)
             self.tree.heading("Error", text=str(e))
             return
 
-        max_cols = 12
-        df = df.iloc[:, :max_cols]
-
         self.tree.delete(*self.tree.get_children())
-        cols = list(df.columns)
+        cols = list(self._source.header[:MAX_COLS]) or ["Row"]
         self.tree["columns"] = cols
         for c in cols:
             self.tree.heading(c, text=c)
             self.tree.column(c, width=120, anchor="w")
 
-        for i, row in df.reset_index(drop=True).head(200).iterrows():
-            vals = [str(row.get(c, "")) for c in cols]
-            self.tree.insert("", "end", values=vals)
+        self._top = 0
+        self._follow_tail = False
+        self._range = None
+        self.time_entry.delete(0, "end")
+        self._apply_filter(self.event_combo.get())
+
+    # ---------- filter ----------
+    def on_filter(self, value):
+        if self._source is None:
+            return
+        self._apply_filter(value)
+
+    def _apply_filter(self, value):
+        if self._filter is not None:
+            self._filter.stop()
+            self._filter = None
+        if value and value != ALL_EVENTS:
+            self._filter = log_reader.EventFilter(self._source, value).start()
+        self._top = 0
+        self.render()
+        self._schedule_poll()
+
+    # ---------- time range ----------
+    def on_time(self):
+        if self._source is None:
+            return
+        text = self.time_entry.get().strip()
+        rng = log_reader.parse_time_range(text) if text else None
+        if text and rng is None:
+            messagebox.showwarning("Time", f"Could not read a time from '{text}'.\nUse e.g. 14:02 or 14:02-14:07.")
+            return
+        self._follow_tail = False
+        self._top = 0
+        if rng is not None and rng[1] is None:
+            # a single time: jump to the first row at or after it
+            self._range = None
+            try:
+                row = self._source.rows_between(rng[0], None)[0]
+            except Exception:
+                row = 0
+            rows = self._view()[0]
+            self._top = int(np.searchsorted(rows, row)) if rows is not None else row
+        else:
+            self._range = rng
+        self.render()
+
+    # ---------- virtual window ----------
+    def _view(self):
+        """(matching row numbers or None, first row, row count) with the filter and time range applied."""
+        lo, hi = 0, self._source.row_count()
+        if self._range is not None:
+            try:
+                lo, hi = self._source.rows_between(*self._range)
+            except Exception:
+                pass
+        if self._filter is not None:
+            rows = self._filter.rows()
+            if self._range is not None:
+                rows = rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]
+            return rows, lo, int(rows.size)
+        return None, lo, max(0, hi - lo)
+
+    def _total(self):
+        if self._source is None:
+            return 0
+        return self._view()[2]
+
+    def _complete(self):
+        if self._source is None:
+            return True
+        if self._filter is not None:
+            return self._filter.complete
+        return self._source.complete
+
+    def _clamp(self, top):
+        return max(0, min(int(top), self._total() - self._page_rows))
+
+    def render(self):
+        if self._source is None:
+            return
+        page = self._page_rows
+        view, lo, total = self._view()
+        try:
+            if self._follow_tail and view is None and self._range is None and not self._complete():
+                # index still building: the end of the file is read backwards instead
+                rows = self._source.tail_rows(page)
+                self._top = max(0, total - page)
+            else:
+                if self._follow_tail:
+                    self._top = max(0, total - page)
+                self._top = max(0, min(self._top, total - page))
+                if view is not None:
+                    rows = self._source.read_row_numbers(view[self._top:self._top + page])
+                else:
+                    rows = self._source.read_rows(lo + self._top, page)
+        except Exception:
+            rows = []
+
+        ncols = len(self.tree["columns"])
+        items = self.tree.get_children()
+        for i, row in enumerate(rows):
+            vals = (list(row[:ncols]) + [""] * ncols)[:ncols]
+            if i < len(items):
+                self.tree.item(items[i], values=vals)
+            else:
+                self.tree.insert("", "end", values=vals)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        if total > 0:
+            self.vsb.set(self._top / total, min(1.0, (self._top + len(rows)) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+        self._update_status(len(rows), total)
+
+    def _update_status(self, shown, total):
+        text = f"Rows {self._top + 1:,}-{self._top + shown:,} of {total:,}" if shown else f"0 of {total:,} rows"
+        if self._range is not None:
+            text += " in range"
+        if not self._complete():
+            text += " (filtering…)" if self._filter is not None else " (indexing…)"
+        self.status_label.configure(text=text)
+
+    def _schedule_poll(self):
+        if self._poll_job is None and not self._complete():
+            self._poll_job = self.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        if self._source is None:
+            return
+        # keep filling the visible page / following the tail while the index grows
+        self.render()
+        self._schedule_poll()
+
+    # ---------- navigation ----------
+    def on_scrollbar(self, *args):
+        if not args:
+            return
+        total = self._total()
+        if args[0] == "moveto":
+            top = float(args[1]) * total
+        elif args[0] == "scroll":
+            step = self._page_rows if args[2] == "pages" else 1
+            top = self._top + int(args[1]) * step
+        else:
+            return
+        self._follow_tail = False
+        self._top = self._clamp(top)
+        self.render()
+
+    def _on_wheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def scroll_rows(self, n):
+        self._follow_tail = False
+        self._top = self._clamp(self._top + n)
+        self.render()
+        return "break"
+
+    def scroll_pages(self, n):
+        return self.scroll_rows(n * self._page_rows)
+
+    def go_first(self):
+        self._follow_tail = False
+        self._top = 0
+        self.render()
+
+    def go_tail(self):
+        self._follow_tail = True
+        self.render()
+
+    def _on_resize(self, event):
+        try:
+            row_h = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        except Exception:
+            row_h = 20
+        rows = max(5, (event.height - 24) // max(1, row_h))
+        if rows != self._page_rows:
+            self._page_rows = rows
+            self.render()
 
     def delete_selected(self):
         selected = self.combo.get()
@@ -90,7 +333,17 @@ class RawLogsFrame(ctk.CTkFrame):
         res = messagebox.askyesno("Confirm Delete", f"Delete log:\n\n{selected}? This is permanent.")
         if not res:
             return
+        # unmap everything that views the files first: Windows refuses to delete a mapped file
+        self._close(wait=True)
+        log_reader.forget(path)
+        if not path.lower().endswith(binlog.EXT):
+            log_reader.forget(binlog.sidecar_path(path))
         ok = delete_file(path)
+        if ok and not path.lower().endswith(binlog.EXT):
+            delete_file(binlog.sidecar_path(path))
+            delete_file(npz_path(path))
+            delete_file(log_reader.index_path(path))
+            forget_file(path)
         if ok:
             messagebox.showinfo("Deleted", f"Deleted {selected}")
         else:
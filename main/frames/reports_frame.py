@@ -1,23 +1,46 @@
 # frames/reports_frame.py
+import codecs
+import io
 import os
+import shutil
+import threading
 import customtkinter as ctk
 from tkinter import scrolledtext, filedialog, messagebox
-from utils.file_utils import list_report_files, delete_file
+from utils.file_utils import delete_file
+from utils.trip_index import report_count, report_window, sync_in_background, forget_file
 import config
 import datetime
 
+CARD_HEIGHT = 96   # px per card slot (card + padding)
+
+
 class ReportsFrame(ctk.CTkFrame):
+    """
+    Report list rendered as a window: only the cards that fit are created,
+    and they are re-filled from the trip index (one LIMIT/OFFSET page) as
+    the list scrolls, so opening the tab costs the same for 10 or 10,000
+    reports. The index is synced with the directory on a background thread.
+    """
+
     def __init__(self, parent, reports_dir=config.REPORT_DIR):
         super().__init__(parent)
         self.reports_dir = reports_dir
         self.current_selected = None
+        self._top = 0            # index of the first visible report
+        self._count = 0
+        self._cards = []         # recycled card widgets
+        self._sync = None
+        self._synced_once = False
+        self._last_slots = None
+        self._preview = None     # [file handle, decoder, bytes shown] of the report being streamed in
+        self._preview_job = None
 
         top = ctk.CTkFrame(self)
         top.pack(fill="x", padx=8, pady=(8,6))
         ctk.CTkLabel(top, text="Trip Summaries", font=ctk.CTkFont(size=14, weight="bold")).pack(side="left")
         actions = ctk.CTkFrame(top)
         actions.pack(side="right")
-        ctk.CTkButton(actions, text="Refresh", command=self.refresh_files, width=90).pack(side="left", padx=6)
+        ctk.CTkButton(actions, text="Refresh", command=lambda: self.refresh_files(force=True), width=90).pack(side="left", padx=6)
         ctk.CTkButton(actions, text="Export Selected", command=self.export_selected, width=120).pack(side="left", padx=6)
         ctk.CTkButton(actions, text="Delete Selected", command=self.delete_selected, width=120).pack(side="left", padx=6)
 
@@ -30,9 +53,13 @@ class ReportsFrame(ctk.CTkFrame):
         right = ctk.CTkFrame(split)
         right.pack(side="right", fill="both", expand=True, pady=4)
 
-        self.list_scroll = ctk.CTkScrollableFrame(left)
-        self.list_scroll.pack(fill="both", expand=True, padx=6, pady=6)
-        self.card_buttons = []
+        self.list_vsb = ctk.CTkScrollbar(left, command=self._on_list_scroll)
+        self.list_vsb.pack(side="right", fill="y", pady=6)
+        self.list_area = ctk.CTkFrame(left)
+        self.list_area.pack(fill="both", expand=True, padx=6, pady=6)
+        self.list_area.bind("<Configure>", self._on_list_resize)
+        self._bind_wheel(self.list_area)
+        self.empty_label = ctk.CTkLabel(self.list_area, text="(no reports)")
 
         preview_card = ctk.CTkFrame(right)
         preview_card.pack(fill="both", expand=True, padx=6, pady=6)
@@ -42,59 +69,177 @@ class ReportsFrame(ctk.CTkFrame):
 
         self.refresh_files()
 
-    def refresh_files(self):
-        for w in self.card_buttons:
-            try:
-                w.destroy()
-            except Exception:
-                pass
-        self.card_buttons = []
+    def refresh_files(self, force=False):
+        """Render from the index now; sync it with the directory in the background and re-render when done."""
+        self._stop_preview()
         self.current_selected = None
         self.viewer.delete("1.0", "end")
+        self._render()
+        if self._sync is None and (force or not self._synced_once):
+            self._sync = sync_in_background(report_dir=self.reports_dir, force=force)
+            self.after(200, self._poll_sync)
 
-        files = list_report_files(self.reports_dir)
-        if not files:
-            lbl = ctk.CTkLabel(self.list_scroll, text="(no reports)")
-            lbl.pack(padx=6, pady=8)
-            self.card_buttons.append(lbl)
+    def _poll_sync(self):
+        if self._sync is None:
             return
+        if self._sync.is_alive():
+            self.after(200, self._poll_sync)
+            return
+        self._sync = None
+        self._synced_once = True
+        self._render()
 
-        for f in files:
-            path = os.path.join(self.reports_dir, f)
-            card = ctk.CTkFrame(self.list_scroll)
-            card.pack(fill="x", padx=8, pady=6)
-            title = ctk.CTkLabel(card, text=f, anchor="w", font=ctk.CTkFont(size=11, weight="bold"))
-            title.pack(fill="x", padx=8, pady=(8,4))
-            try:
-                mtime = os.path.getmtime(path)
-                meta = datetime.datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                meta = ""
-            ctk.CTkLabel(card, text=meta, anchor="w").pack(fill="x", padx=8, pady=(0,8))
-            btn_frame = ctk.CTkFrame(card)
-            btn_frame.pack(fill="x", pady=(0,8), padx=8)
-            ctk.CTkButton(btn_frame, text="Open", width=80, command=lambda fn=f: self.on_select(fn)).pack(side="left")
-            ctk.CTkButton(btn_frame, text="Delete", width=80, command=lambda fn=f: self._delete_confirm(fn)).pack(side="right")
-            self.card_buttons.append(card)
+    # ---------- windowed list ----------
+    def _visible_slots(self):
+        h = self.list_area.winfo_height()
+        return max(1, h // CARD_HEIGHT) if h > 1 else 6
+
+    def _make_card(self):
+        card = ctk.CTkFrame(self.list_area, height=CARD_HEIGHT - 12)
+        card.pack_propagate(False)
+        card.title = ctk.CTkLabel(card, text="", anchor="w", font=ctk.CTkFont(size=11, weight="bold"))
+        card.title.pack(fill="x", padx=8, pady=(6,2))
+        card.meta = ctk.CTkLabel(card, text="", anchor="w")
+        card.meta.pack(fill="x", padx=8)
+        btn_frame = ctk.CTkFrame(card)
+        btn_frame.pack(fill="x", pady=(2,6), padx=8)
+        card.open_btn = ctk.CTkButton(btn_frame, text="Open", width=80)
+        card.open_btn.pack(side="left")
+        card.delete_btn = ctk.CTkButton(btn_frame, text="Delete", width=80)
+        card.delete_btn.pack(side="right")
+        for w in (card, card.title, card.meta, btn_frame):
+            self._bind_wheel(w)
+        return card
+
+    def _fill_card(self, card, row):
+        f = row["report_file"]
+        card.title.configure(text=f)
+        try:
+            meta = datetime.datetime.fromtimestamp(row["report_mtime"]).strftime("%Y-%m-%d %H:%M")
+        except Exception:
+            meta = ""
+        if row.get("safety_score") is not None:
+            meta += f"   score {row['safety_score']}/100  Y:{row.get('yawn_warnings', 0)} D:{row.get('drowsy_warnings', 0)}"
+        card.meta.configure(text=meta)
+        card.open_btn.configure(command=lambda fn=f: self.on_select(fn))
+        card.delete_btn.configure(command=lambda fn=f: self._delete_confirm(fn))
+
+    def _render(self):
+        self._count = report_count(self.reports_dir)
+        slots = self._visible_slots()
+        self._top = max(0, min(self._top, self._count - slots))
+        rows = report_window(self.reports_dir, self._top, slots) if self._count else []
+
+        while len(self._cards) < len(rows):
+            self._cards.append(self._make_card())
+        for card, row in zip(self._cards, rows):
+            self._fill_card(card, row)
+            if not card.winfo_ismapped():
+                card.pack(fill="x", padx=8, pady=6)
+        for card in self._cards[len(rows):]:
+            card.pack_forget()
+
+        if rows:
+            self.empty_label.pack_forget()
+        else:
+            self.empty_label.pack(padx=6, pady=8)
+        if self._count:
+            self.list_vsb.set(self._top / self._count, min(1.0, (self._top + len(rows)) / self._count))
+        else:
+            self.list_vsb.set(0.0, 1.0)
+
+    def _scroll_to(self, top):
+        top = max(0, min(int(top), self._count - self._visible_slots()))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_list_scroll(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * self._count)
+        elif args[0] == "scroll":
+            step = self._visible_slots() if args[2] == "pages" else 1
+            self._scroll_to(self._top + int(args[1]) * step)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self._scroll_to(self._top + (-1 if e.delta > 0 else 1)))
+        widget.bind("<Button-4>", lambda e: self._scroll_to(self._top - 1))
+        widget.bind("<Button-5>", lambda e: self._scroll_to(self._top + 1))
+
+    def _on_list_resize(self, event):
+        if event.height // CARD_HEIGHT != self._last_slots:
+            self._last_slots = event.height // CARD_HEIGHT
+            self._render()
 
+    # ---------- preview ----------
     def on_select(self, filename):
+        """
+        Show the report's first chunk (the summary) at once, then stream the
+        rest into the viewer a chunk per Tk idle turn, up to REPORT_PREVIEW_MAX_BYTES.
+        """
+        self._stop_preview()
         self.current_selected = filename
         path = os.path.join(self.reports_dir, filename)
+        self.viewer.delete("1.0", "end")
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as fh:
-                text = fh.read()
+            fh = open(path, "rb")
         except Exception as e:
-            text = f"Error reading file: {e}"
-        self.viewer.delete("1.0", "end")
-        self.viewer.insert("1.0", text)
+            self.viewer.insert("1.0", f"Error reading file: {e}")
+            return
+        # newline translation: reports written on Windows have \r\n endings, Tk would show the \r
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="ignore"), True)
+        self._preview = [fh, decoder, 0]
+        self._preview_step()
+
+    def _preview_step(self):
+        self._preview_job = None
+        if self._preview is None:
+            return
+        fh, decoder, shown = self._preview
+        chunk_bytes = int(getattr(config, "REPORT_PREVIEW_CHUNK_BYTES", 64 << 10))
+        max_bytes = int(getattr(config, "REPORT_PREVIEW_MAX_BYTES", 4 << 20))
+        try:
+            data = fh.read(min(chunk_bytes, max_bytes - shown))
+        except Exception:
+            data = b""
+        if data:
+            self.viewer.insert("end", decoder.decode(data))
+            self._preview[2] = shown + len(data)
+        if not data or self._preview[2] >= max_bytes:
+            self.viewer.insert("end", decoder.decode(b"", final=True))
+            if data and fh.read(1):
+                self.viewer.insert("end", f"\n\n[... preview stops at {max_bytes // (1 << 20)} MB; "
+                                          f"use Export Selected for the full report ...]\n")
+            self._stop_preview()
+            return
+        self._preview_job = self.after(1, self._preview_step)
+
+    def _stop_preview(self):
+        if self._preview_job is not None:
+            try:
+                self.after_cancel(self._preview_job)
+            except Exception:
+                pass
+            self._preview_job = None
+        if self._preview is not None:
+            try:
+                self._preview[0].close()
+            except Exception:
+                pass
+            self._preview = None
 
     def _delete_confirm(self, filename):
         res = messagebox.askyesno("Confirm Delete", f"Delete report:\n\n{filename}? This is permanent.")
         if not res:
             return
         path = os.path.join(self.reports_dir, filename)
+        if filename == self.current_selected:
+            self._stop_preview()
         ok = delete_file(path)
         if ok:
+            forget_file(path)
             messagebox.showinfo("Deleted", f"Deleted {filename}")
         else:
             messagebox.showwarning("Delete Failed", f"Could not delete {filename}")
@@ -114,9 +259,25 @@ class ReportsFrame(ctk.CTkFrame):
         dest = filedialog.asksaveasfilename(defaultextension=".txt", initialfile=self.current_selected)
         if not dest:
             return
-        try:
-            with open(src, 'r', encoding='utf-8', errors='ignore') as s, open(dest, 'w', encoding='utf-8') as d:
-                d.write(s.read())
+        # streamed copy on a worker thread; the result is reported back through after()
+        result = {}
+
+        def copy():
+            try:
+                with open(src, "rb") as s, open(dest, "wb") as d:
+                    shutil.copyfileobj(s, d, int(getattr(config, "REPORT_CHUNK_BYTES", 1 << 20)))
+            except Exception as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=copy, name="ReportExport", daemon=True)
+        worker.start()
+        self._poll_export(worker, result, dest)
+
+    def _poll_export(self, worker, result, dest):
+        if worker.is_alive():
+            self.after(100, self._poll_export, worker, result, dest)
+            return
+        if "error" in result:
+            messagebox.showwarning("Export Failed", str(result["error"]))
+        else:
             messagebox.showinfo("Exported", f"Saved to {dest}")
-        except Exception as e:
-            messagebox.showwarning("Export Failed", str(e))
@@ -0,0 +1,356 @@
+# live_app/backends.py
+"""
+Inference backends for the drowsiness model.
+
+Every backend is callable like an ultralytics YOLO model:
+    results = backend(frame_bgr, conf=0.4, verbose=False)
+and returns a list with one result object exposing `.boxes` (iterable of
+boxes with `.cls`, `.conf`, `.xyxy`) plus a `names` mapping, so Detector
+does not need to care which runtime is underneath.
+
+Supported:
+  - "ultralytics": final_model.pt through ultralytics.YOLO (PyTorch)
+  - "onnx":        exported ONNX model through onnxruntime (CPU)
+  - "openvino":    exported OpenVINO IR through openvino (CPU)
+  - "auto":        first available of openvino -> onnx -> ultralytics
+
+When config.PREFER_QUANTIZED_MODEL is set, INT8 artifacts written by
+quantize_model.py are loaded in place of the fp32 ones.
+"""
+import ast
+import glob
+import os
+
+import numpy as np
+import cv2
+
+import config
+
+try:
+    from ultralytics import YOLO
+except Exception:
+    YOLO = None
+
+try:
+    import onnxruntime as ort
+except Exception:
+    ort = None
+
+try:
+    try:
+        from openvino import Core as OVCore
+    except Exception:
+        from openvino.runtime import Core as OVCore
+except Exception:
+    OVCore = None
+
+
+DEFAULT_NAMES = {i: n for i, n in enumerate(getattr(config, "MODEL_CLASS_NAMES", ["attentive", "yawn", "drowsy"]))}
+
+
+# ---------- pre/post-processing helpers ----------
+def letterbox(img, new_shape=640, color=(114, 114, 114)):
+    """
+    Resize keeping aspect ratio and pad to new_shape (int or (h, w)).
+    Returns (padded_img, ratio, (pad_w, pad_h)).
+    """
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    h, w = img.shape[:2]
+    r = min(new_shape[0] / float(h), new_shape[1] / float(w))
+    new_w, new_h = int(round(w * r)), int(round(h * r))
+    pad_w = (new_shape[1] - new_w) / 2.0
+    pad_h = (new_shape[0] - new_h) / 2.0
+    if (w, h) != (new_w, new_h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    if top or bottom or left or right:
+        img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return img, r, (left, top)
+
+
+def to_blob(img_bgr):
+    """HWC BGR uint8 -> NCHW RGB float32 in [0, 1]."""
+    rgb = img_bgr[:, :, ::-1]
+    blob = np.ascontiguousarray(rgb.transpose(2, 0, 1), dtype=np.float32)
+    blob *= (1.0 / 255.0)
+    return blob[None]
+
+
+def nms(boxes, scores, iou_threshold=0.45):
+    """Plain numpy non-maximum suppression. boxes: (N, 4) xyxy. Returns kept indices."""
+    if boxes.shape[0] == 0:
+        return np.empty((0,), dtype=np.int64)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(0.0, x2 - x1) * np.maximum(0.0, y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = np.maximum(0.0, xx2 - xx1) * np.maximum(0.0, yy2 - yy1)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_yolov8(output, conf_threshold, iou_threshold, max_det=100):
+    """
+    Decode a raw YOLOv8 detection head output of shape (1, 4+nc, N) into
+    (xyxy, conf, cls) arrays in network-input coordinates.
+    """
+    pred = np.asarray(output)
+    if pred.ndim == 3:
+        pred = pred[0]
+    if pred.shape[0] < pred.shape[1]:
+        # (4+nc, N) -> (N, 4+nc)
+        pred = pred.T
+    class_scores = pred[:, 4:]
+    cls = class_scores.argmax(axis=1)
+    conf = class_scores[np.arange(class_scores.shape[0]), cls]
+    mask = conf >= conf_threshold
+    if not np.any(mask):
+        return (np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.float32), np.zeros((0,), dtype=np.int64))
+    xywh = pred[mask, :4]
+    conf = conf[mask]
+    cls = cls[mask]
+    xyxy = np.empty_like(xywh)
+    xyxy[:, 0] = xywh[:, 0] - xywh[:, 2] / 2.0
+    xyxy[:, 1] = xywh[:, 1] - xywh[:, 3] / 2.0
+    xyxy[:, 2] = xywh[:, 0] + xywh[:, 2] / 2.0
+    xyxy[:, 3] = xywh[:, 1] + xywh[:, 3] / 2.0
+    # class-aware NMS via per-class coordinate offsets
+    offset = cls[:, None].astype(np.float32) * 4096.0
+    keep = nms(xyxy + offset, conf, iou_threshold)[:max_det]
+    return xyxy[keep].astype(np.float32), conf[keep].astype(np.float32), cls[keep].astype(np.int64)
+
+
+# ---------- lightweight result containers (mimic ultralytics) ----------
+class SimpleBox:
+    """One detection; attributes are 1-element arrays like ultralytics Boxes[i]."""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(1, 4)
+        self.conf = np.asarray([conf], dtype=np.float32)
+        self.cls = np.asarray([cls], dtype=np.float32)
+
+
+class SimpleBoxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self):
+        return int(self.conf.shape[0])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SimpleBox(self.xyxy[i], self.conf[i], self.cls[i])
+
+
+class SimpleResult:
+    def __init__(self, boxes, names):
+        self.boxes = boxes
+        self.names = names
+
+
+# ---------- backends ----------
+class _ExportedBackend:
+    """Shared letterbox + decode path for exported (ONNX / OpenVINO) graphs."""
+
+    name = "exported"
+    # input side length when the graph was exported with a static shape
+    fixed_imgsz = None
+
+    def __init__(self, imgsz=None, names=None, iou=None):
+        self.imgsz = int(imgsz or getattr(config, "INFERENCE_IMGSZ", 640))
+        self.names = names or dict(DEFAULT_NAMES)
+        self.iou = float(iou if iou is not None else getattr(config, "NMS_IOU", 0.45))
+
+    def _run(self, blob):
+        raise NotImplementedError
+
+    def __call__(self, frame, conf=0.25, verbose=False, imgsz=None, **kwargs):
+        # a frame already at the input size (Detector.prepare_input) skips resize/pad
+        size = self.fixed_imgsz or int(imgsz or self.imgsz)
+        img, r, (pad_w, pad_h) = letterbox(frame, size)
+        out = self._run(to_blob(img))
+        xyxy, scores, cls = decode_yolov8(out, float(conf), self.iou)
+        if xyxy.shape[0]:
+            # map back to source frame coordinates
+            xyxy[:, [0, 2]] -= pad_w
+            xyxy[:, [1, 3]] -= pad_h
+            xyxy /= r
+            h, w = frame.shape[:2]
+            xyxy[:, [0, 2]] = np.clip(xyxy[:, [0, 2]], 0, w)
+            xyxy[:, [1, 3]] = np.clip(xyxy[:, [1, 3]], 0, h)
+        return [SimpleResult(SimpleBoxes(xyxy, scores, cls), self.names)]
+
+
+class OnnxBackend(_ExportedBackend):
+    name = "onnx"
+
+    def __init__(self, path, imgsz=None, names=None, iou=None):
+        if ort is None:
+            raise ImportError("onnxruntime is not installed.")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(getattr(config, "ONNX_INTRA_OP_THREADS", 0))
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        self.fixed_imgsz = _static_side(inp.shape)
+        meta_names, meta_imgsz = _read_onnx_metadata(self.session)
+        super().__init__(imgsz=self.fixed_imgsz or imgsz or meta_imgsz, names=names or meta_names, iou=iou)
+        self.path = path
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoBackend(_ExportedBackend):
+    name = "openvino"
+
+    def __init__(self, path, imgsz=None, names=None, iou=None):
+        if OVCore is None:
+            raise ImportError("openvino is not installed.")
+        core = OVCore()
+        model = core.read_model(path)
+        self.compiled = core.compile_model(model, "CPU")
+        self.output = self.compiled.output(0)
+        try:
+            pshape = model.input(0).get_partial_shape()
+            self.fixed_imgsz = _static_side([d.get_length() if d.is_static else None for d in pshape])
+        except Exception:
+            self.fixed_imgsz = None
+        meta_names, meta_imgsz = _read_openvino_metadata(path)
+        super().__init__(imgsz=self.fixed_imgsz or imgsz or meta_imgsz, names=names or meta_names, iou=iou)
+        self.path = path
+
+    def _run(self, blob):
+        return self.compiled([blob])[self.output]
+
+
+def _static_side(shape):
+    """Return H for a static NCHW input shape with H == W, else None."""
+    try:
+        h, w = shape[2], shape[3]
+        if isinstance(h, int) and isinstance(w, int) and h == w and h > 0:
+            return int(h)
+    except Exception:
+        pass
+    return None
+
+
+def _parse_names(raw):
+    try:
+        names = ast.literal_eval(raw) if isinstance(raw, str) else raw
+        if isinstance(names, dict):
+            return {int(k): str(v) for k, v in names.items()}
+        if isinstance(names, (list, tuple)):
+            return {i: str(v) for i, v in enumerate(names)}
+    except Exception:
+        pass
+    return None
+
+
+def _parse_imgsz(raw):
+    try:
+        v = ast.literal_eval(raw) if isinstance(raw, str) else raw
+        if isinstance(v, (list, tuple)):
+            return int(v[0])
+        return int(v)
+    except Exception:
+        return None
+
+
+def _read_onnx_metadata(session):
+    """ultralytics stores names/imgsz in the ONNX custom metadata map."""
+    try:
+        meta = session.get_modelmeta().custom_metadata_map
+        return _parse_names(meta.get("names")), _parse_imgsz(meta.get("imgsz"))
+    except Exception:
+        return None, None
+
+
+def _read_openvino_metadata(xml_path):
+    """ultralytics writes metadata.yaml next to the exported IR."""
+    try:
+        import yaml
+        meta_path = os.path.join(os.path.dirname(xml_path), "metadata.yaml")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = yaml.safe_load(f) or {}
+        return _parse_names(meta.get("names")), _parse_imgsz(meta.get("imgsz"))
+    except Exception:
+        return None, None
+
+
+def _prefer_quantized():
+    return bool(getattr(config, "PREFER_QUANTIZED_MODEL", True))
+
+
+def _find_openvino_xml(model_dir):
+    dirs = [getattr(config, "MODEL_OPENVINO_DIR", "final_model_openvino_model")]
+    if _prefer_quantized():
+        dirs.insert(0, getattr(config, "MODEL_OPENVINO_INT8_DIR", "final_model_int8_openvino_model"))
+    for d in dirs:
+        ov_dir = os.path.join(model_dir, d)
+        if os.path.isdir(ov_dir):
+            xmls = sorted(glob.glob(os.path.join(ov_dir, "*.xml")))
+            if xmls:
+                return xmls[0]
+    return None
+
+
+def _find_onnx(model_dir):
+    files = [getattr(config, "MODEL_ONNX_FILE", "final_model.onnx")]
+    if _prefer_quantized():
+        # produced by quantize_model.py
+        files.insert(0, getattr(config, "MODEL_INT8_ONNX_FILE", "final_model_int8.onnx"))
+    for f in files:
+        path = os.path.join(model_dir, f)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_backend(model_dir=config.MODEL_DIR, backend=None):
+    """
+    Load the model with the configured backend. Returns a callable model or
+    raises if nothing could be loaded.
+    """
+    backend = (backend or getattr(config, "INFERENCE_BACKEND", "auto") or "auto").lower()
+    order = ["openvino", "onnx", "ultralytics"] if backend == "auto" else [backend]
+    errors = []
+    for kind in order:
+        try:
+            if kind == "openvino":
+                xml = _find_openvino_xml(model_dir)
+                if not xml:
+                    raise FileNotFoundError("OpenVINO IR not found.")
+                return OpenVinoBackend(xml)
+            if kind == "onnx":
+                path = _find_onnx(model_dir)
+                if not path:
+                    raise FileNotFoundError("ONNX model not found.")
+                return OnnxBackend(path)
+            if kind == "ultralytics":
+                path = os.path.join(model_dir, getattr(config, "MODEL_PT_FILE", "final_model.pt"))
+                if YOLO is None or not os.path.exists(path):
+                    raise FileNotFoundError("YOLO model not available or final_model.pt missing.")
+                return YOLO(path)
+            raise ValueError(f"Unknown inference backend: {kind}")
+        except Exception as e:
+            errors.append(f"{kind}: {e}")
+    raise RuntimeError("No inference backend could be loaded (" + "; ".join(errors) + ")")
@@ -0,0 +1,155 @@
+# live_app/capture.py
+import threading
+import time
+
+import numpy as np
+import cv2
+
+
+class FrameRingBuffer:
+    """
+    Small fixed-size ring of preallocated frame slots (newest wins).
+
+    The producer writes into the next slot in place; the consumer only ever
+    reads the most recent one. Frames that were written but never consumed
+    are counted as dropped.
+    """
+
+    def __init__(self, slots=3):
+        self.slots = max(2, int(slots))
+        self._buffers = [None] * self.slots
+        self._lock = threading.Lock()
+        self._write_idx = 0
+        self._latest_idx = -1
+        self._latest_seq = 0
+        self._read_seq = 0
+        self._latest_ts = 0.0
+
+        # counters
+        self.frames_written = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    def _slot_for(self, frame):
+        buf = self._buffers[self._write_idx]
+        if buf is None or buf.shape != frame.shape or buf.dtype != frame.dtype:
+            buf = np.empty_like(frame)
+            self._buffers[self._write_idx] = buf
+        return buf
+
+    def write(self, frame, ts=None):
+        """Copy frame into the next slot and publish it as the latest."""
+        if frame is None:
+            return
+        with self._lock:
+            # never overwrite the slot the consumer may be reading right now
+            if self._write_idx == self._latest_idx:
+                self._write_idx = (self._write_idx + 1) % self.slots
+            buf = self._slot_for(frame)
+            np.copyto(buf, frame)
+            if self._latest_seq > self._read_seq:
+                # previous frame was never consumed
+                self.frames_dropped += 1
+            self._latest_idx = self._write_idx
+            self._latest_seq += 1
+            self._latest_ts = ts if ts is not None else time.time()
+            self._write_idx = (self._write_idx + 1) % self.slots
+            self.frames_written += 1
+
+    def read_latest(self, out=None):
+        """
+        Return (seq, timestamp, frame) for the newest frame, or (seq, ts, None)
+        if nothing new arrived since the last read. When out is given the
+        frame is copied into it, otherwise a fresh copy is returned.
+        """
+        with self._lock:
+            if self._latest_idx < 0 or self._latest_seq == self._read_seq:
+                return self._read_seq, self._latest_ts, None
+            src = self._buffers[self._latest_idx]
+            if out is not None and out.shape == src.shape and out.dtype == src.dtype:
+                np.copyto(out, src)
+                frame = out
+            else:
+                frame = src.copy()
+            self._read_seq = self._latest_seq
+            self.frames_read += 1
+            return self._read_seq, self._latest_ts, frame
+
+    def stats(self):
+        with self._lock:
+            return {
+                "written": self.frames_written,
+                "read": self.frames_read,
+                "dropped": self.frames_dropped,
+            }
+
+
+class CaptureThread:
+    """
+    Continuously drains a cv2.VideoCapture into a FrameRingBuffer so the UI
+    loop always gets the freshest frame instead of a stale driver buffer.
+    """
+
+    def __init__(self, cap, slots=3):
+        self.cap = cap
+        self.buffer = FrameRingBuffer(slots=slots)
+        self.read_failures = 0
+        self._running = False
+        self._thread = None
+        self._out = None
+        self.last_ts = 0.0      # capture time (epoch s) of the frame returned by the last read()
+
+    def start(self):
+        if self._running:
+            return
+        try:
+            # keep the driver-side queue as short as the backend allows
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        except Exception:
+            pass
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="CaptureThread", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                ret, frame = self.cap.read()
+            except Exception:
+                ret, frame = False, None
+            if not ret or frame is None:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            self.buffer.write(frame, time.time())
+
+    def read(self):
+        """
+        Return (ok, frame) with the newest frame, similar to cap.read().
+        ok is False when no new frame arrived since the previous call. The
+        returned array is reused between calls; copy it if it must outlive
+        the next read(). Its capture time is in last_ts.
+        """
+        _, ts, frame = self.buffer.read_latest(out=self._out)
+        if frame is None:
+            return False, None
+        self._out = frame
+        self.last_ts = ts
+        return True, frame
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        if self._thread is not None:
+            try:
+                self._thread.join(timeout)
+            except Exception:
+                pass
+            self._thread = None
+
+    def is_alive(self):
+        return bool(self._thread is not None and self._thread.is_alive())
+
+    def stats(self):
+        s = self.buffer.stats()
+        s["read_failures"] = self.read_failures
+        return s
@@ -1,26 +1,52 @@
 # live_app/detector.py
 import os
 import time
+import math
+from collections import namedtuple
 from urllib.parse import quote
 from datetime import datetime
 
+import cv2
+import numpy as np
+
 # single-send whatsapp helper
 from live_app import whatsapp_pywhat
 
-try:
-    from ultralytics import YOLO
-except Exception:
-    YOLO = None
-
 try:
     import pygame
 except Exception:
     pygame = None
 
 from . import logger as logmod
+from .backends import load_backend, letterbox
 import config
 
 
+# Maps model-input pixels back to normalized frame coordinates:
+#   u = (x - pad_x) / span_x,  v = (y - pad_y) / span_y
+# roi is True when the input was a face crop rather than the full frame;
+# size is the (square) input side in pixels.
+InputTransform = namedtuple("InputTransform", "pad_x pad_y span_x span_y roi size")
+
+
+# All detections of one inference as arrays: cls_ids (N,), confs (N,), boxes (N, 4) xyxy.
+Detections = namedtuple("Detections", "cls_ids confs boxes names")
+EMPTY_DETECTIONS = Detections(np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.float32),
+                              np.zeros((0, 4), dtype=np.float32), {})
+
+# The detection chosen for status/drawing: xyxy (4,) array, conf float, cls int.
+BestBox = namedtuple("BestBox", "xyxy conf cls")
+
+
+def _as_numpy(x):
+    """torch tensor (any device) or array-like -> numpy array."""
+    if hasattr(x, "cpu"):
+        x = x.cpu()
+    if hasattr(x, "numpy"):
+        return x.numpy()
+    return np.asarray(x)
+
+
 class Detector:
     def __init__(self, model_dir=config.MODEL_DIR, sound_dir=config.SOUND_DIR):
         self.model_dir = model_dir
@@ -68,17 +94,33 @@ class Detector:
         self.pending_yawn_time = None
         self.yawn_warning_delay_s = 2
 
+        # inference input size (square); independent of the UI display size
+        self.imgsz = int(getattr(config, "INFERENCE_IMGSZ", 640))
+        self.letterbox_input = bool(getattr(config, "INFERENCE_LETTERBOX", False))
+
+        # face ROI mode: periodic full-frame detection, padded crops in between
+        self.roi_enabled = bool(getattr(config, "ROI_TRACKING", False))
+        self.roi_full_every = max(1, int(getattr(config, "ROI_FULL_EVERY_N", 15)))
+        self.roi_pad = float(getattr(config, "ROI_PAD", 0.35))
+        self.roi_min_imgsz = int(getattr(config, "ROI_MIN_IMGSZ", 128))
+        self._roi_box = None          # last face box, normalized (u1, v1, u2, v2)
+        self._roi_vel = (0.0, 0.0)    # smoothed center motion per result, normalized
+        self._roi_since_full = 0
+        self.roi_stats = {"full": 0, "roi": 0, "lost": 0, "pixels": 0, "full_pixels": 0}
+
         # load model & sounds (best-effort)
         self._load_model_and_sounds()
 
     def _load_model_and_sounds(self):
+        # backend (ultralytics / onnx / openvino) is chosen by config.INFERENCE_BACKEND
         try:
-            model_path = os.path.join(self.model_dir, "final_model.pt")
-            if YOLO is None or not os.path.exists(model_path):
-                raise FileNotFoundError("YOLO model not available or final_model.pt missing.")
-            self.model = YOLO(model_path)
+            self.model = load_backend(self.model_dir)
         except Exception:
             self.model = None
+        # exported graphs with a static input shape dictate the inference size
+        fixed = getattr(self.model, "fixed_imgsz", None)
+        if fixed:
+            self.imgsz = int(fixed)
 
         if pygame is not None:
             try:
@@ -95,43 +137,198 @@ class Detector:
                 self.yawn_warn_sound = None
                 self.drowsy_warn_sound = None
 
+    def set_imgsz(self, imgsz):
+        """Change the inference size (ignored for exported models with a fixed input shape)."""
+        try:
+            if getattr(self.model, "fixed_imgsz", None):
+                return False
+            self.imgsz = max(32, int(imgsz) // 32 * 32)
+            return True
+        except Exception:
+            return False
+
+    def prepare_input(self, frame, buf=None):
+        """
+        Resize a raw capture frame straight to the square model input.
+
+        Returns (input_img, xform) where xform is an InputTransform mapping
+        input pixels back to normalized frame coordinates. The default fast
+        path stretches to imgsz x imgsz (no letterbox), so the backend does
+        not resize or pad again. In ROI mode a padded square crop around the
+        tracked face is returned instead, at the same pixel density.
+        buf: optional callable (h, w) -> preallocated uint8 array to resize into.
+        """
+        sz = int(self.imgsz)
+        h, w = frame.shape[:2]
+        roi = self._next_roi(w, h)
+        if roi is not None:
+            x0, y0, side, rsz = roi
+            crop = frame[y0:y0 + side, x0:x0 + side]
+            img = cv2.resize(crop, (rsz, rsz), dst=buf(rsz, rsz) if buf else None,
+                             interpolation=cv2.INTER_AREA if side > rsz else cv2.INTER_LINEAR)
+            k = rsz / float(side)
+            return img, InputTransform(-x0 * k, -y0 * k, w * k, h * k, True, rsz)
+        if self.letterbox_input:
+            img, r, (pad_x, pad_y) = letterbox(frame, sz)
+            return img, InputTransform(float(pad_x), float(pad_y), w * r, h * r, False, sz)
+        if (w, h) == (sz, sz):
+            img = frame
+        else:
+            img = cv2.resize(frame, (sz, sz), dst=buf(sz, sz) if buf else None,
+                             interpolation=cv2.INTER_AREA if w > sz else cv2.INTER_LINEAR)
+        return img, InputTransform(0.0, 0.0, float(sz), float(sz), False, sz)
+
+    # ---------- face ROI tracking ----------
+    def set_roi_enabled(self, enabled):
+        self.roi_enabled = bool(enabled)
+        self.reset_roi()
+
+    def reset_roi(self):
+        self._roi_box = None
+        self._roi_vel = (0.0, 0.0)
+        self._roi_since_full = 0
+
+    def _roi_supported(self):
+        # fixed-shape exports always run at their own size, so a crop saves nothing
+        return self.model is not None and not getattr(self.model, "fixed_imgsz", None)
+
+    def _next_roi(self, w, h):
+        """
+        Square crop (x0, y0, side, input_size) around the motion-predicted face
+        box, or None when the next inference should use the full frame.
+        """
+        if not self.roi_enabled or self._roi_box is None or not self._roi_supported():
+            return None
+        if self._roi_since_full >= self.roi_full_every:
+            return None
+        u1, v1, u2, v2 = self._roi_box
+        du, dv = self._roi_vel
+        # predict where the face will be and widen the crop by the recent motion
+        cx = ((u1 + u2) / 2.0 + du) * w
+        cy = ((v1 + v2) / 2.0 + dv) * h
+        bw = (u2 - u1) * w; bh = (v2 - v1) * h
+        side = max(bw, bh) * (1.0 + 2.0 * self.roi_pad) + 2.0 * (abs(du) * w + abs(dv) * h)
+        limit = min(w, h)
+        side = int(max(0.2 * limit, min(side, limit)))
+        if side >= 0.9 * limit:
+            return None
+        x0 = int(min(max(0, cx - side / 2.0), w - side))
+        y0 = int(min(max(0, cy - side / 2.0), h - side))
+        # keep the pixel density of the full-frame path
+        rsz = int(math.ceil(side * self.imgsz / float(max(w, h)) / 32.0) * 32)
+        rsz = max(self.roi_min_imgsz, min(rsz, int(self.imgsz)))
+        return x0, y0, side, rsz
+
+    def observe_result(self, best_box, xform):
+        """Feed a finished detection back into the ROI tracker (call on the UI thread)."""
+        if not isinstance(xform, InputTransform):
+            return
+        self.roi_stats["pixels"] += int(xform.size) * int(xform.size)
+        self.roi_stats["full_pixels"] += int(self.imgsz) * int(self.imgsz)
+        if xform.roi:
+            self.roi_stats["roi"] += 1
+            self._roi_since_full += 1
+        else:
+            self.roi_stats["full"] += 1
+            self._roi_since_full = 0
+        if not self.roi_enabled:
+            return
+        if best_box is None:
+            if xform.roi:
+                self.roi_stats["lost"] += 1
+            # face lost: next inference runs on the full frame
+            self.reset_roi()
+            return
+        try:
+            x1, y1, x2, y2 = (float(v) for v in best_box.xyxy)
+        except Exception:
+            self.reset_roi()
+            return
+        box = ((x1 - xform.pad_x) / xform.span_x, (y1 - xform.pad_y) / xform.span_y,
+               (x2 - xform.pad_x) / xform.span_x, (y2 - xform.pad_y) / xform.span_y)
+        if self._roi_box is not None:
+            pcx = (self._roi_box[0] + self._roi_box[2]) / 2.0; pcy = (self._roi_box[1] + self._roi_box[3]) / 2.0
+            ncx = (box[0] + box[2]) / 2.0; ncy = (box[1] + box[3]) / 2.0
+            du, dv = self._roi_vel
+            self._roi_vel = (0.5 * du + 0.5 * (ncx - pcx), 0.5 * dv + 0.5 * (ncy - pcy))
+        self._roi_box = box
+        if xform.roi:
+            # box touching the crop border: the face may be leaving it, re-acquire on the full frame
+            margin = 2.0
+            if x1 < margin or y1 < margin or x2 > xform.size - margin or y2 > xform.size - margin:
+                self._roi_since_full = self.roi_full_every
+
+    def _priority_lut(self, names):
+        """Class id -> priority (yawn > drowsy > attentive > anything else), cached per names mapping."""
+        key = id(names)
+        if getattr(self, "_prio_key", None) != key:
+            rank = {"attentive": 1, "drowsy": 2, "yawn": 3}
+            pairs = list(names.items()) if isinstance(names, dict) else list(enumerate(names or []))
+            lut = np.zeros(max([int(k) for k, _ in pairs] + [0]) + 1, dtype=np.int8)
+            for k, v in pairs:
+                lut[int(k)] = rank.get(str(v), 0)
+            self._prio_key = key
+            self._prio_lut = lut
+        return self._prio_lut
+
     def analyze_frame(self, frame, conf_threshold=0.4):
+        """
+        Run the model and pick the box to report.
+
+        Returns (status, best_box, detections):
+          - status: "yawn" / "drowsy" / "attentive" (priority in that order)
+          - best_box: BestBox(xyxy, conf, cls) for the chosen detection, or None
+          - detections: Detections(cls_ids, confs, boxes, names) numpy arrays
+        """
         results = None
-        detections = []
         if self.model is not None:
             try:
-                results = self.model(frame, conf=conf_threshold, verbose=False)
+                # prepared inputs are square (full frame at imgsz or a smaller ROI crop)
+                h, w = frame.shape[:2]
+                imgsz = h if h == w else self.imgsz
+                results = self.model(frame, conf=conf_threshold, imgsz=imgsz, verbose=False)
             except Exception:
                 results = None
 
-        status = "attentive"
-        best_box = None
-
+        names = getattr(self.model, "names", None) or {}
+        detections = EMPTY_DETECTIONS._replace(names=names)
         if results:
             try:
+                # one bulk device->host conversion per field instead of per box
+                cls_parts, conf_parts, box_parts = [], [], []
                 for r in results:
-                    for box in r.boxes:
-                        cls_idx = int(box.cls[0])
-                        cls_name = self.model.names[cls_idx] if hasattr(self.model, "names") else str(cls_idx)
-                        detections.append((cls_name, box))
+                    b = r.boxes
+                    if b is None or len(b) == 0:
+                        continue
+                    cls_parts.append(_as_numpy(b.cls).reshape(-1))
+                    conf_parts.append(_as_numpy(b.conf).reshape(-1))
+                    box_parts.append(_as_numpy(b.xyxy).reshape(-1, 4))
+                if cls_parts:
+                    detections = Detections(
+                        np.concatenate(cls_parts).astype(np.int64),
+                        np.concatenate(conf_parts).astype(np.float32),
+                        np.concatenate(box_parts).astype(np.float32),
+                        names,
+                    )
             except Exception:
-                detections = []
-
-        yawn_det = next((d for d in detections if d[0] == "yawn"), None)
-        drowsy_det = next((d for d in detections if d[0] == "drowsy"), None)
+                detections = EMPTY_DETECTIONS._replace(names=names)
 
-        if yawn_det:
-            status = "yawn"; best_box = yawn_det[1]
-        elif drowsy_det:
-            status = "drowsy"; best_box = drowsy_det[1]
-        elif detections:
-            att = next((d for d in detections if d[0] == "attentive"), None)
-            if att:
-                status = "attentive"; best_box = att[1]
+        status = "attentive"
+        best_box = None
+        if detections.cls_ids.size:
+            lut = self._priority_lut(names)
+            ids = detections.cls_ids
+            prio = np.where((ids >= 0) & (ids < lut.shape[0]), lut[np.clip(ids, 0, lut.shape[0] - 1)], 0)
+            # highest priority class first, then highest confidence within it
+            i = int(np.lexsort((-detections.confs, -prio))[0])
+            if prio[i] > 0:
+                status = {3: "yawn", 2: "drowsy", 1: "attentive"}[int(prio[i])]
+                best_box = BestBox(detections.boxes[i], float(detections.confs[i]), int(ids[i]))
 
         return status, best_box, detections
 
-    def handle_yawn_logic(self, status, log_file=None, threshold=5, delay_seconds=None):
+    def handle_yawn_logic(self, status, log_file=None, threshold=5, delay_seconds=None, event_time=None):
+        """event_time: interpolated time of a state change on a skipped-frame schedule (defaults to now)."""
         out = {"popup": False, "play_sound": False, "log_entry": None, "pending": False}
         now = time.time()
 
@@ -146,11 +343,12 @@ class Detector:
         if status == "yawn":
             if not self.is_yawning_event:
                 self.is_yawning_event = True
-                if now - self.last_yawn_time > 60:
+                started = event_time if event_time is not None else now
+                if started - self.last_yawn_time > 60:
                     self.yawn_count = 1
                 else:
                     self.yawn_count += 1
-                self.last_yawn_time = now
+                self.last_yawn_time = started
         else:
             self.is_yawning_event = False
 
@@ -269,7 +467,8 @@ class Detector:
         except Exception:
             return False
 
-    def handle_drowsy_logic(self, status, drowsy_limit, log_file=None):
+    def handle_drowsy_logic(self, status, drowsy_limit, log_file=None, event_time=None):
+        """event_time: interpolated time of a state change on a skipped-frame schedule (defaults to now)."""
         out = {"alert": False, "play_sound": False, "log_entry": None}
         try:
             drowsy_limit = int(drowsy_limit)
@@ -291,8 +490,9 @@ class Detector:
             self.alert_start_time = None
             self.alert_grace_start_time = None
             if self.drowsy_start_time is None:
-                self.drowsy_start_time = time.time()
-                self._current_drowsy_streak_start = time.time()
+                started = event_time if event_time is not None else time.time()
+                self.drowsy_start_time = started
+                self._current_drowsy_streak_start = started
 
             dur = time.time() - self.drowsy_start_time
 
@@ -319,7 +519,7 @@ class Detector:
             if self.drowsy_start_time is not None:
                 # If we have been non-drowsy longer than the tiny grace, reset streak
                 if self.alert_grace_start_time is None:
-                    self.alert_grace_start_time = time.time()
+                    self.alert_grace_start_time = event_time if event_time is not None else time.time()
                 if time.time() - self.alert_grace_start_time > grace:
                     self.drowsy_start_time = None
                     self.alert_grace_start_time = None
@@ -0,0 +1,98 @@
+# live_app/display.py
+import time
+
+import numpy as np
+from PIL import Image, ImageTk
+
+
+def _block_image(mode, size):
+    """PIL image stored in one memory block, which PhotoImage.paste() hands to Tk as is."""
+    try:
+        return Image.Image()._new(Image.core.new_block(mode, size))
+    except Exception:
+        # still correct, paste() just converts it into a block every frame
+        return Image.new(mode, size)
+
+
+class DisplaySink:
+    """
+    Renders BGR frames into one persistent Tk PhotoImage.
+
+    The PhotoImage and a staging PIL image of the same mode are created once
+    per video size. The staging image is a single memory block, and each
+    frame is decoded into it in place (frombytes with the raw "BGR" mode:
+    channel swap and copy in one pass). PhotoImage.paste() only builds a new
+    block and converts into it when the image is not a block or its mode
+    differs, so here it passes the staging image straight to Tk. No
+    per-frame PIL/CTkImage objects are built and CustomTkinter never
+    rescales the frame.
+
+    Rendering is throttled to max_fps independently of capture/inference:
+    the caller checks due() before preparing a frame, then calls show().
+    Every show() is timed; frames slower than target_ms are counted.
+    """
+
+    MODE = "RGB"
+
+    def __init__(self, label, max_fps=30, target_ms=2.0):
+        self.label = label
+        self.max_fps = float(max_fps or 0)
+        self.target_ms = float(target_ms or 0)
+        self._photo = None
+        self._pil = None
+        self._size = None
+        self._last_render = 0.0
+
+        # counters
+        self.rendered = 0
+        self.throttled = 0
+        self.over_target = 0
+        self.last_render_ms = 0.0
+        self.avg_render_ms = 0.0
+        self.max_render_ms = 0.0
+
+    def _ensure(self, w, h):
+        if self._size == (w, h):
+            return
+        self._pil = _block_image(self.MODE, (w, h))
+        self._photo = ImageTk.PhotoImage(self.MODE, (w, h))
+        self.label.configure(image=self._photo, text="")
+        self._size = (w, h)
+
+    def due(self, now=None):
+        """True when the throttle allows rendering another frame (skipped frames are counted)."""
+        if self.max_fps <= 0:
+            return True
+        now = time.time() if now is None else now
+        if (now - self._last_render) >= (1.0 / self.max_fps):
+            return True
+        self.throttled += 1
+        return False
+
+    def show(self, frame_bgr):
+        """Render frame_bgr (H, W, 3 uint8); call when due() said so. Returns True when drawn."""
+        t0 = time.perf_counter()
+        h, w = frame_bgr.shape[:2]
+        self._ensure(w, h)
+        self._pil.frombytes(np.ascontiguousarray(frame_bgr), "raw", "BGR")
+        self._photo.paste(self._pil)
+        self._last_render = time.time()
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        self.last_render_ms = dt_ms
+        self.avg_render_ms = dt_ms if self.rendered == 0 else (0.9 * self.avg_render_ms + 0.1 * dt_ms)
+        self.max_render_ms = max(self.max_render_ms, dt_ms)
+        if self.target_ms > 0 and dt_ms > self.target_ms:
+            self.over_target += 1
+        self.rendered += 1
+        return True
+
+    def stats(self):
+        return {
+            "rendered": self.rendered,
+            "throttled": self.throttled,
+            "target_ms": self.target_ms,
+            "over_target": self.over_target,
+            "last_render_ms": round(self.last_render_ms, 3),
+            "avg_render_ms": round(self.avg_render_ms, 3),
+            "max_render_ms": round(self.max_render_ms, 3),
+        }
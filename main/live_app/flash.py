@@ -72,7 +72,7 @@ class FlashController:
     def _is_dark_condition(self, last_frame):
         """
         Heuristic: dark if time is night or frame mean below threshold.
-        last_frame: BGR numpy array or None
+        last_frame: the full BGR camera frame (or a grayscale plane of it), or None
         """
         try:
             now = datetime.now().time()
@@ -88,8 +88,10 @@ class FlashController:
         try:
             if last_frame is None:
                 return False
-            g = cv2.cvtColor(last_frame, cv2.COLOR_BGR2GRAY)
-            return float(g.mean()) < 60.0
+            # luma of the mean == mean of the luma, so no gray plane has to be allocated
+            b, g, r = cv2.mean(last_frame)[:3]
+            luma = b if last_frame.ndim == 2 else 0.114 * b + 0.587 * g + 0.299 * r
+            return float(luma) < 60.0
         except Exception:
             return False
 
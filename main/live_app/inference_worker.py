@@ -0,0 +1,137 @@
+# live_app/inference_worker.py
+import queue
+import threading
+import time
+
+
+class InferenceWorker:
+    """
+    Runs Detector.analyze_frame on a background thread.
+
+    The request queue is bounded (one pending frame by default); submitting
+    while the worker is still busy replaces nothing and simply skips the
+    frame, so the UI never builds up a backlog. Results are published to a
+    single latest-result slot that the UI polls without blocking.
+    """
+
+    def __init__(self, detector, max_pending=1):
+        self.detector = detector
+        self._requests = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._result_lock = threading.Lock()
+        self._result = None
+        self._result_seq = 0
+        self._polled_seq = 0
+        self._running = False
+        self._thread = None
+
+        # counters
+        self.submitted = 0
+        self.skipped = 0
+        self.completed = 0
+        self.errors = 0
+        self.last_inference_ms = 0.0
+        self.avg_inference_ms = 0.0
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="InferenceWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        try:
+            # wake the worker if it is waiting for a request
+            self._requests.put_nowait(None)
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            try:
+                self._thread.join(timeout)
+            except Exception:
+                pass
+            self._thread = None
+
+    def ready(self):
+        """
+        True when submit() would accept a frame now; check it before
+        preparing one. A busy worker counts the frame as skipped. Only the
+        caller's thread submits, so the answer holds until its next submit().
+        """
+        if self._running and not self._requests.full():
+            return True
+        self.skipped += 1
+        return False
+
+    def submit(self, frame, conf_threshold=0.4, tag=None, captured_at=None):
+        """
+        Offer a frame for inference. Returns False (frame skipped) when the
+        worker still has a pending request. The frame must not be mutated by
+        the caller after a successful submit. captured_at is the camera
+        timestamp of the frame (defaults to the submit time).
+        """
+        if not self._running:
+            return False
+        now = time.time()
+        try:
+            self._requests.put_nowait((frame, conf_threshold, tag, now, now if captured_at is None else captured_at))
+            self.submitted += 1
+            return True
+        except queue.Full:
+            self.skipped += 1
+            return False
+
+    def poll(self):
+        """
+        Non-blocking: return the newest result dict if one arrived since the
+        previous poll, else None. Result keys: status, best_box, detections,
+        tag, submitted_at, captured_at, inference_ms.
+        """
+        with self._result_lock:
+            if self._result is None or self._result_seq == self._polled_seq:
+                return None
+            self._polled_seq = self._result_seq
+            return self._result
+
+    def _run(self):
+        while self._running:
+            try:
+                item = self._requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                continue
+            frame, conf_threshold, tag, submitted_at, captured_at = item
+            t0 = time.perf_counter()
+            try:
+                status, best_box, detections = self.detector.analyze_frame(frame, conf_threshold=conf_threshold)
+            except Exception:
+                self.errors += 1
+                continue
+            dt_ms = (time.perf_counter() - t0) * 1000.0
+            self.last_inference_ms = dt_ms
+            # exponential moving average of inference cost
+            self.avg_inference_ms = dt_ms if self.completed == 0 else (0.9 * self.avg_inference_ms + 0.1 * dt_ms)
+            self.completed += 1
+            with self._result_lock:
+                self._result = {
+                    "status": status,
+                    "best_box": best_box,
+                    "detections": detections,
+                    "tag": tag,
+                    "submitted_at": submitted_at,
+                    "captured_at": captured_at,
+                    "inference_ms": dt_ms,
+                }
+                self._result_seq += 1
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "errors": self.errors,
+            "last_inference_ms": round(self.last_inference_ms, 2),
+            "avg_inference_ms": round(self.avg_inference_ms, 2),
+        }
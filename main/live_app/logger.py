@@ -1,19 +1,216 @@
 # live_app/logger.py
+import atexit
+import codecs
 import csv
+import io
 import os
+import queue
+import threading
 import time
 from datetime import datetime
 from typing import Optional, List
 
+import config
+from utils.binlog import (BinaryTripLog, sidecar_path, reset_sidecar, classify_state, EVENT_NAMES, HEADER_SIZE,
+                          RECORD_SIZE, STATE_ATTENTIVE, STATE_YAWN, STATE_DROWSY)
+from utils.log_reader import open_log, forget as forget_reader, parse_time
+from utils.trip_index import get_index
+
+
+class TripLogWriter:
+    """
+    Buffered, asynchronous CSV writer for one trip log.
+
+    Rows are enqueued from any thread and written by a background thread
+    through a single open file handle, in batches: whenever `batch_size`
+    rows are pending or `flush_interval_s` has passed. flush(fsync=True)
+    forces the batch (and an os.fsync) out, optionally waiting for it.
+    The frame loop therefore never blocks on disk I/O.
+
+    With config.TRIP_LOG_BINARY the same batches are also appended to a
+    fixed-width binary sidecar (utils/binlog.py) that analytics loads
+    without parsing text. After each batch reaches the file, the trip
+    index (utils/trip_index.py) gets the new rows' counters and rollups.
+    """
+
+    def __init__(self, path: str, batch_size: int = None, flush_interval_s: float = None):
+        self.path = path
+        self.batch_size = int(batch_size or getattr(config, "LOG_BATCH_SIZE", 64))
+        self.flush_interval_s = float(flush_interval_s or getattr(config, "LOG_FLUSH_INTERVAL_S", 2.0))
+        self._q = queue.SimpleQueue()
+        self._closed = False
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+        try:
+            self._fh = open(path, 'a', newline='', encoding='utf-8')
+        except Exception:
+            self._fh = open(path, 'a', newline='')
+        self._writer = csv.writer(self._fh)
+        self._index = get_index()
+        self._bin = None
+        if getattr(config, "TRIP_LOG_BINARY", True):
+            try:
+                self._bin = BinaryTripLog(sidecar_path(path))
+            except Exception:
+                self._bin = None
+        self._thread = threading.Thread(target=self._run, name="TripLogWriter", daemon=True)
+        self._thread.start()
+
+    def write_row(self, row, t: float = None):
+        """row = [Timestamp, EventType, Details]; t = epoch seconds for the binary sidecar."""
+        if not self._closed:
+            self._q.put(("row", (row, time.time() if t is None else t)))
+
+    def flush(self, fsync: bool = False, wait: bool = False, timeout: float = 5.0):
+        """Write out pending rows now. With wait=True, block until done."""
+        if self._closed:
+            return
+        done = threading.Event() if wait else None
+        self._q.put(("flush", (fsync, done)))
+        if done is not None:
+            done.wait(timeout)
+
+    def close(self, fsync: bool = True, timeout: float = 5.0):
+        """Flush, fsync and close the file; blocks until the writer thread is done."""
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(("close", fsync))
+        self._thread.join(timeout)
+
+    def _write_batch(self, batch, fsync=False):
+        rows = [row for row, _ in batch]
+        start = end = None
+        if batch:
+            try:
+                start = self._fh.tell()
+                self._writer.writerows(rows)
+                self.rows_written += len(batch)
+            except Exception:
+                self.errors += 1
+            if self._bin is not None:
+                try:
+                    self._bin.append_many([(t, row[1], row[2]) for row, t in batch])
+                except Exception:
+                    self.errors += 1
+            batch.clear()
+        try:
+            self._fh.flush()
+            if fsync:
+                os.fsync(self._fh.fileno())
+            if self._bin is not None:
+                self._bin.flush(fsync=fsync)
+            self.flushes += 1
+            if start is not None:
+                end = self._fh.tell()
+        except Exception:
+            self.errors += 1
+        if rows and self._index is not None:
+            try:
+                # byte range lets the index skip rows a concurrent sync_logs already counted
+                self._index.record_log_rows(self.path, rows, start, end)
+            except Exception:
+                self.errors += 1
+
+    def _run(self):
+        batch = []
+        last_flush = time.time()
+        while True:
+            timeout = max(0.05, self.flush_interval_s - (time.time() - last_flush))
+            try:
+                kind, payload = self._q.get(timeout=timeout)
+            except queue.Empty:
+                kind, payload = None, None
+
+            if kind == "row":
+                batch.append(payload)
+                if len(batch) < self.batch_size and (time.time() - last_flush) < self.flush_interval_s:
+                    continue
+                self._write_batch(batch)
+            elif kind == "flush":
+                fsync, done = payload
+                self._write_batch(batch, fsync=fsync)
+                if done is not None:
+                    done.set()
+            elif kind == "close":
+                self._write_batch(batch, fsync=bool(payload))
+                try:
+                    self._fh.close()
+                except Exception:
+                    pass
+                if self._bin is not None:
+                    self._bin.close()
+                return
+            else:
+                # idle timeout: flush whatever is pending
+                if batch:
+                    self._write_batch(batch)
+            last_flush = time.time()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(log_file: str) -> TripLogWriter:
+    """Return the shared writer for a log file, creating it on first use."""
+    with _writers_lock:
+        w = _writers.get(log_file)
+        if w is None:
+            w = TripLogWriter(log_file)
+            _writers[log_file] = w
+        return w
+
+
+def flush_log(log_file: Optional[str], fsync: bool = False, wait: bool = True):
+    """Make all rows appended so far visible on disk (e.g. before reading the CSV)."""
+    if not log_file:
+        return
+    with _writers_lock:
+        w = _writers.get(log_file)
+    if w is not None:
+        w.flush(fsync=fsync, wait=wait)
+
+
+def close_log(log_file: Optional[str], fsync: bool = True):
+    """Flush, fsync and close the writer for a log file (end of trip)."""
+    if not log_file:
+        return
+    with _writers_lock:
+        w = _writers.pop(log_file, None)
+    if w is not None:
+        w.close(fsync=fsync)
+
+
+@atexit.register
+def _close_all_writers():
+    # make sure buffered rows reach the disk even if the app exits abnormally
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for w in writers:
+        try:
+            w.close(fsync=True, timeout=2.0)
+        except Exception:
+            pass
+
+
 def create_log_file(log_dir: str, start_timestamp: str, header: List[str] = None) -> str:
     """
     Create a CSV log file with a header. Default header includes Timestamp, EventType, Details.
+    An existing log of the same name is truncated together with its binary
+    sidecar, so summarize_log / analytics never read the old trip's records.
     Returns full path.
     """
     header = header or ['Timestamp', 'EventType', 'Details']
     os.makedirs(log_dir, exist_ok=True)
     log_filename = f"Trip_Log_{start_timestamp}.csv"
     path = os.path.join(log_dir, log_filename)
+    sidecar = sidecar_path(path)
+    # unmap shared readers of a previous log with this name before truncating it
+    forget_reader(path)
+    forget_reader(sidecar)
     try:
         with open(path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
@@ -26,63 +223,187 @@ def create_log_file(log_dir: str, start_timestamp: str, header: List[str] = None
                 writer.writerow(header)
         except Exception:
             pass
+    try:
+        if getattr(config, "TRIP_LOG_BINARY", True):
+            reset_sidecar(sidecar)
+        elif os.path.exists(sidecar):
+            os.remove(sidecar)
+    except Exception:
+        pass
     return path
 
 def append_log_event(log_file: Optional[str], event_type: str, details: str = ""):
     """
     Append a single event row. Use for occasional events (start/end/warnings).
+    The row is queued on the trip's TripLogWriter; Trip_End forces a flush + fsync.
     """
     if not log_file:
         return
     try:
-        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([ts, event_type, details])
+        now = time.time()
+        ts = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+        w = get_writer(log_file)
+        w.write_row([ts, event_type, details], t=now)
+        if event_type == "Trip_End":
+            w.flush(fsync=True)
     except Exception:
-        try:
-            ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([ts, event_type, details])
-        except Exception:
-            pass
+        pass
 
 def append_state_sample(log_file: Optional[str], state: str):
     """
     Append a per-second state sample to the CSV log.
     Writes a row with: Timestamp, EventType='State', Details=<state>.
-    Designed to be cheap and resilient when called at ~1Hz from the detection loop.
+    Only enqueues the row, so it is safe to call at ~1Hz from the detection loop.
     """
     if not log_file:
         return
     try:
-        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([ts, "State", state])
+        now = time.time()
+        ts = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+        get_writer(log_file).write_row([ts, "State", state], t=now)
     except Exception:
-        try:
-            ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            with open(log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([ts, "State", state])
-        except Exception:
-            pass
+        pass
+
+class _TripStats:
+    """
+    Summary of a trip log from one streaming pass over its rows: time spent
+    in each state, the longest drowsy streak and event counts. A state
+    sample holds until the next one (gaps over max_gap_s, e.g. a pause,
+    are not counted).
+    """
+
+    def __init__(self, max_gap_s: float):
+        self.max_gap_s = max_gap_s
+        self.durations = {STATE_ATTENTIVE: 0.0, STATE_YAWN: 0.0, STATE_DROWSY: 0.0}
+        self.longest_drowsy_s = 0.0
+        self.events = {}
+        self.rows = 0
+        self.first = None
+        self.last = None
+        self._prev = None       # (t, state) of the previous state sample
+        self._streak = 0.0
+
+    def add(self, t: Optional[float], event: str, state: int):
+        self.rows += 1
+        self.events[event] = self.events.get(event, 0) + 1
+        if t is None:
+            return
+        if self.first is None or t < self.first:
+            self.first = t
+        if self.last is None or t > self.last:
+            self.last = t
+        if event != "State" or not state:
+            return
+        if self._prev is not None:
+            pt, ps = self._prev
+            gap = t - pt
+            ok = 0 <= gap <= self.max_gap_s
+            if ok and ps in self.durations:
+                self.durations[ps] += gap
+                if ps == STATE_DROWSY:
+                    self._streak += gap
+            if not ok or state != STATE_DROWSY:
+                self.longest_drowsy_s = max(self.longest_drowsy_s, self._streak)
+                self._streak = 0.0
+        self._prev = (t, state)
+
+    def finish(self):
+        self.longest_drowsy_s = max(self.longest_drowsy_s, self._streak)
+        self._streak = 0.0
+        return self
+
+
+def _row_epoch(ts: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(ts.strip()).timestamp()
+    except ValueError:
+        t = parse_time(ts)
+        return t.timestamp() if isinstance(t, datetime) else None
+
+
+def summarize_log(log_file: Optional[str], chunk_bytes: int = None) -> _TripStats:
+    """
+    Trip statistics in a single pass over the log, chunk_bytes at a time:
+    the fixed-width .tlb sidecar when there is one, else the CSV.
+    """
+    stats = _TripStats(float(getattr(config, "REPORT_MAX_SAMPLE_GAP_S", 5.0)))
+    if not log_file:
+        return stats
+    chunk_bytes = int(chunk_bytes or getattr(config, "REPORT_CHUNK_BYTES", 1 << 20))
+    try:
+        tlb = sidecar_path(log_file)
+        if os.path.exists(tlb) and os.path.getsize(tlb) > HEADER_SIZE:
+            rec = open_log(tlb).records()
+            step = max(1, chunk_bytes // RECORD_SIZE)
+            for i in range(0, len(rec), step):
+                part = rec[i:i + step]
+                for ts_ms, ev, st in zip(part["ts_ms"].tolist(), part["event"].tolist(), part["state"].tolist()):
+                    stats.add(ts_ms / 1000.0, EVENT_NAMES[ev] if ev < len(EVENT_NAMES) else "", st)
+            return stats.finish()
+        if not os.path.exists(log_file):
+            return stats
+        reader = open_log(log_file, background=False)
+        header = True
+        for chunk in reader.iter_chunks(chunk_bytes):
+            lines = bytes(chunk).decode("utf-8", errors="replace").splitlines()
+            if header:
+                lines, header = lines[1:], False
+            for row in csv.reader(lines):
+                if len(row) < 2:
+                    continue
+                details = row[2] if len(row) > 2 else ""
+                stats.add(_row_epoch(row[0]), row[1], classify_state(details) if row[1] == "State" else 0)
+    except Exception:
+        pass
+    return stats.finish()
+
+
+def _stats_section(stats: _TripStats, drive_s: float, yawn_warning_count: int, drowsy_warning_count: int) -> str:
+    tracked = sum(stats.durations.values())
+    lines = ["--- Driver State Summary ---"]
+    if stats.first is not None and stats.last is not None:
+        lines.append(f"  - Logged: {datetime.fromtimestamp(stats.first):%Y-%m-%d %H:%M:%S} - "
+                     f"{datetime.fromtimestamp(stats.last):%H:%M:%S} ({stats.rows} rows)")
+    for code, label in ((STATE_ATTENTIVE, "Attentive"), (STATE_YAWN, "Yawn"), (STATE_DROWSY, "Drowsy")):
+        d = stats.durations[code]
+        pct = 100.0 * d / tracked if tracked > 0 else 0.0
+        lines.append(f"  - {label}: {d / 60.0:.2f} min ({pct:.1f}%)")
+    lines.append(f"  - Longest Drowsy Streak: {stats.longest_drowsy_s:.0f} s")
+    hours = drive_s / 3600.0
+    if hours > 0:
+        lines.append(f"  - Warnings per Hour: {(yawn_warning_count + drowsy_warning_count) / hours:.2f} "
+                     f"(yawn {yawn_warning_count / hours:.2f}, drowsy {drowsy_warning_count / hours:.2f})")
+    return "\n".join(lines) + "\n"
+
 
 def generate_report(report_dir: str, report_filename_prefix: str, log_file: Optional[str],
-                    yawn_warning_count: int, drowsy_warning_count: int, start_time: float) -> str:
+                    yawn_warning_count: int, drowsy_warning_count: int, start_time: float,
+                    end_time: float = None) -> str:
     """
     Create a textual trip report and return its path.
+
+    Statistics come from one streaming pass over the log (summarize_log).
+    With config.REPORT_LOG_MODE = "embed" the log is copied below them in
+    REPORT_CHUNK_BYTES slices of the mapped file, decoded and written through
+    the text layer like the rest of the report, so the whole file has the
+    platform's line endings (the CSV rows are \r\n); "reference" only names it.
+    Slow for long trips: the UI runs it through ReportJob.
     """
     os.makedirs(report_dir, exist_ok=True)
     start_ts = report_filename_prefix
     report_filename = f"Trip_Report_{start_ts}.txt"
     report_path = os.path.join(report_dir, report_filename)
 
-    total_time_min = (time.time() - start_time) / 60.0 if start_time else 0.0
+    end_time = end_time or time.time()
+    drive_s = (end_time - start_time) if start_time else 0.0
+    total_time_min = drive_s / 60.0
     safety_score = max(0, 100 - (yawn_warning_count * 5) - (drowsy_warning_count * 10))
 
+    # rows may still be buffered in the trip's writer
+    flush_log(log_file)
+    stats = summarize_log(log_file)
+    embed = str(getattr(config, "REPORT_LOG_MODE", "embed")).lower() != "reference"
+
     report_str = (
         f"\n{'='*30}\n"
         f"     TRIP SAFETY REPORT\n"
@@ -92,6 +413,7 @@ def generate_report(report_dir: str, report_filename_prefix: str, log_file: Opti
         f"--- Total Incidents Logged ---\n"
         f"  - Yawn Warnings: {yawn_warning_count}\n"
         f"  - Drowsy Warnings: {drowsy_warning_count}\n\n"
+        f"{_stats_section(stats, drive_s, yawn_warning_count, drowsy_warning_count)}\n"
         f"Full event log saved to: {log_file}\n"
         f"{'='*30}\n"
     )
@@ -99,17 +421,68 @@ def generate_report(report_dir: str, report_filename_prefix: str, log_file: Opti
     try:
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(report_str.replace("="*30, "-"*30))
-            f.write("\n--- Full Event Log ---\n")
-            if log_file and os.path.exists(log_file):
+            if embed and log_file and os.path.exists(log_file):
+                f.write("\n--- Full Event Log ---\n")
                 try:
-                    with open(log_file, 'r', encoding='utf-8') as csv_file:
-                        f.write(csv_file.read())
+                    reader = open_log(log_file, background=False)
+                    # \r\n -> \n even when a chunk ends between the two
+                    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), True)
+                    for chunk in reader.iter_chunks(int(getattr(config, "REPORT_CHUNK_BYTES", 1 << 20))):
+                        f.write(decoder.decode(chunk))
+                    f.write(decoder.decode(b"", final=True))
                 except Exception:
-                    try:
-                        with open(log_file, 'r') as csv_file:
-                            f.write(csv_file.read())
-                    except Exception:
-                        f.write("Could not read log file contents.\n")
+                    f.write("Could not read log file contents.\n")
+        idx = get_index()
+        if idx is not None:
+            try:
+                idx.record_report(report_path, log_file, yawn_warning_count, drowsy_warning_count,
+                                  drive_s, safety_score)
+            except Exception:
+                pass
         return report_path
     except Exception:
         return ""
+
+
+class ReportJob:
+    """
+    End-of-trip work off the Tk thread: close (flush + fsync) the trip's log,
+    then generate_report. when_done() polls with widget.after() and calls
+    back on the Tk thread, like InferenceWorker.poll.
+    """
+
+    def __init__(self, report_dir: str, report_filename_prefix: str, log_file: Optional[str],
+                 yawn_warning_count: int, drowsy_warning_count: int, start_time: float):
+        self.args = (report_dir, report_filename_prefix, log_file, yawn_warning_count, drowsy_warning_count, start_time)
+        self.log_file = log_file
+        self.end_time = time.time()
+        self.result = None
+        self.error = None
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="ReportJob", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            close_log(self.log_file)
+            self.result = generate_report(*self.args, end_time=self.end_time)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def when_done(self, widget, callback, interval_ms: int = 100):
+        """callback(report_path or "") on the Tk thread once the report is written."""
+        def poll():
+            if not self.done:
+                widget.after(interval_ms, poll)
+                return
+            try:
+                callback(self.result or "")
+            except Exception:
+                pass
+        widget.after(interval_ms, poll)
+        return self
@@ -0,0 +1,72 @@
+# live_app/preprocess.py
+import numpy as np
+import cv2
+
+
+class FramePreprocessor:
+    """
+    Frame-loop preprocessing with preallocated output buffers.
+
+    Every OpenCV call writes through `dst=` into a buffer that is allocated
+    once (and again only when the size changes), so the steady-state loop
+    does not allocate full frames:
+
+      - model input: resize -> gray -> equalizeHist -> BGR, the BGR result
+        comes from a small rotating pool because the inference worker may
+        still hold the previous one or two submitted frames
+      - display: one resize into a persistent display buffer
+
+    The caller checks that the inference worker can take a frame before
+    asking for a model input, so no frame is preprocessed only to be dropped.
+    """
+
+    def __init__(self, pool_size=3):
+        self.pool_size = max(3, int(pool_size))
+        self._bufs = {}
+        self._pool_idx = 0
+
+    def buffer(self, key, shape, dtype=np.uint8):
+        """Persistent buffer for key, reallocated only when shape/dtype change."""
+        buf = self._bufs.get(key)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._bufs[key] = buf
+        return buf
+
+    def _resize_buffer(self, h, w):
+        # separate slot per size so ROI crops and full frames do not thrash one buffer
+        return self.buffer(("inp", h, w), (h, w, 3))
+
+    def model_input(self, detector, frame):
+        """
+        Returns (proc, xform): the equalized 3-channel model input and the
+        InputTransform from Detector.prepare_input.
+        """
+        inp, xform = detector.prepare_input(frame, buf=self._resize_buffer)
+        h, w = inp.shape[:2]
+        gray = self.buffer(("gray", h, w), (h, w))
+        cv2.cvtColor(inp, cv2.COLOR_BGR2GRAY, dst=gray)
+        eq = self.buffer(("eq", h, w), (h, w))
+        cv2.equalizeHist(gray, dst=eq)
+        proc = self.buffer(("proc", self._pool_idx, h, w), (h, w, 3))
+        cv2.cvtColor(eq, cv2.COLOR_GRAY2BGR, dst=proc)
+        return proc, xform
+
+    def commit_submitted(self):
+        """Call after the last model_input() result was handed to the worker."""
+        self._pool_idx = (self._pool_idx + 1) % self.pool_size
+
+    def display(self, frame, width, height):
+        """Resize the raw frame into the persistent display buffer."""
+        out = self.buffer("display", (height, width, 3))
+        if frame.shape[:2] == (height, width):
+            np.copyto(out, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=out, interpolation=cv2.INTER_LINEAR)
+        return out
+
+    def overlay(self, frame):
+        """Scratch copy of frame for alpha-blended overlays."""
+        out = self.buffer("overlay", frame.shape, frame.dtype)
+        np.copyto(out, frame)
+        return out
@@ -0,0 +1,120 @@
+# live_app/scheduler.py
+import math
+import time
+
+import config
+
+
+class InferenceScheduler:
+    """
+    Decides on which frame-loop ticks the model should run.
+
+    The model runs every N ticks. N follows the measured inference cost (so
+    inference stays within a CPU budget) and drops to 1 while something
+    time-critical is in progress (drowsy streak, yawn, pending yawn warning).
+    Skipped ticks reuse the last status (zero-order hold). When a new result
+    changes the state, the transition is placed halfway between the two
+    samples, which halves the timing bias introduced by skipping.
+
+    stats() reports the inference rate and the transition uncertainty
+    (gap between the samples bracketing each state change), which bounds how
+    far alert timing can drift compared with running on every frame.
+    """
+
+    def __init__(self, max_skip=None, cpu_budget=None, enabled=None):
+        self.enabled = bool(getattr(config, "SCHED_ENABLED", True) if enabled is None else enabled)
+        self.max_skip = max(1, int(max_skip or getattr(config, "SCHED_MAX_SKIP", 4)))
+        self.cpu_budget = float(cpu_budget or getattr(config, "SCHED_CPU_BUDGET", 0.5))
+        self.reset()
+
+    def reset(self):
+        self.n = 1
+        self._since_run = 0
+        self._tick_ms = None
+        self._last_tick = None
+        self._infer_ms = None
+
+        # last result sample (capture time, status) for transition interpolation
+        self._last_sample_ts = None
+        self._last_status = None
+
+        # counters
+        self.ticks = 0
+        self.runs = 0
+        self.transitions = 0
+        self._gap_sum_ms = 0.0
+        self._gap_max_ms = 0.0
+
+    def tick(self, now=None):
+        """Call once per frame-loop tick; updates the measured tick period."""
+        now = time.time() if now is None else now
+        if self._last_tick is not None:
+            dt_ms = (now - self._last_tick) * 1000.0
+            self._tick_ms = dt_ms if self._tick_ms is None else (0.9 * self._tick_ms + 0.1 * dt_ms)
+        self._last_tick = now
+        self.ticks += 1
+        self._since_run += 1
+
+    def _critical(self, detector):
+        try:
+            return (detector.drowsy_start_time is not None
+                    or bool(detector.is_yawning_event)
+                    or detector.pending_yawn_time is not None
+                    or bool(detector.is_drowsy_alert_playing))
+        except Exception:
+            return False
+
+    def _adapt(self, detector, avg_inference_ms):
+        if avg_inference_ms:
+            self._infer_ms = float(avg_inference_ms)
+        if not self.enabled or self._critical(detector):
+            self.n = 1
+            return
+        if not self._infer_ms or not self._tick_ms:
+            self.n = 1
+            return
+        # run at most once per (inference time / budget)
+        period_ms = self._infer_ms / max(0.05, self.cpu_budget)
+        self.n = int(min(self.max_skip, max(1, math.ceil(period_ms / self._tick_ms))))
+
+    def should_run(self, detector, avg_inference_ms=None):
+        """True when this tick should submit a frame for inference."""
+        self._adapt(detector, avg_inference_ms)
+        return self._since_run >= self.n
+
+    def mark_submitted(self):
+        self._since_run = 0
+        self.runs += 1
+
+    def on_result(self, status, captured_at):
+        """
+        Register a finished result. Returns the interpolated time at which the
+        state changed (midpoint between the previous and this sample), or
+        None when the state did not change.
+        """
+        event_time = None
+        if self._last_status is not None and status != self._last_status and self._last_sample_ts is not None:
+            gap = max(0.0, captured_at - self._last_sample_ts)
+            event_time = self._last_sample_ts + gap / 2.0
+            self.transitions += 1
+            self._gap_sum_ms += gap * 1000.0
+            self._gap_max_ms = max(self._gap_max_ms, gap * 1000.0)
+        self._last_status = status
+        self._last_sample_ts = captured_at
+        return event_time
+
+    def stats(self):
+        tick_ms = self._tick_ms or 0.0
+        mean_gap = (self._gap_sum_ms / self.transitions) if self.transitions else 0.0
+        return {
+            "n": self.n,
+            "ticks": self.ticks,
+            "runs": self.runs,
+            "run_ratio": round(self.runs / float(self.ticks), 3) if self.ticks else 0.0,
+            "tick_ms": round(tick_ms, 2),
+            "transitions": self.transitions,
+            "mean_transition_gap_ms": round(mean_gap, 1),
+            "max_transition_gap_ms": round(self._gap_max_ms, 1),
+            # alert timing error is at most half the bracketing gap
+            "max_timing_error_frames": round((self._gap_max_ms / 2.0) / tick_ms, 2) if tick_ms else 0.0,
+        }
@@ -4,11 +4,15 @@ import time
 import cv2
 import customtkinter as ctk
 import tkinter as tk
-from PIL import Image
 from datetime import datetime
 from collections import deque
 
 from .detector import Detector, get_ip_location
+from .capture import CaptureThread
+from .inference_worker import InferenceWorker
+from .scheduler import InferenceScheduler
+from .preprocess import FramePreprocessor
+from .display import DisplaySink
 from .flash import FlashController
 from .break_timer import BreakTimer
 from . import logger as logmod
@@ -77,8 +81,22 @@ class DrowsinessFrame(ctk.CTkFrame):
         self.base_video_height = video_height
         self.video_width = video_width
         self.video_height = video_height
+
+        # preallocated frame buffers
+        self.pre = FramePreprocessor()
+        # newest full camera frame (capture's reused buffer, not a copy) for the flash brightness check
         self._last_frame_for_brightness = None
 
+        # camera + background capture thread (created in start_detection)
+        self.cap = None
+        self.capture = None
+
+        # background inference; the frame loop keeps the last result between detections
+        self.infer = None
+        self.scheduler = InferenceScheduler()
+        self._last_result = ("attentive", None, None)
+        self._last_xform = None
+
         # detection flags
         self.detection_enabled = False
         self.paused = False
@@ -132,7 +150,10 @@ class DrowsinessFrame(ctk.CTkFrame):
 
         # video panel
         self.video_panel = ctk.CTkFrame(self, fg_color="black"); self.video_panel.pack(fill="both", expand=True, padx=8, pady=8)
-        self.video_label = ctk.CTkLabel(self.video_panel, text=""); self.video_label.pack(expand=True, fill="both")
+        # plain tk.Label: frames are pasted into one persistent PhotoImage (see DisplaySink)
+        self.video_label = tk.Label(self.video_panel, text="", bg="black", fg="white", bd=0, highlightthickness=0); self.video_label.pack(expand=True, fill="both")
+        self.display = DisplaySink(self.video_label, max_fps=getattr(config, "DISPLAY_MAX_FPS", 30),
+                                   target_ms=getattr(config, "DISPLAY_RENDER_TARGET_MS", 2.0))
 
         # --- Right side control panel ---
         self.right_panel = ctk.CTkFrame(self, width=320)
@@ -170,6 +191,18 @@ class DrowsinessFrame(ctk.CTkFrame):
         self.btn_apply_conf = ctk.CTkButton(self.right_panel, text='Apply Confidence', command=self.apply_confidence)
         self.btn_apply_conf.pack(pady=6, padx=6)
 
+        # Inference resolution (independent of the display zoom)
+        ctk.CTkLabel(self.right_panel, text='Inference Size (px)').pack(pady=(8,2))
+        self.imgsz_combo = ctk.CTkComboBox(self.right_panel, values=["320", "416", "480", "640"], width=120, command=self.apply_imgsz)
+        self.imgsz_combo.set(str(getattr(self.detector, "imgsz", 640)))
+        self.imgsz_combo.pack(pady=4, padx=6)
+
+        # Face ROI tracking: crop inference to the tracked face between full-frame detections
+        self.chk_roi_var = tk.IntVar(value=1 if getattr(self.detector, "roi_enabled", False) else 0)
+        self.chk_roi = ctk.CTkCheckBox(self.right_panel, text='Face ROI Tracking', variable=self.chk_roi_var, onvalue=1, offvalue=0,
+                                       command=lambda: self.detector.set_roi_enabled(bool(self.chk_roi_var.get())))
+        self.chk_roi.pack(pady=4)
+
 
         # status area
         status = ctk.CTkFrame(self); status.pack(fill="x", padx=8, pady=(0,8))
@@ -235,6 +268,16 @@ class DrowsinessFrame(ctk.CTkFrame):
         except Exception as e:
             CTkMessagebox(self, "Camera Error", str(e)); return
 
+        # drain the camera on a background thread; the frame loop only takes the newest frame
+        self.capture = CaptureThread(self.cap, slots=getattr(config, "CAPTURE_RING_SLOTS", 3))
+        self.capture.start()
+
+        self._last_result = ("attentive", None, None)
+        self._last_xform = None
+        self.infer = InferenceWorker(self.detector)
+        self.infer.start()
+        self.scheduler.reset()
+
         # log file
         self.log_file = logmod.create_log_file(self.log_dir, self.start_timestamp, header=self.log_header)
         self.detection_enabled = True; self.paused = False
@@ -245,7 +288,7 @@ class DrowsinessFrame(ctk.CTkFrame):
         self._last_state_sample_ts = 0.0
 
         # start helper loops
-        try: self.flash.start_loop(lambda: getattr(self, "_last_frame_for_brightness", None))
+        try: self.flash.start_loop(lambda: self._last_frame_for_brightness)
         except Exception: pass
         try: self.start_flash_if_night()
         except Exception: pass
@@ -268,15 +311,13 @@ class DrowsinessFrame(ctk.CTkFrame):
         try: logmod.append_log_event(self.log_file, "Trip_End", "System disengaged.")
         except Exception: pass
 
+        # closing the log and writing the report can take a while on long trips: done off the Tk thread
         try:
-            report_path = logmod.generate_report(self.report_dir, self.start_timestamp, self.log_file,
-                                                 self.detector.yawn_warning_count, self.detector.drowsy_warning_count, self.start_time)
-        except Exception:
-            report_path = "(report error)"
-        try:
-            CTkMessagebox(self, "Report Saved", f"Report saved to:\n{report_path}")
+            logmod.ReportJob(self.report_dir, self.start_timestamp, self.log_file,
+                             self.detector.yawn_warning_count, self.detector.drowsy_warning_count,
+                             self.start_time).start().when_done(self, self._on_report_done)
         except Exception:
-            pass
+            self._on_report_done("")
 
         # compute metrics and callback
         metrics = self.detector.compute_fatigue_metrics(alert_samples_deque=self._alert_samples)
@@ -289,7 +330,23 @@ class DrowsinessFrame(ctk.CTkFrame):
         try: self.status_label.configure(text="STATUS: stopped")
         except Exception: pass
 
+    def _on_report_done(self, report_path):
+        try:
+            CTkMessagebox(self, "Report Saved", f"Report saved to:\n{report_path or '(report error)'}")
+        except Exception:
+            pass
+
     def _cleanup_resources(self):
+        try:
+            if getattr(self, "capture", None):
+                self.capture.stop(); self.capture = None
+        except Exception:
+            pass
+        try:
+            if getattr(self, "infer", None):
+                self.infer.stop(); self.infer = None
+        except Exception:
+            pass
         try:
             if getattr(self, "cap", None) and self.cap.isOpened():
                 self.cap.release(); self.cap = None
@@ -307,43 +364,88 @@ class DrowsinessFrame(ctk.CTkFrame):
 
     # ---------- frame loop ----------
     def _schedule_frame(self):
-        self.parent.after(30, self.update_frame)
+        self.parent.after(int(getattr(config, "FRAME_POLL_MS", 10)), self.update_frame)
+
+    def _box_to_display(self, xyxy, xform):
+        """Map a box from model-input pixels to the current display size."""
+        if xform is None:
+            pad_x, pad_y, span_x, span_y = 0.0, 0.0, float(self.video_width), float(self.video_height)
+        else:
+            pad_x, pad_y, span_x, span_y = xform.pad_x, xform.pad_y, xform.span_x, xform.span_y
+        x1, y1, x2, y2 = (float(v) for v in xyxy)
+        sx = self.video_width / max(1e-6, span_x); sy = self.video_height / max(1e-6, span_y)
+        return (int((x1 - pad_x) * sx), int((y1 - pad_y) * sy), int((x2 - pad_x) * sx), int((y2 - pad_y) * sy))
+
+    def capture_stats(self):
+        """Frame counters from the capture thread (written / read / dropped / read_failures)."""
+        try:
+            if getattr(self, "capture", None):
+                return self.capture.stats()
+        except Exception:
+            pass
+        return {"written": 0, "read": 0, "dropped": 0, "read_failures": 0}
+
+    def inference_stats(self):
+        """Counters from the inference worker, the frame-skipping scheduler and the display sink."""
+        out = {}
+        try:
+            if getattr(self, "infer", None):
+                out.update(self.infer.stats())
+            out["scheduler"] = self.scheduler.stats()
+            out["display"] = self.display.stats()
+        except Exception:
+            pass
+        return out
 
     def update_frame(self):
         if not self.detection_enabled:
             return
         if self.paused:
             self._schedule_frame(); return
-        if not getattr(self, "cap", None) or not self.cap.isOpened():
+        if not getattr(self, "cap", None) or not self.cap.isOpened() or not getattr(self, "capture", None) or not getattr(self, "infer", None):
             CTkMessagebox(self, "Camera Error", "Camera is not open."); return
 
-        ret, frame = self.cap.read()
+        # newest frame from the capture ring buffer (False if nothing new since last tick)
+        ret, frame = self.capture.read()
         if not ret:
             self._schedule_frame(); return
+        self._last_frame_for_brightness = frame
 
-        # scale
-        try: scale = float(self.video_size_slider.get())
-        except Exception: scale = 1.0
-        self.video_width = max(1, int(self.base_video_width * scale)); self.video_height = max(1, int(self.base_video_height * scale))
-        try:
-            frame = cv2.resize(frame, (self.video_width, self.video_height))
-        except Exception:
-            frame = cv2.resize(frame, (self.base_video_width, self.base_video_height))
-
-        self._last_frame_for_brightness = frame.copy() if frame is not None else None
-
-        # preprocess
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        eq = cv2.equalizeHist(gray)
-        proc = cv2.cvtColor(eq, cv2.COLOR_GRAY2BGR)
-
+        self.scheduler.tick()
         try:
             conf_threshold = float(self.conf_slider.get())
         except Exception:
             conf_threshold = 0.4
 
-        # run detector
-        status, best_box, detections = self.detector.analyze_frame(proc, conf_threshold=conf_threshold)
+        # inference runs every N frames (adaptive); skipped frames reuse the last status
+        # the detector runs off the Tk thread; while it is busy the frame is not even preprocessed
+        if self.scheduler.should_run(self.detector, self.infer.avg_inference_ms) and self.infer.ready():
+            # inference input: one resize from the raw capture to the model size (so the
+            # display zoom never changes inference cost), then gray/equalize into reused buffers
+            proc, xform = self.pre.model_input(self.detector, frame)
+            if self.infer.submit(proc, conf_threshold=conf_threshold, tag=xform, captured_at=self.capture.last_ts):
+                self.pre.commit_submitted()
+                self.scheduler.mark_submitted()
+
+        # display path (scaled by the zoom slider); throttled independently of inference
+        render = self.display.due()
+        if render:
+            try: scale = float(self.video_size_slider.get())
+            except Exception: scale = 1.0
+            self.video_width = max(1, int(self.base_video_width * scale)); self.video_height = max(1, int(self.base_video_height * scale))
+            frame = self.pre.display(frame, self.video_width, self.video_height)
+
+        # the last finished result is reused until a newer one arrives
+        event_time = None
+        res = self.infer.poll()
+        if res is not None:
+            self._last_result = (res["status"], res["best_box"], res["detections"])
+            self._last_xform = res["tag"]
+            # keep the face ROI tracker in step with finished detections
+            self.detector.observe_result(res["best_box"], res["tag"])
+            # state changes are placed between the two bracketing samples (camera capture times)
+            event_time = self.scheduler.on_result(res["status"], res["captured_at"])
+        status, best_box, detections = self._last_result
 
         # --- per-second state logging (write EventType="State", Details=<status>) ---
         try:
@@ -359,32 +461,20 @@ class DrowsinessFrame(ctk.CTkFrame):
         # --- end per-second logging ---
 
         # draw box if available
-        if best_box:
+        if render and best_box:
             try:
-                x1, y1, x2, y2 = map(int, best_box.xyxy[0])
+                x1, y1, x2, y2 = self._box_to_display(best_box.xyxy, self._last_xform)
                 color = (0,255,0)
                 if status == "drowsy": color = (0,0,255)
                 elif status == "yawn": color = (0,255,255)
                 cv2.rectangle(frame, (x1,y1), (x2,y2), color, 2)
-                try:
-                    conf = None
-                    try:
-                        conf = float(best_box.conf[0])
-                    except Exception:
-                        try:
-                            conf = float(best_box.conf)
-                        except Exception:
-                            conf = None
-                    if conf is not None:
-                        cv2.putText(frame, f"{status} {conf:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                except Exception:
-                    pass
+                cv2.putText(frame, f"{status} {best_box.conf:.2f}", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
             except Exception:
                 pass
 
         # apply detector logic mutations & get actions
-        yawn_res = self.detector.handle_yawn_logic(status, log_file=self.log_file)
-        drowsy_res = self.detector.handle_drowsy_logic(status, drowsy_limit=int(self.drowsy_time_slider.get()), log_file=self.log_file)
+        yawn_res = self.detector.handle_yawn_logic(status, log_file=self.log_file, event_time=event_time)
+        drowsy_res = self.detector.handle_drowsy_logic(status, drowsy_limit=int(self.drowsy_time_slider.get()), log_file=self.log_file, event_time=event_time)
 
         # handle sounds/logs/popups triggered by detector logic
         try:
@@ -415,16 +505,17 @@ class DrowsinessFrame(ctk.CTkFrame):
 
         # overlay for yawn popup (drawn on frame)
         if getattr(self, "yawn_popup_active", False):
-            overlay = frame.copy()
-            alpha = 0.8
-            box_color = (40,40,40) if ctk.get_appearance_mode()=="Dark" else (230,230,230)
-            title_color = (255,255,0) if ctk.get_appearance_mode()=="Dark" else (200,0,0)
-            cv2.rectangle(overlay, (50,100), (self.video_width-50,300), box_color, -1)
-            cv2.addWeighted(overlay, alpha, frame, 1-alpha, 0, frame)
-            cv2.rectangle(frame, (50,100), (self.video_width-50,300), title_color, 2)
-            (tw, th), _ = cv2.getTextSize("WARNING: HIGH DROWSINESS TENDENCY", cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-            cv2.putText(frame, "WARNING: HIGH DROWSINESS TENDENCY", (int((self.video_width-tw)/2), 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, title_color, 2)
-            cv2.putText(frame, "Please pull over and take a break.", (int((self.video_width-300)/2), 200), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
+            if render:
+                overlay = self.pre.overlay(frame)
+                alpha = 0.8
+                box_color = (40,40,40) if ctk.get_appearance_mode()=="Dark" else (230,230,230)
+                title_color = (255,255,0) if ctk.get_appearance_mode()=="Dark" else (200,0,0)
+                cv2.rectangle(overlay, (50,100), (self.video_width-50,300), box_color, -1)
+                cv2.addWeighted(overlay, alpha, frame, 1-alpha, 0, frame)
+                cv2.rectangle(frame, (50,100), (self.video_width-50,300), title_color, 2)
+                (tw, th), _ = cv2.getTextSize("WARNING: HIGH DROWSINESS TENDENCY", cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+                cv2.putText(frame, "WARNING: HIGH DROWSINESS TENDENCY", (int((self.video_width-tw)/2), 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, title_color, 2)
+                cv2.putText(frame, "Please pull over and take a break.", (int((self.video_width-300)/2), 200), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
             if time.time() - getattr(self, "yawn_popup_start_time", 0) > 6:
                 self.yawn_popup_active = False
                 self.detector.yawn_count = 0
@@ -434,14 +525,12 @@ class DrowsinessFrame(ctk.CTkFrame):
                 except Exception:
                     pass
 
-        # convert to CTkImage and display
-        try:
-            cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
-            img = Image.fromarray(cv2image)
-            imgtk = ctk.CTkImage(light_image=img, dark_image=img, size=(self.video_width, self.video_height))
-            self.video_label.configure(image=imgtk, text="")
-        except Exception:
-            self.video_label.configure(text="Frame captured")
+        # update the persistent PhotoImage in place
+        if render:
+            try:
+                self.display.show(frame)
+            except Exception:
+                self.video_label.configure(text="Frame captured")
 
         # update rolling alertness
         try:
@@ -668,6 +757,14 @@ class DrowsinessFrame(ctk.CTkFrame):
             self.show_message('Confidence', f'Failed: {e}')
 
 
+    def apply_imgsz(self, val):
+        try:
+            if not self.detector.set_imgsz(int(val)):
+                # fixed-shape export: reflect the size actually used
+                self.imgsz_combo.set(str(self.detector.imgsz))
+        except Exception:
+            pass
+
     def show_message(self, title, text):
         try:
             import tkinter.messagebox as mb
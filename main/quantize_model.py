@@ -0,0 +1,364 @@
+# quantize_model.py
+"""
+INT8 post-training quantization for the drowsiness model.
+
+Pipeline:
+  1. export model/final_model.pt to ONNX (an existing final_model.onnx is
+     reused only when its input size matches --imgsz)
+  2. static INT8 quantization with onnxruntime, calibrated on images from the
+     YOLOv8 dataset layout built in Final_Ready_model.ipynb (STEP 5/6):
+         dataset_yolov8/images/{train,val,test}/<class>/*.jpg
+         dataset_yolov8/labels/{train,val,test}/<class>/*.txt
+  3. compare fp32 vs int8 on the val split: per-class accuracy
+     (attentive / yawn / drowsy) and mean latency per image.
+
+Calibration and evaluation images go through the live app's preprocessing
+(resize to the model input, gray, equalizeHist, back to BGR; see
+live_app/preprocess.py), so both see what Detector is given at runtime.
+
+The quantized file is written as config.MODEL_INT8_ONNX_FILE inside
+model/, where Detector picks it up automatically (see
+config.PREFER_QUANTIZED_MODEL).
+
+Optionally `--format openvino` produces an INT8 OpenVINO IR via the
+ultralytics exporter (NNCF) instead, and runs the same comparison against
+the fp32 OpenVINO IR (exported too when missing). NNCF calibrates from
+data.yaml through the exporter's own loader, i.e. on unprocessed images.
+
+Usage:
+    python quantize_model.py --data /path/to/dataset_yolov8 [--calib 300] [--eval 600]
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import sys
+import time
+
+import numpy as np
+import cv2
+
+import config
+from live_app.backends import OnnxBackend, OpenVinoBackend, letterbox, to_blob
+from live_app.preprocess import FramePreprocessor
+
+CLASSES = list(getattr(config, "MODEL_CLASS_NAMES", ["attentive", "yawn", "drowsy"]))
+IMG_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def list_split_images(data_root, split):
+    """Return [(image_path, class_name)] for a split of the dataset_yolov8 layout."""
+    items = []
+    for cls in CLASSES:
+        folder = os.path.join(data_root, "images", split, cls)
+        for p in sorted(glob.glob(os.path.join(folder, "*"))):
+            if p.lower().endswith(IMG_EXTS):
+                items.append((p, cls))
+    return items
+
+
+def stratified_sample(items, n, rng):
+    """
+    Up to n (path, class) items drawn round-robin across classes (shuffled
+    within each class), so a small sample is not dominated by the largest
+    class. n <= 0 keeps everything.
+    """
+    if n <= 0 or len(items) <= n:
+        return list(items)
+    by_class = {}
+    for item in items:
+        by_class.setdefault(item[1], []).append(item)
+    pools = [by_class[c] for c in sorted(by_class)]
+    for pool in pools:
+        rng.shuffle(pool)
+    out = []
+    i = 0
+    while len(out) < n:
+        for pool in pools:
+            if i < len(pool) and len(out) < n:
+                out.append(pool[i])
+        i += 1
+    rng.shuffle(out)
+    return out
+
+
+def label_class_for(data_root, split, image_path, fallback):
+    """Ground-truth class from the first row of the YOLO label file (else the folder name)."""
+    rel = os.path.relpath(image_path, os.path.join(data_root, "images", split))
+    label = os.path.join(data_root, "labels", split, os.path.splitext(rel)[0] + ".txt")
+    try:
+        with open(label, "r", encoding="utf-8") as f:
+            first = f.readline().split()
+        if first:
+            idx = int(float(first[0]))
+            if 0 <= idx < len(CLASSES):
+                return CLASSES[idx]
+    except Exception:
+        pass
+    return fallback
+
+
+class RuntimeInput:
+    """
+    Dataset image -> the model input the live app builds from a camera
+    frame: Detector.prepare_input's full-frame path (stretch to imgsz x
+    imgsz, or letterbox with config.INFERENCE_LETTERBOX), then
+    FramePreprocessor.model_input (gray, equalizeHist, BGR).
+    """
+
+    def __init__(self, imgsz):
+        self.imgsz = int(imgsz)
+        self.letterbox_input = bool(getattr(config, "INFERENCE_LETTERBOX", False))
+        self.pre = FramePreprocessor()
+
+    def prepare_input(self, frame, buf=None):
+        # same sizing as Detector.prepare_input without a face ROI
+        sz = self.imgsz
+        h, w = frame.shape[:2]
+        if self.letterbox_input:
+            return letterbox(frame, sz)[0], None
+        if (w, h) == (sz, sz):
+            return frame, None
+        img = cv2.resize(frame, (sz, sz), dst=buf(sz, sz) if buf else None,
+                         interpolation=cv2.INTER_AREA if w > sz else cv2.INTER_LINEAR)
+        return img, None
+
+    def __call__(self, img):
+        # the result lives in a reused buffer: consume it before the next call
+        return self.pre.model_input(self, img)[0]
+
+
+def onnx_input_side(onnx_path):
+    """Side of the static square NCHW input of an ONNX graph, else None (dynamic/unreadable)."""
+    try:
+        import onnxruntime as ort
+        shape = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].shape
+        h, w = shape[2], shape[3]
+        return int(h) if isinstance(h, int) and h == w else None
+    except Exception:
+        return None
+
+
+def openvino_input_side(xml_path):
+    """Same as onnx_input_side for an OpenVINO IR."""
+    try:
+        from openvino import Core
+        pshape = Core().read_model(xml_path).input(0).get_partial_shape()
+        h, w = pshape[2], pshape[3]
+        return int(h.get_length()) if h.is_static and w.is_static and h.get_length() == w.get_length() else None
+    except Exception:
+        return None
+
+
+def export_onnx(pt_path, onnx_path, imgsz):
+    if os.path.exists(onnx_path):
+        side = onnx_input_side(onnx_path)
+        if side == imgsz:
+            print(f"Using existing ONNX model: {onnx_path}")
+            return onnx_path
+        print(f"Existing {onnx_path} has input size {side or 'dynamic/unknown'}, not {imgsz}: exporting again")
+    from ultralytics import YOLO
+    print(f"Exporting {pt_path} -> ONNX (imgsz={imgsz}) ...")
+    out = YOLO(pt_path).export(format="onnx", imgsz=imgsz, simplify=True, dynamic=False)
+    if os.path.abspath(out) != os.path.abspath(onnx_path):
+        shutil.move(out, onnx_path)
+    return onnx_path
+
+
+class ImageCalibrationReader:
+    """onnxruntime CalibrationDataReader over dataset images, preprocessed as at runtime (RuntimeInput)."""
+
+    def __init__(self, image_paths, input_name, imgsz):
+        self.image_paths = list(image_paths)
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self.prepare = RuntimeInput(imgsz)
+        self._it = iter(self.image_paths)
+
+    def get_next(self):
+        for p in self._it:
+            img = cv2.imread(p)
+            if img is None:
+                continue
+            # already imgsz x imgsz, the letterbox only guards the graph's fixed shape
+            lb, _, _ = letterbox(self.prepare(img), self.imgsz)
+            return {self.input_name: to_blob(lb)}
+        return None
+
+    def rewind(self):
+        self._it = iter(self.image_paths)
+
+
+def quantize_onnx(fp32_path, int8_path, calib_paths, imgsz):
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_static, QuantType, QuantFormat, CalibrationMethod
+
+    input_name = ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    src = fp32_path
+    try:
+        # shape inference + graph cleanup recommended before static quantization
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+        src = fp32_path + ".prep.onnx"
+        quant_pre_process(fp32_path, src)
+    except Exception:
+        src = fp32_path
+
+    reader = ImageCalibrationReader(calib_paths, input_name, imgsz)
+    print(f"Calibrating on {len(calib_paths)} images ...")
+    quantize_static(
+        src, int8_path, reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    if src != fp32_path:
+        try:
+            os.remove(src)
+        except Exception:
+            pass
+    return int8_path
+
+
+def openvino_xml(ir_dir):
+    """The .xml of an OpenVINO IR folder, or None."""
+    xmls = sorted(glob.glob(os.path.join(ir_dir, "*.xml")))
+    return xmls[0] if xmls else None
+
+
+def _move_export(out, target):
+    if os.path.abspath(out) != os.path.abspath(target):
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        shutil.move(out, target)
+    return target
+
+
+def export_openvino_fp32(pt_path, imgsz):
+    """fp32 OpenVINO IR (the accuracy baseline); skipped if it already exists."""
+    target = os.path.join(config.MODEL_DIR, getattr(config, "MODEL_OPENVINO_DIR", "final_model_openvino_model"))
+    xml = openvino_xml(target)
+    if xml:
+        side = openvino_input_side(xml)
+        if side == imgsz:
+            print(f"Using existing OpenVINO model: {target}")
+            return target
+        print(f"Existing {target} has input size {side or 'dynamic/unknown'}, not {imgsz}: exporting again")
+    from ultralytics import YOLO
+    print(f"Exporting {pt_path} -> OpenVINO (imgsz={imgsz}) ...")
+    out = YOLO(pt_path).export(format="openvino", imgsz=imgsz)
+    return _move_export(out, target)
+
+
+def export_openvino_int8(pt_path, data_root, imgsz):
+    """INT8 OpenVINO IR through the ultralytics exporter (needs nncf)."""
+    from ultralytics import YOLO
+    data_yaml = os.path.join(data_root, "data.yaml")
+    out = YOLO(pt_path).export(format="openvino", int8=True, data=data_yaml, imgsz=imgsz)
+    target = os.path.join(config.MODEL_DIR, getattr(config, "MODEL_OPENVINO_INT8_DIR", "final_model_int8_openvino_model"))
+    return _move_export(out, target)
+
+
+def predicted_class(backend, img, conf):
+    """Top-confidence detection class, or None when nothing is detected."""
+    res = backend(img, conf=conf)[0]
+    boxes = res.boxes
+    if len(boxes) == 0:
+        return None
+    i = int(np.argmax(boxes.conf))
+    return backend.names.get(int(boxes.cls[i]), str(int(boxes.cls[i])))
+
+
+def evaluate(backend, samples, conf, imgsz):
+    """Return ({class: (correct, total)}, mean_latency_ms) on runtime-preprocessed images."""
+    per_class = {c: [0, 0] for c in CLASSES}
+    times = []
+    prepare = RuntimeInput(imgsz)
+    for path, gt in samples:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        img = prepare(img)
+        t0 = time.perf_counter()
+        pred = predicted_class(backend, img, conf)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        per_class[gt][1] += 1
+        if pred == gt:
+            per_class[gt][0] += 1
+    mean_ms = float(np.mean(times)) if times else 0.0
+    return per_class, mean_ms
+
+
+def print_report(fp32_stats, int8_stats):
+    fp32_cls, fp32_ms = fp32_stats
+    int8_cls, int8_ms = int8_stats
+    print("\n" + "-" * 58)
+    print(f"{'class':<12}{'n':>6}{'fp32 acc':>12}{'int8 acc':>12}{'delta':>12}")
+    print("-" * 58)
+    for c in CLASSES:
+        ok32, n = fp32_cls[c]
+        ok8, _ = int8_cls[c]
+        a32 = 100.0 * ok32 / n if n else 0.0
+        a8 = 100.0 * ok8 / n if n else 0.0
+        print(f"{c:<12}{n:>6}{a32:>11.2f}%{a8:>11.2f}%{a8 - a32:>+11.2f}%")
+    print("-" * 58)
+    speedup = (fp32_ms / int8_ms) if int8_ms > 0 else 0.0
+    print(f"latency fp32: {fp32_ms:.2f} ms   int8: {int8_ms:.2f} ms   speedup: {speedup:.2f}x")
+    print("-" * 58)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="INT8 post-training quantization for the drowsiness model")
+    ap.add_argument("--data", required=True, help="dataset_yolov8 root (images/ and labels/ per split)")
+    ap.add_argument("--model", default=os.path.join(config.MODEL_DIR, getattr(config, "MODEL_PT_FILE", "final_model.pt")))
+    ap.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    ap.add_argument("--imgsz", type=int, default=int(getattr(config, "INFERENCE_IMGSZ", 640)))
+    ap.add_argument("--calib", type=int, default=300, help="number of calibration images")
+    ap.add_argument("--calib-split", default="train")
+    ap.add_argument("--eval", type=int, default=600, help="max val images for the accuracy comparison (0 = all)")
+    ap.add_argument("--conf", type=float, default=0.4)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    calib = list_split_images(args.data, args.calib_split)
+    if not calib:
+        print(f"No calibration images under {args.data}/images/{args.calib_split}/<class>/", file=sys.stderr)
+        return 1
+
+    if args.format == "openvino":
+        # NNCF calibrates from data.yaml itself; fp32 baseline is the OpenVINO IR
+        fp32_path = openvino_xml(export_openvino_fp32(args.model, args.imgsz))
+        target = export_openvino_int8(args.model, args.data, args.imgsz)
+        print(f"INT8 OpenVINO model written to {target}")
+        int8_path = openvino_xml(target)
+        backend_cls = OpenVinoBackend
+    else:
+        calib_paths = [p for p, _ in stratified_sample(calib, max(1, args.calib), rng)]
+        fp32_path = os.path.join(config.MODEL_DIR, getattr(config, "MODEL_ONNX_FILE", "final_model.onnx"))
+        export_onnx(args.model, fp32_path, args.imgsz)
+        int8_path = os.path.join(config.MODEL_DIR, getattr(config, "MODEL_INT8_ONNX_FILE", "final_model_int8.onnx"))
+        quantize_onnx(fp32_path, int8_path, calib_paths, args.imgsz)
+        print(f"INT8 model written to {int8_path}")
+        backend_cls = OnnxBackend
+
+    samples = [(p, label_class_for(args.data, "val", p, c)) for p, c in list_split_images(args.data, "val")]
+    samples = stratified_sample(samples, args.eval, rng)
+    if not samples:
+        print("No val images found; skipping accuracy comparison.")
+        return 0
+
+    print(f"Evaluating fp32 vs int8 on {len(samples)} val images ...")
+    fp32 = backend_cls(fp32_path, imgsz=args.imgsz)
+    int8 = backend_cls(int8_path, imgsz=args.imgsz)
+    # warm up both sessions so first-call allocation does not skew latency
+    for b in (fp32, int8):
+        b(np.zeros((args.imgsz, args.imgsz, 3), dtype=np.uint8), conf=args.conf)
+    print_report(evaluate(fp32, samples, args.conf, fp32.imgsz), evaluate(int8, samples, args.conf, int8.imgsz))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+# tests/conftest.py
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def live_module():
+    """
+    Load one live_app module by file path. Importing it through the package
+    would run live_app/__init__.py, which pulls in the whole UI and the model.
+    """
+    def load(name):
+        path = os.path.join(ROOT, "live_app", name + ".py")
+        spec = importlib.util.spec_from_file_location("live_app_" + name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
@@ -0,0 +1,44 @@
+# tests/test_display.py
+"""DisplaySink must hand Tk a block image in the PhotoImage's own mode (no per-frame convert)."""
+import numpy as np
+import pytest
+
+pytest.importorskip("PIL")
+
+
+class _Label:
+    def configure(self, **kw):
+        pass
+
+
+class _Photo:
+    """Stand-in for ImageTk.PhotoImage (needs a Tk display); records what paste() gets."""
+
+    def __init__(self, mode, size):
+        self.mode = mode
+        self.size = size
+        self.pasted = []
+
+    def paste(self, im):
+        self.pasted.append(im)
+
+
+def test_frames_are_staged_in_the_photo_mode(live_module, monkeypatch):
+    display = live_module("display")
+    monkeypatch.setattr(display.ImageTk, "PhotoImage", _Photo)
+    sink = display.DisplaySink(_Label(), max_fps=0, target_ms=2.0)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame[..., 0] = 10   # B
+    frame[..., 2] = 30   # R
+
+    for _ in range(3):
+        assert sink.show(frame)
+
+    photo = sink._photo
+    staged = photo.pasted[-1]
+    assert all(im is staged for im in photo.pasted)
+    assert staged.mode == photo.mode
+    assert staged.im.isblock()
+    assert staged.getpixel((5, 5)) == (30, 0, 10)
+    stats = sink.stats()
+    assert stats["rendered"] == 3 and stats["max_render_ms"] >= stats["last_render_ms"] > 0
@@ -0,0 +1,72 @@
+# tests/test_frame_alloc.py
+"""The steady-state frame loop must not allocate frame-sized buffers."""
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import cv2
+
+FRAMES = 60
+WARMUP = 5
+# well below the smallest per-frame buffer (a 320x320 gray plane is 100 KiB)
+MAX_GROWTH = 16 * 1024
+
+
+class _StretchDetector:
+    """Stand-in for Detector.prepare_input's default stretch-to-square path."""
+    imgsz = 320
+
+    def prepare_input(self, frame, buf=None):
+        sz = self.imgsz
+        img = cv2.resize(frame, (sz, sz), dst=buf(sz, sz), interpolation=cv2.INTER_AREA)
+        return img, None
+
+
+def test_steady_state_frames_do_not_allocate(live_module):
+    pre = live_module("preprocess").FramePreprocessor()
+    flash = live_module("flash").FlashController(None, None, None)
+    detector = _StretchDetector()
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(3)]
+
+    def step(i):
+        frame = frames[i % len(frames)]
+        pre.model_input(detector, frame)
+        pre.commit_submitted()
+        shown = pre.display(frame, 800, 600)
+        pre.overlay(shown)
+        flash._is_dark_condition(frame)
+
+    for i in range(WARMUP):
+        step(i)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for i in range(FRAMES):
+            step(i)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak - before < MAX_GROWTH, f"peak grew by {peak - before} bytes over {FRAMES} frames"
+    assert after - before < MAX_GROWTH
+
+
+def test_flash_darkness_uses_full_frame(live_module, monkeypatch):
+    flash_mod = live_module("flash")
+
+    class _Noon:
+        @staticmethod
+        def now():
+            return datetime(2026, 1, 1, 12, 0)
+
+    # daytime, so only the frame brightness decides
+    monkeypatch.setattr(flash_mod, "datetime", _Noon)
+    flash = flash_mod.FlashController(None, None, None)
+    frame = np.full((480, 640, 3), 200, dtype=np.uint8)
+    assert not flash._is_dark_condition(frame)
+    frame[:] = 10
+    assert flash._is_dark_condition(frame)
+    assert flash._is_dark_condition(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
@@ -0,0 +1,40 @@
+# tests/test_inference_worker.py
+"""The UI asks InferenceWorker.ready() before preprocessing a frame for it."""
+import threading
+import time
+
+
+class _BlockingDetector:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def analyze_frame(self, frame, conf_threshold=0.4):
+        self.release.wait(2.0)
+        return "Attentive", None, []
+
+
+def _wait(cond, timeout=2.0):
+    end = time.time() + timeout
+    while not cond() and time.time() < end:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_ready_tracks_the_pending_slot(live_module):
+    detector = _BlockingDetector()
+    worker = live_module("inference_worker").InferenceWorker(detector)
+    assert not worker.ready()       # not started
+    worker.start()
+    try:
+        assert worker.ready()
+        assert worker.submit("frame-1")
+        assert _wait(lambda: worker._requests.empty())   # picked up, now analyzing
+        assert worker.submit("frame-2")                  # the one pending slot
+        skipped = worker.skipped
+        assert not worker.ready()
+        assert worker.skipped == skipped + 1
+        detector.release.set()
+        assert _wait(worker.ready)
+    finally:
+        detector.release.set()
+        worker.stop()
@@ -0,0 +1,65 @@
+# tests/test_scheduler.py
+"""InferenceScheduler timing: transitions are placed between capture timestamps."""
+TICK_S = 1 / 30.0
+INFER_MS = 40.0          # with the default 0.5 CPU budget: one run every 3 ticks
+
+
+class _CalmDetector:
+    """Nothing time-critical in progress, so the scheduler is free to skip."""
+    drowsy_start_time = None
+    is_yawning_event = False
+    pending_yawn_time = None
+    is_drowsy_alert_playing = False
+
+
+def _drive(scheduler, changes, frames, latency_ticks=0):
+    """
+    Run the frame loop over synthetic states: changes maps frame -> status
+    from that frame on. Results come back latency_ticks after submission and
+    carry the frame's capture time, like InferenceWorker results.
+    Returns [(true change time, interpolated event time)].
+    """
+    detector = _CalmDetector()
+    status = "Attentive"
+    in_flight = []
+    placed = []
+    for i in range(frames):
+        now = 100.0 + i * TICK_S
+        status = changes.get(i, status)
+        scheduler.tick(now)
+        if scheduler.should_run(detector, INFER_MS):
+            scheduler.mark_submitted()
+            in_flight.append((i + latency_ticks, status, now))
+        while in_flight and in_flight[0][0] <= i:
+            _, result, captured_at = in_flight.pop(0)
+            event_time = scheduler.on_result(result, captured_at)
+            if event_time is not None:
+                placed.append(event_time)
+    truth = [100.0 + f * TICK_S for f in sorted(changes)]
+    return list(zip(truth, placed))
+
+
+def test_max_timing_error_frames_bounds_the_placement(live_module):
+    scheduler = live_module("scheduler").InferenceScheduler(max_skip=4, cpu_budget=0.5, enabled=True)
+    changes = {40: "Yawn", 71: "Attentive", 100: "Drowsy", 142: "Attentive"}
+    placed = _drive(scheduler, changes, 200)
+    stats = scheduler.stats()
+
+    assert stats["n"] == 3
+    assert stats["transitions"] == len(changes) == len(placed)
+    # samples every 3 frames: a change is bracketed within 3 frames, so at most 1.5 frames off
+    assert 0 < stats["max_timing_error_frames"] <= 1.5 + 1e-6
+    for true_t, event_t in placed:
+        assert abs(event_t - true_t) / TICK_S <= stats["max_timing_error_frames"] + 1e-6
+
+
+def test_result_latency_does_not_shift_transitions(live_module):
+    load = live_module("scheduler").InferenceScheduler
+    changes = {40: "Yawn", 71: "Attentive", 100: "Drowsy"}
+    prompt = _drive(load(max_skip=4, cpu_budget=0.5, enabled=True), changes, 160)
+    slow_sched = load(max_skip=4, cpu_budget=0.5, enabled=True)
+    slow = _drive(slow_sched, changes, 160, latency_ticks=2)
+
+    # placement follows capture times, so results arriving two ticks later land at the same instants
+    assert [round(e, 6) for _, e in prompt] == [round(e, 6) for _, e in slow]
+    assert slow_sched.stats()["max_timing_error_frames"] <= 1.5 + 1e-6
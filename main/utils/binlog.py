@@ -0,0 +1,174 @@
+# utils/binlog.py
+"""
+Compact fixed-width binary trip log (.tlb), written next to each CSV log.
+
+Layout (little-endian):
+    header : 8 bytes  b"TRIPLOG1"
+    records: 10 bytes each
+             int64  timestamp, epoch milliseconds
+             uint8  event code  (EVENT_CODES, 0 = other)
+             uint8  state code  (STATE_LABELS index, 0 = none)
+
+Free-text details are not stored; the CSV stays the full-fidelity record.
+The state code carries what analytics needs, so a month of per-second
+samples is ~10 bytes/row instead of ~40 and loads with one np.fromfile.
+"""
+import os
+import struct
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+MAGIC = b"TRIPLOG1"
+HEADER_SIZE = len(MAGIC)
+RECORD = struct.Struct("<qBB")
+RECORD_SIZE = RECORD.size
+EXT = ".tlb"
+
+STATE_LABELS = ["", "Attentive", "Yawn", "Drowsy"]
+STATE_NONE, STATE_ATTENTIVE, STATE_YAWN, STATE_DROWSY = 0, 1, 2, 3
+
+EVENT_NAMES = ["", "State", "Trip_Start", "Trip_End", "Yawn_Warning", "Drowsy_Warning",
+               "Drowsy_Reset", "WhatsApp_Event", "Break_Dismissed"]
+EVENT_CODES = {name: i for i, name in enumerate(EVENT_NAMES) if name}
+
+
+def classify_state(text: str) -> int:
+    """Map free text (EventType + Details) to a state code using the analytics rules."""
+    t = (text or "").lower()
+    if "drows" in t or "sleep" in t or "doze" in t or "microsleep" in t:
+        return STATE_DROWSY
+    if "yawn" in t:
+        return STATE_YAWN
+    if "attent" in t or "focused" in t or "awake" in t:
+        return STATE_ATTENTIVE
+    return STATE_NONE
+
+
+def sidecar_path(csv_path: str) -> str:
+    """Trip_Log_X.csv -> Trip_Log_X.tlb"""
+    return os.path.splitext(csv_path)[0] + EXT
+
+
+def csv_path_for(tlb_path: str) -> str:
+    return os.path.splitext(tlb_path)[0] + ".csv"
+
+
+def encode(ts_epoch_s: float, event_type: str, details: str = "") -> bytes:
+    code = EVENT_CODES.get(event_type, 0)
+    state = classify_state(f"{event_type} {details}")
+    return RECORD.pack(int(round(ts_epoch_s * 1000.0)), code, state)
+
+
+def reset_sidecar(path: str):
+    """Start an empty sidecar (header only), replacing whatever was there."""
+    with open(path, "wb") as fh:
+        fh.write(MAGIC)
+
+
+class BinaryTripLog:
+    """Append-only writer; owned by the trip's log writer thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._fh = open(path, "ab")
+        if new:
+            self._fh.write(MAGIC)
+
+    def append_many(self, records: List[Tuple[float, str, str]]):
+        """records: [(epoch_seconds, event_type, details)]"""
+        if records:
+            self._fh.write(b"".join(encode(t, e, d) for t, e, d in records))
+
+    def flush(self, fsync: bool = False):
+        self._fh.flush()
+        if fsync:
+            os.fsync(self._fh.fileno())
+
+    def close(self):
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+
+
+# ---------- readers ----------
+def record_dtype():
+    import numpy as np
+    return np.dtype([("ts_ms", "<i8"), ("event", "u1"), ("state", "u1")])
+
+
+def read_records(path: str):
+    """All records as a numpy structured array (fields ts_ms, event, state)."""
+    return read_tail(path, 0)[0]
+
+
+def read_tail(path: str, offset: int = 0):
+    """
+    Records stored at or after byte `offset` -> (records, next_offset).
+    A trailing partial record (write in progress) is left for the next call.
+    """
+    import numpy as np
+    dt = record_dtype()
+    empty = np.zeros((0,), dtype=dt)
+    try:
+        with open(path, "rb") as f:
+            if f.read(HEADER_SIZE) != MAGIC:
+                return empty, offset
+            start = max(int(offset), HEADER_SIZE)
+            count = max(0, (os.fstat(f.fileno()).st_size - start) // RECORD_SIZE)
+            if count == 0:
+                return empty, start
+            f.seek(start)
+            rec = np.fromfile(f, dtype=dt, count=count)
+            return rec, start + rec.size * RECORD_SIZE
+    except Exception:
+        return empty, offset
+
+
+def local_wall_ns(ts_ms):
+    """
+    Epoch-ms -> naive local wall-clock nanoseconds, i.e. the same time axis
+    as the CSV's local "%Y-%m-%d %H:%M:%S" strings parsed without a zone.
+    The UTC offset is looked up once per distinct hour, not per record.
+    """
+    import numpy as np
+    ts_ms = np.asarray(ts_ms, dtype=np.int64)
+    if ts_ms.size == 0:
+        return ts_ms.copy()
+    hours, inv = np.unique(ts_ms // 3_600_000, return_inverse=True)
+    offs = np.array([datetime.fromtimestamp(h * 3600).astimezone().utcoffset().total_seconds()
+                     for h in hours.tolist()], dtype=np.int64) * 1000
+    return (ts_ms + offs[inv]) * 1_000_000
+
+
+def read_state_arrays(path: str):
+    """
+    (ts_ns int64, state uint8) for records that carry a state, sorted by time.
+    ts_ns is naive local wall-clock time (see local_wall_ns).
+    """
+    return state_arrays(read_records(path))
+
+
+def state_arrays(rec):
+    """Structured records -> (ts_ns, state) for records that carry a state, sorted by time."""
+    import numpy as np
+    rec = rec[rec["state"] > 0]
+    ts_ns = local_wall_ns(rec["ts_ms"])
+    codes = rec["state"].astype(np.uint8)
+    if ts_ns.size > 1 and np.any(np.diff(ts_ns) < 0):
+        order = np.argsort(ts_ns, kind="stable")
+        ts_ns, codes = ts_ns[order], codes[order]
+    return ts_ns, codes
+
+
+def read_rows(path: str, limit: Optional[int] = None) -> List[Tuple[str, str, str]]:
+    """Records as (Timestamp, EventType, State) display rows."""
+    rec = read_records(path)
+    if limit is not None:
+        rec = rec[:limit]
+    rows = []
+    for ts_ms, ev, st in zip(rec["ts_ms"].tolist(), rec["event"].tolist(), rec["state"].tolist()):
+        ts = datetime.fromtimestamp(ts_ms / 1000.0).strftime("%Y-%m-%d %H:%M:%S")
+        rows.append((ts, EVENT_NAMES[ev] if ev < len(EVENT_NAMES) else "", STATE_LABELS[st] if st < len(STATE_LABELS) else ""))
+    return rows
@@ -18,6 +18,15 @@ def list_log_files(log_dir: str) -> List[str]:
     except Exception:
         return []
 
+def list_binary_log_files(log_dir: str) -> List[str]:
+    """Binary trip logs (.tlb, see utils/binlog.py)."""
+    try:
+        files = [f for f in os.listdir(log_dir) if f.lower().endswith(".tlb")]
+        files.sort(reverse=True)
+        return files
+    except Exception:
+        return []
+
 def delete_file(path: str) -> bool:
     try:
         if os.path.exists(path):
@@ -0,0 +1,224 @@
+# utils/ingest.py
+"""
+Parallel ingestion of trip logs for analytics.
+
+IngestJob loads a set of logs off the Tk thread:
+  - logs the ParsedLogCache already knows are served from memory (or
+    tail-parsed if they grew) on the job's thread
+  - logs that need a full parse are fanned out to a shared
+    ProcessPoolExecutor; each worker returns a TailReader whose state is
+    two compact numpy arrays (int64 + uint8), so pickling stays cheap
+  - the per-log runs, each already sorted by time, are merged into one
+    time-ordered pair of arrays, or with per_log=True returned as they are
+    (with their reader generation) for callers that bucket each log
+  - with a time_range only that window of each log is read, located by
+    binary search through the shared log reader (utils/log_reader.py)
+
+The Tk side polls progress/completion with after(), like InferenceWorker.poll.
+"""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import config
+from utils.log_cache import ParsedLogCache, open_reader
+from utils.log_parse import parse_csv_text
+from utils.log_reader import state_window
+
+
+def _open_reader_task(csv_path: str, use_npz: bool):
+    # runs in a worker process
+    return open_reader(csv_path, parse_csv_text, use_npz)
+
+
+def _merge_two(ts_a: np.ndarray, codes_a: np.ndarray, ts_b: np.ndarray, codes_b: np.ndarray):
+    """Merge two time-sorted runs, a starting no later than b; on equal timestamps rows of a come first."""
+    # only the part where the two runs overlap in time needs interleaving
+    lo = int(np.searchsorted(ts_a, ts_b[0], side="right"))
+    hi = int(np.searchsorted(ts_b, ts_a[-1], side="right"))
+    mid_a, mid_b = ts_a[lo:], ts_b[:hi]
+    # output slot of every overlapping b row: its rank in b plus the a rows not later than it
+    pos_b = np.searchsorted(mid_a, mid_b, side="right") + np.arange(hi)
+    from_a = np.ones(mid_a.size + hi, dtype=bool)
+    from_a[pos_b] = False
+    ts_mid = np.empty(from_a.size, dtype=np.int64)
+    codes_mid = np.empty(from_a.size, dtype=np.uint8)
+    ts_mid[pos_b], codes_mid[pos_b] = mid_b, codes_b[:hi]
+    ts_mid[from_a], codes_mid[from_a] = mid_a, codes_a[lo:]
+    return (np.concatenate((ts_a[:lo], ts_mid, ts_b[hi:])),
+            np.concatenate((codes_a[:lo], codes_mid, codes_b[hi:])))
+
+
+def merge_sorted_runs(ts_parts: List[np.ndarray], code_parts: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge per-log arrays (each sorted by time) into one time-ordered pair.
+    The runs are ordered by their first timestamp and grouped into clusters
+    that overlap in time. Separate trips do not overlap, so normally every
+    run is its own cluster and the result is one concatenation, O(n).
+    Within a cluster the runs are merged pairwise (a merge tree), each merge
+    placing one run's overlapping rows into the other by binary search.
+    Equal timestamps keep run order (by start time, then log order).
+    """
+    runs = [(t, c) for t, c in zip(ts_parts, code_parts) if t.size]
+    if not runs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+    if len(runs) == 1:
+        return runs[0]
+    runs.sort(key=lambda r: int(r[0][0]))   # stable: equal starts keep log order
+    clusters, end = [], None
+    for run in runs:
+        if end is not None and run[0][0] < end:
+            clusters[-1].append(run)
+            end = max(end, int(run[0][-1]))
+        else:
+            clusters.append([run])
+            end = int(run[0][-1])
+    merged = []
+    for cluster in clusters:
+        while len(cluster) > 1:
+            nxt = [_merge_two(*cluster[i], *cluster[i + 1]) for i in range(0, len(cluster) - 1, 2)]
+            if len(cluster) % 2:
+                nxt.append(cluster[-1])
+            cluster = nxt
+        merged.append(cluster[0])
+    if len(merged) == 1:
+        return merged[0]
+    return np.concatenate([t for t, _ in merged]), np.concatenate([c for _, c in merged])
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared worker pool (config.INGEST_WORKERS, 0 = one per core)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(getattr(config, "INGEST_WORKERS", 0) or 0) or (os.cpu_count() or 1)
+            try:
+                _pool = ProcessPoolExecutor(max_workers=workers)
+            except Exception:
+                _pool = None
+        return _pool
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+
+
+class IngestJob:
+    """
+    Loads and merges the given logs in the background; poll from the Tk thread.
+    result is the merged (ts_ns, codes), or with per_log=True a list of
+    (path, generation, ts_ns, codes) in path order (see TailReader.snapshot).
+    """
+
+    def __init__(self, paths: List[str], cache: ParsedLogCache, min_parallel: int = None, time_range=None,
+                 per_log: bool = False):
+        self.paths = list(paths)
+        self.cache = cache
+        self.time_range = time_range
+        self.per_log = per_log and time_range is None
+        self.min_parallel = int(min_parallel or getattr(config, "INGEST_PARALLEL_MIN_FILES", 4))
+        self.total = len(self.paths)
+        self.completed = 0
+        self.parallel = 0
+        self.result = None
+        self.error = None
+        self.done = False
+        self.cancelled = False
+        self._thread = threading.Thread(target=self._run, name="IngestJob", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def progress(self) -> Tuple[int, int]:
+        return self.completed, self.total
+
+    def _load_inline(self, path, parts):
+        try:
+            parts[path] = self.cache.snapshot(path)
+        except Exception:
+            pass
+        self.completed += 1
+
+    def _load_window(self, path, parts):
+        try:
+            parts[path] = (None,) + state_window(path, self.time_range[0], self.time_range[1], parse_csv_text)
+        except Exception:
+            pass
+        self.completed += 1
+
+    def _finish(self, parts):
+        runs = [(p,) + parts[p] for p in self.paths if p in parts]
+        if self.per_log:
+            self.result = runs
+        else:
+            self.result = merge_sorted_runs([r[2] for r in runs], [r[3] for r in runs])
+
+    def _run(self):
+        parts = {}
+        try:
+            fresh = []
+            if self.time_range is not None:
+                for p in self.paths:
+                    if self.cancelled:
+                        return
+                    self._load_window(p, parts)
+                self._finish(parts)
+                return
+            for p in self.paths:
+                if self.cancelled:
+                    return
+                if self.cache.has_reader(p):
+                    self._load_inline(p, parts)
+                else:
+                    fresh.append(p)
+
+            pool = get_pool() if len(fresh) >= self.min_parallel else None
+            if pool is not None:
+                try:
+                    futures = {pool.submit(_open_reader_task, p, self.cache.use_npz): p for p in fresh}
+                    self.parallel = len(futures)
+                    for fut in as_completed(futures):
+                        if self.cancelled:
+                            for f in futures:
+                                f.cancel()
+                            return
+                        p = futures[fut]
+                        try:
+                            parts[p] = self.cache.adopt(p, *fut.result())
+                            self.completed += 1
+                        except Exception:
+                            self._load_inline(p, parts)
+                    fresh = []
+                except Exception:
+                    # pool unusable (e.g. broken worker): finish whatever is left here
+                    fresh = [p for p in fresh if not self.cache.has_reader(p)]
+            for p in fresh:
+                if self.cancelled:
+                    return
+                self._load_inline(p, parts)
+
+            self._finish(parts)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
@@ -0,0 +1,344 @@
+# utils/log_cache.py
+"""
+Cache of parsed trip logs: (ts_ns, codes) arrays per log file.
+
+Each cached log is a TailReader that remembers the byte offset of the last
+complete row it parsed, so a log that is still being written (the live
+trip) only costs the bytes appended since the previous refresh. Logs are
+read from their binary .tlb sidecar when there is one, else from the CSV.
+
+Entries are keyed by path plus the size and mtime of the CSV and of the
+.tlb; an unchanged log is served from memory (LRU) without reading.
+CSV-only logs are also saved as an .npz next to the CSV (arrays, header
+and offset) so the next app start resumes from there instead of parsing
+the text again. The npz also records the CSV's size, mtime and a CRC of the
+bytes around the start and the saved offset; it is only used while the
+CSV is unchanged or has merely been appended to.
+
+Each reader has a generation that changes whenever rows it already
+returned are replaced or reordered (reset, npz restore, out-of-order
+append); within one generation later arrays only append to earlier ones,
+so consumers (the analytics live view) can fold in just the new tail.
+"""
+import csv
+import itertools
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+import config
+from utils import binlog
+
+NPZ_SUFFIX = ".states.npz"
+_CRC_BYTES = 4096
+
+# parse_text(text, header) -> (ts_ns int64, codes uint8) for complete CSV lines
+TextParser = Callable[[str, List[str]], Tuple[np.ndarray, np.ndarray]]
+
+
+def npz_path(csv_path: str) -> str:
+    """Trip_Log_X.csv -> Trip_Log_X.states.npz"""
+    return os.path.splitext(csv_path)[0] + NPZ_SUFFIX
+
+
+def _stat_key(path: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return -1, -1
+
+
+def file_key(csv_path: str) -> tuple:
+    """(path, csv size, csv mtime_ns, tlb size, tlb mtime_ns)"""
+    return (os.path.abspath(csv_path),) + _stat_key(csv_path) + _stat_key(binlog.sidecar_path(csv_path))
+
+
+_generations = itertools.count(1)
+
+
+def _next_generation() -> tuple:
+    # unique across readers and across the ingestion worker processes they may be built in
+    return os.getpid(), next(_generations)
+
+
+def _empty():
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+
+
+class TailReader:
+    """Parsed state arrays of one log, extended incrementally as the file grows."""
+
+    def __init__(self, csv_path: str, parse_text: TextParser):
+        self.path = csv_path
+        self.tlb = binlog.sidecar_path(csv_path)
+        self.parse_text = parse_text
+        self.generation = None
+        self.reset()
+
+    def reset(self, source: str = None):
+        self.generation = _next_generation()
+        self.source = source
+        self.offset = 0
+        self.header = None
+        self.ts_ns, self.codes = _empty()
+        self.bytes_parsed = 0
+
+    def restore(self, offset: int, header: List[str], ts_ns: np.ndarray, codes: np.ndarray):
+        self.generation = _next_generation()
+        self.source = "csv"
+        self.offset = int(offset)
+        self.header = list(header)
+        self.ts_ns, self.codes = ts_ns, codes
+
+    def _source(self) -> str:
+        try:
+            if os.path.getsize(self.tlb) > binlog.HEADER_SIZE:
+                return "tlb"
+        except OSError:
+            pass
+        return "csv"
+
+    def update(self) -> int:
+        """Parse whatever was appended since the last call; returns the number of new bytes consumed."""
+        source = self._source()
+        if source != self.source:
+            self.reset(source)
+        path = self.tlb if source == "tlb" else self.path
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            self.reset(source)
+            return 0
+        if size < self.offset:
+            # truncated or rewritten: start over
+            self.reset(source)
+        if size == self.offset:
+            return 0
+        before = self.offset
+        if source == "tlb":
+            rec, self.offset = binlog.read_tail(self.tlb, self.offset)
+            ts_ns, codes = binlog.state_arrays(rec)
+        else:
+            ts_ns, codes = self._read_csv(size)
+        self._append(ts_ns, codes)
+        consumed = self.offset - before
+        self.bytes_parsed += consumed
+        return consumed
+
+    def _read_csv(self, size: int):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        # only complete lines; a partially written row waits for the next update
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            return _empty()
+        self.offset += cut + 1
+        text = data[:cut + 1].decode("utf-8", errors="replace")
+        if self.header is None:
+            first, _, text = text.partition("\n")
+            self.header = next(csv.reader([first.lstrip("\ufeff").rstrip("\r")]), [])
+        if not text.strip():
+            return _empty()
+        return self.parse_text(text, self.header)
+
+    def _append(self, ts_ns: np.ndarray, codes: np.ndarray):
+        if ts_ns.size == 0:
+            return
+        if self.ts_ns.size == 0:
+            self.ts_ns, self.codes = ts_ns, codes
+            return
+        out_of_order = ts_ns[0] < self.ts_ns[-1]
+        self.ts_ns = np.concatenate((self.ts_ns, ts_ns))
+        self.codes = np.concatenate((self.codes, codes))
+        if out_of_order:
+            order = np.argsort(self.ts_ns, kind="stable")
+            self.ts_ns, self.codes = self.ts_ns[order], self.codes[order]
+            self.generation = _next_generation()
+
+    def snapshot(self) -> Tuple[tuple, np.ndarray, np.ndarray]:
+        """(generation, ts_ns, codes) as of now; take it while no update() runs."""
+        return self.generation, self.ts_ns, self.codes
+
+
+def _prefix_crc(csv_path: str, offset: int) -> int:
+    """CRC32 of the first block and of the block ending at offset (the part an npz covers)."""
+    with open(csv_path, "rb") as f:
+        crc = zlib.crc32(f.read(min(offset, _CRC_BYTES)))
+        tail = max(0, offset - _CRC_BYTES)
+        f.seek(tail)
+        crc = zlib.crc32(f.read(offset - tail), crc)
+    return crc & 0xFFFFFFFF
+
+
+def _load_npz(csv_path: str, reader: TailReader, csv_key: Tuple[int, int]) -> bool:
+    try:
+        with np.load(npz_path(csv_path)) as z:
+            offset = int(z["offset"])
+            size, mtime_ns, crc = int(z["csv_size"]), int(z["csv_mtime_ns"]), int(z["csv_crc"])
+            if offset > csv_key[0] or csv_key[0] < size:
+                return False
+            # unchanged, or only appended to since the save; anything else is a different file
+            if (csv_key[0], csv_key[1]) != (size, mtime_ns) and _prefix_crc(csv_path, offset) != crc:
+                return False
+            reader.restore(offset, [str(h) for h in z["header"]],
+                           z["ts_ns"].astype(np.int64), z["codes"].astype(np.uint8))
+            return True
+    except Exception:
+        # missing, unreadable, or saved by an older version without the source fields
+        return False
+
+
+def _save_npz(csv_path: str, reader: TailReader):
+    p = npz_path(csv_path)
+    tmp = p + ".tmp"
+    try:
+        size, mtime_ns = _stat_key(csv_path)
+        crc = _prefix_crc(csv_path, reader.offset)
+        with open(tmp, "wb") as fh:
+            np.savez(fh, offset=np.int64(reader.offset), header=np.array(reader.header or [], dtype=str),
+                     ts_ns=reader.ts_ns, codes=reader.codes,
+                     csv_size=np.int64(size), csv_mtime_ns=np.int64(mtime_ns), csv_crc=np.int64(crc))
+        os.replace(tmp, p)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def open_reader(csv_path: str, parse_text: TextParser, use_npz: bool = True) -> Tuple[TailReader, int, tuple]:
+    """
+    New TailReader for a log, resumed from its .npz when possible and
+    brought up to date. Returns (reader, offset restored from the npz or 0,
+    file_key taken before reading). Safe to run in a worker process; the
+    reader pickles with its arrays.
+    """
+    key = file_key(csv_path)
+    reader = TailReader(csv_path, parse_text)
+    restored = 0
+    if use_npz and _stat_key(reader.tlb)[0] < 0 and _load_npz(csv_path, reader, _stat_key(csv_path)):
+        restored = reader.offset
+    reader.update()
+    return reader, restored, key
+
+
+class ParsedLogCache:
+    def __init__(self, parse_text: TextParser, max_entries: int = None, use_npz: bool = None):
+        self.parse_text = parse_text
+        self.max_entries = int(max_entries or getattr(config, "ANALYTICS_CACHE_ENTRIES", 256))
+        self.use_npz = bool(getattr(config, "ANALYTICS_NPZ_CACHE", True) if use_npz is None else use_npz)
+        self._entries = OrderedDict()   # abs path -> [key, TailReader, offset saved to npz]
+        self._lock = threading.Lock()
+        self._path_locks = {}           # abs path -> RLock serializing parses/updates of that log
+
+        # counters
+        self.hits = 0
+        self.npz_hits = 0
+        self.tail_updates = 0
+        self.misses = 0
+
+    def _path_lock(self, path: str):
+        with self._lock:
+            lock = self._path_locks.get(path)
+            if lock is None:
+                lock = self._path_locks[path] = threading.RLock()
+            return lock
+
+    def _entry(self, path: str):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+            return entry
+
+    def cached(self, csv_path: str, key: tuple = None):
+        """(ts_ns, codes) if the log is cached and unchanged on disk, else None."""
+        hit = self._cached_snapshot(csv_path, key)
+        return hit[1:] if hit is not None else None
+
+    def _cached_snapshot(self, csv_path: str, key: tuple = None):
+        key = key or file_key(csv_path)
+        entry = self._entry(key[0])
+        if entry is not None and entry[0] == key:
+            # not while another job is updating the reader (its arrays change in two steps)
+            with self._path_lock(key[0]):
+                self.hits += 1
+                return entry[1].snapshot()
+        return None
+
+    def has_reader(self, csv_path: str) -> bool:
+        """True when the log has a reader that can tail-parse it (no full parse needed)."""
+        return self._entry(os.path.abspath(csv_path)) is not None
+
+    def get(self, csv_path: str) -> Tuple[np.ndarray, np.ndarray]:
+        return self.snapshot(csv_path)[1:]
+
+    def snapshot(self, csv_path: str) -> Tuple[tuple, np.ndarray, np.ndarray]:
+        """Like get(), with the reader's generation first (see TailReader.snapshot)."""
+        # the key is taken before reading, so rows appended meanwhile show up as a change next time
+        key = file_key(csv_path)
+        hit = self._cached_snapshot(csv_path, key)
+        if hit is not None:
+            return hit
+        # a cancelled IngestJob may still be updating this log's reader; a second
+        # update() of the same TailReader would append the new rows twice
+        with self._path_lock(key[0]):
+            hit = self._cached_snapshot(csv_path, key)
+            if hit is not None:
+                return hit
+            entry = self._entry(key[0])
+            if entry is None:
+                return self.adopt(csv_path, *open_reader(csv_path, self.parse_text, self.use_npz))
+            self.tail_updates += 1
+            entry[1].update()
+            return self._store(entry, key)
+
+    def adopt(self, csv_path: str, reader: TailReader, restored: int, key: tuple) -> Tuple[tuple, np.ndarray, np.ndarray]:
+        """Take over a reader from open_reader (possibly run by an ingestion worker); returns its snapshot."""
+        with self._path_lock(key[0]):
+            if restored:
+                self.npz_hits += 1
+            else:
+                self.misses += 1
+            reader.parse_text = self.parse_text
+            return self._store([None, reader, restored], key)
+
+    def _store(self, entry, key: tuple):
+        reader = entry[1]
+        csv_path = reader.path
+        entry[0] = key
+        self.put(entry)
+        # persist CSV parses, but not after every small live append
+        if self.use_npz and reader.source == "csv":
+            grown = reader.offset - entry[2]
+            if grown > 0 and (entry[2] == 0 or grown >= max(1 << 20, entry[2] // 4)):
+                _save_npz(csv_path, reader)
+                entry[2] = reader.offset
+        return reader.snapshot()
+
+    def put(self, entry):
+        path = entry[0][0]
+        with self._lock:
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, csv_path: str = None):
+        with self._lock:
+            if csv_path is None:
+                self._entries.clear()
+                self._path_locks.clear()
+            else:
+                self._entries.pop(os.path.abspath(csv_path), None)
+                self._path_locks.pop(os.path.abspath(csv_path), None)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "npz_hits": self.npz_hits,
+                "tail_updates": self.tail_updates, "misses": self.misses}
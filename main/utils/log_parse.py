@@ -0,0 +1,130 @@
+# utils/log_parse.py
+"""
+Vectorized parsing of trip logs into (ts_ns int64, codes uint8) arrays.
+
+Kept free of any GUI imports so the parallel ingestion workers
+(utils/ingest.py) can import it cheaply.
+"""
+import io
+import os
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import binlog
+from utils.log_reader import TIME_FORMATS as _TIME_FORMATS
+
+# --- Helper: read CSV and return (timestamps, state codes) arrays ---
+_STATE_TEXT_COLS = ("state", "State", "status", "Status", "EventType", "Event", "Type", "Details")
+
+EMPTY_EVENTS = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8))
+
+
+def parse_timestamps(col: pd.Series) -> pd.Series:
+    """
+    Vectorized timestamp parsing: each known format is tried on the whole
+    column (only on rows still unparsed), then pandas' own inference for the rest.
+    """
+    out = pd.Series(pd.NaT, index=col.index, dtype="datetime64[ns]")
+    todo = col.notna()
+    for fmt in _TIME_FORMATS:
+        if not todo.any():
+            break
+        parsed = pd.to_datetime(col[todo], format=fmt, errors="coerce")
+        ok = parsed.notna()
+        out.loc[ok[ok].index] = parsed[ok]
+        todo.loc[ok[ok].index] = False
+    if todo.any():
+        try:
+            parsed = pd.to_datetime(col[todo], errors="coerce")
+            if getattr(parsed.dt, "tz", None) is not None:
+                parsed = parsed.dt.tz_localize(None)
+            ok = parsed.notna()
+            out.loc[ok[ok].index] = parsed[ok]
+        except Exception:
+            pass
+    return out
+
+
+def classify_states(df: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized row classification: joins the state-like columns of every row
+    and classifies each distinct text once (categorical mapping). Returns
+    uint8 codes (utils/binlog.py STATE_* values, 0 = unknown).
+    """
+    cols = [c for c in _STATE_TEXT_COLS if c in df.columns]
+    if not cols:
+        return np.zeros(len(df), dtype=np.uint8)
+    text = df[cols[0]].fillna("")
+    for c in cols[1:]:
+        text = text + " " + df[c].fillna("")
+    inv, uniques = pd.factorize(text, sort=False)
+    lut = np.fromiter((binlog.classify_state(u) for u in uniques), dtype=np.uint8, count=len(uniques))
+    return lut[inv]
+
+
+def extract_state_events_from_csv(path: str, timestamp_cols: List[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (ts_ns, codes): naive local timestamps as int64 nanoseconds and
+    uint8 state codes, for every row with a parseable time and a known state,
+    sorted by time.
+    """
+    try:
+        df = pd.read_csv(path, dtype=str, low_memory=False)
+    except Exception:
+        return EMPTY_EVENTS
+    return events_from_frame(df, timestamp_cols)
+
+
+def parse_csv_text(text: str, header: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Same as extract_state_events_from_csv for a chunk of complete CSV lines (no header row)."""
+    try:
+        df = pd.read_csv(io.StringIO(text), header=None, names=header, dtype=str, low_memory=False)
+    except Exception:
+        return EMPTY_EVENTS
+    return events_from_frame(df)
+
+
+def events_from_frame(df: pd.DataFrame, timestamp_cols: List[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    if timestamp_cols is None:
+        timestamp_cols = ["Timestamp", "timestamp", "Time", "time", "ts", "datetime", "DateTime", "Date"]
+
+    # find timestamp column
+    time_col = None
+    for c in timestamp_cols:
+        if c in df.columns:
+            time_col = c
+            break
+    if time_col is None:
+        for c in df.columns:
+            if any(k in c.lower() for k in ("time", "timestamp", "date")):
+                time_col = c
+                break
+    if time_col is None or df.empty:
+        return EMPTY_EVENTS
+
+    stamps = parse_timestamps(df[time_col])
+    codes = classify_states(df)
+    keep = stamps.notna().to_numpy() & (codes > 0)
+    ts_ns = stamps.to_numpy()[keep].astype("datetime64[ns]").view(np.int64)
+    codes = codes[keep]
+    if ts_ns.size > 1 and np.any(np.diff(ts_ns) < 0):
+        order = np.argsort(ts_ns, kind="stable")
+        ts_ns, codes = ts_ns[order], codes[order]
+    return ts_ns, codes
+
+# --- Helper: events for one log, from the binary sidecar when one exists ---
+def load_state_events(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Like extract_state_events_from_csv, but reads the fixed-width .tlb
+    sidecar written by the logger (no text parsing) when it is available.
+    Older logs without a sidecar fall back to the CSV.
+    """
+    tlb = binlog.sidecar_path(path)
+    try:
+        if os.path.getsize(tlb) > binlog.HEADER_SIZE:
+            return binlog.read_state_arrays(tlb)
+    except Exception:
+        pass
+    return extract_state_events_from_csv(path)
@@ -0,0 +1,673 @@
+# utils/log_reader.py
+"""
+Shared random-access reader for trip logs.
+
+TripLogReader memory-maps a CSV trip log and keeps a row-offset index: the
+byte offset of every line start as a compact uint64 array (the numpy
+equivalent of array('Q')). The index is
+  - built in 4 MB steps over the mapping (numpy newline search) on a
+    background thread; batch callers can wait for it
+  - extended from where it stopped when the log grows, never rebuilt
+  - persisted next to the log (Trip_Log_X.rows.idx), so reopening a large
+    log costs one small read instead of a full scan
+
+With the index any row is one slice of the mapping away (zero copy,
+memoryview), and because rows are appended in time order a time window
+("rows between 14:02 and 14:07") is found by binary search on the
+timestamp column: O(log n) timestamp parses whatever the log size.
+
+.tlb binary logs (utils/binlog.py) have fixed-width records and need no
+index; BinaryLogSource exposes them through the same interface.
+EventFilter scans a log block by block for one EventType and keeps only
+the matching row numbers.
+"""
+import csv
+import io
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime, time as dtime, timedelta
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+import config
+from utils import binlog
+
+CHUNK_BYTES = 4 << 20
+
+IDX_SUFFIX = ".rows.idx"
+IDX_MAGIC = b"ROWIDX01"
+# magic, indexed end offset, crc32 of the first bytes of the log (detects a rewritten file)
+IDX_HEADER = struct.Struct("<8sqI")
+_CRC_BYTES = 4096
+
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d_%H-%M-%S", "%d-%m-%Y %H:%M:%S",
+                "%m/%d/%Y %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%d/%m/%Y %H:%M:%S")
+_CLOCK_RANGE = re.compile(r"^\s*(\d{1,2}:\d{2}(?::\d{2})?)\s*-\s*(\d{1,2}:\d{2}(?::\d{2})?)\s*$")
+
+TimeLike = Union[datetime, dtime, str, None]
+
+
+def index_path(csv_path: str) -> str:
+    """Trip_Log_X.csv -> Trip_Log_X.rows.idx"""
+    return os.path.splitext(csv_path)[0] + IDX_SUFFIX
+
+
+def parse_time(text: str) -> Optional[Union[datetime, dtime]]:
+    """"2024-05-01 14:02:00" (any TIME_FORMATS entry) -> datetime; "14:02" / "14:02:30" -> time."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_time_range(text: str) -> Optional[Tuple[TimeLike, TimeLike]]:
+    """
+    "14:02-14:07", "14:02 to 14:07", "<datetime> .. <datetime>" -> (start, end);
+    a single time gives (start, None). None if nothing parses.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    m = _CLOCK_RANGE.match(text)
+    if m:
+        a, b = m.groups()
+    else:
+        for sep in ("..", " to ", " - "):
+            if sep in text:
+                a, b = text.split(sep, 1)
+                break
+        else:
+            a, b = text, ""
+    start, end = parse_time(a), parse_time(b)
+    if start is None and end is None:
+        return None
+    return start, end
+
+
+class _GrowableArray:
+    """Append-only uint64 array with amortized doubling (readers see a consistent prefix)."""
+
+    def __init__(self, capacity: int = 1 << 16):
+        self._buf = np.empty(capacity, dtype=np.uint64)
+        self.size = 0
+
+    def extend(self, values: np.ndarray):
+        n = self.size + values.size
+        if n > self._buf.size:
+            buf = np.empty(max(n, self._buf.size * 2), dtype=np.uint64)
+            buf[:self.size] = self._buf[:self.size]
+            self._buf = buf
+        self._buf[self.size:n] = values
+        self.size = n
+
+    def view(self) -> np.ndarray:
+        return self._buf[:self.size]
+
+
+def _parse_lines(data) -> List[List[str]]:
+    text = bytes(data).decode("utf-8", errors="replace")
+    return list(csv.reader(io.StringIO(text)))
+
+
+class TripLogReader:
+    """mmap + row-offset index over one CSV trip log (line 0 is the header)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.complete = False
+        self._mm = None
+        self._mm_size = 0
+        self._retired = []      # replaced mappings, closed once no view of them is alive
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = False
+        self._fmt = TIME_FORMATS[0]
+        self._reset_index()
+
+    # ---------- mapping ----------
+    def _mapping(self):
+        """Current mapping, remapped when the file has grown (old views stay valid)."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return None
+        if self._mm is None or size != self._mm_size:
+            if size == 0:
+                return None
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mm is not None:
+                self._retired.append(self._mm)
+            self._mm, self._mm_size = mm, size
+            # the index thread reads its own mapping without exporting a view, so only sweep when it is idle
+            t = self._thread
+            if t is None or not t.is_alive() or t is threading.current_thread():
+                self._sweep()
+        return self._mm
+
+    def _sweep(self):
+        """Close retired mappings; one still exported (memoryview / np.frombuffer) is kept for later."""
+        alive = []
+        for mm in self._retired:
+            try:
+                mm.close()
+            except BufferError:
+                alive.append(mm)
+        self._retired = alive
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stop the index thread and unmap the file. A live mapping keeps the
+        file locked on Windows, so this must run before it is deleted or
+        truncated; row access afterwards simply maps it again.
+        """
+        self.stop()
+        self.wait(timeout)
+        with self._lock:
+            if self._mm is not None:
+                self._retired.append(self._mm)
+            self._mm, self._mm_size = None, 0
+            self._sweep()
+
+    # ---------- index ----------
+    def _reset_index(self):
+        self._starts = _GrowableArray()
+        self._starts.extend(np.zeros(1, dtype=np.uint64))
+        self.end = 0            # byte just past the last indexed (complete) line
+        self.header = []
+        self._persisted_end = 0
+        self._base_date = None
+
+    @staticmethod
+    def _crc(mm, end: int) -> int:
+        return zlib.crc32(mm[:min(end, _CRC_BYTES)]) & 0xFFFFFFFF
+
+    def _load_index(self, mm) -> bool:
+        try:
+            with open(index_path(self.path), "rb") as f:
+                magic, end, crc = IDX_HEADER.unpack(f.read(IDX_HEADER.size))
+                if magic != IDX_MAGIC or end <= 0 or end > len(mm) or mm[end - 1:end] != b"\n":
+                    return False
+                if self._crc(mm, end) != crc:
+                    return False
+                starts = np.fromfile(f, dtype="<u8")
+            if starts.size == 0 or int(starts[0]) != 0 or int(starts[-1]) != end:
+                return False
+        except Exception:
+            return False
+        self._starts = _GrowableArray(starts.size + (1 << 12))
+        self._starts.extend(starts)
+        self.end = self._persisted_end = end
+        return True
+
+    def _save_index(self, mm):
+        if self.end < int(getattr(config, "LOG_INDEX_MIN_BYTES", 1 << 20)):
+            return
+        p = index_path(self.path)
+        tmp = p + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(IDX_HEADER.pack(IDX_MAGIC, self.end, self._crc(mm, self.end)))
+                self._starts.view().astype("<u8", copy=False).tofile(f)
+            os.replace(tmp, p)
+            self._persisted_end = self.end
+        except Exception:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+
+    def _load_header(self, mm):
+        if self.header or mm is None:
+            return
+        nl = mm.find(b"\n")
+        first = mm[:nl if nl >= 0 else min(len(mm), 1 << 16)]
+        self.header = next(csv.reader([first.decode("utf-8", errors="replace")
+                                        .lstrip("\ufeff").rstrip("\r")]), [])
+
+    def ensure(self, background: bool = True):
+        """
+        Bring the index up to date with the file: loaded from the .rows.idx
+        when valid, then extended over any appended bytes. The scan runs on a
+        background thread; background=False waits for it.
+        """
+        with self._lock:
+            running = self._thread is not None and self._thread.is_alive()
+            if not running:
+                try:
+                    self._load_header(self._mapping())
+                except Exception:
+                    pass
+                try:
+                    stale = not self.complete or os.path.getsize(self.path) != self.end
+                except OSError:
+                    stale = False
+                if stale:
+                    self.complete = False
+                    self._stop = False
+                    self._thread = threading.Thread(target=self._build, name="TripLogIndex", daemon=True)
+                    self._thread.start()
+            thread = self._thread
+        if not background and thread is not None:
+            thread.join()
+        return self
+
+    def stop(self):
+        self._stop = True
+
+    def wait(self, timeout: float = None):
+        t = self._thread
+        if t is not None:
+            t.join(timeout)
+
+    def _build(self):
+        try:
+            mm = self._mapping()
+            if mm is None:
+                self._reset_index()
+                return
+            size = len(mm)
+            if size < self.end or (self.end and mm[self.end - 1:self.end] != b"\n"):
+                self._reset_index()      # truncated / rewritten
+            if self.end == 0:
+                self._load_index(mm)
+            self._load_header(mm)
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            pos = self.end
+            while pos < size and not self._stop:
+                stop = min(size, pos + CHUNK_BYTES)
+                nl = np.flatnonzero(buf[pos:stop] == 10)
+                if nl.size:
+                    starts = (nl + 1).astype(np.uint64) + np.uint64(pos)
+                    self._starts.extend(starts)
+                    self.end = int(starts[-1])
+                pos = stop
+            del buf
+            if not self._stop:
+                # persist after the first full build and whenever it grew noticeably
+                grown = self.end - self._persisted_end
+                if grown > 0 and (self._persisted_end == 0 or grown >= max(1 << 20, self._persisted_end // 4)):
+                    self._save_index(mm)
+        except Exception:
+            pass
+        finally:
+            if not self._stop:
+                self.complete = True
+
+    # ---------- random access ----------
+    def row_count(self) -> int:
+        """Complete data rows indexed so far (header excluded)."""
+        # the last start is the end of the last complete line
+        return max(0, self._starts.size - 2)
+
+    def offsets(self) -> np.ndarray:
+        """Row-offset index: offsets()[i + 1] is where data row i starts."""
+        return self._starts.view()
+
+    def span(self, first_row: int, count: int) -> Tuple[int, int]:
+        """Byte range [a, b) of data rows first_row .. first_row+count-1."""
+        starts = self._starts.view()
+        n = max(0, starts.size - 2)
+        first_row = max(0, min(first_row, n))
+        last = max(first_row, min(first_row + count, n))
+        return int(starts[first_row + 1]), int(starts[last + 1])
+
+    def slice(self, first_row: int, count: int) -> memoryview:
+        """Raw bytes of a run of rows as a zero-copy view of the mapping."""
+        a, b = self.span(first_row, count)
+        mm = self._mapping()
+        if mm is None or b <= a:
+            return memoryview(b"")
+        return memoryview(mm)[a:b]
+
+    def iter_chunks(self, chunk_bytes: int = CHUNK_BYTES):
+        """The indexed part of the file (header included) as zero-copy views of about chunk_bytes each."""
+        mm = self._mapping()
+        if mm is None:
+            return
+        view = memoryview(mm)
+        starts = self._starts.view()
+        pos = 0
+        while pos < self.end:
+            # cut on a line boundary
+            i = int(np.searchsorted(starts, np.uint64(pos + chunk_bytes), side="right")) - 1
+            nxt = int(starts[i]) if int(starts[i]) > pos else min(self.end, pos + chunk_bytes)
+            yield view[pos:nxt]
+            pos = nxt
+
+    def row_bytes(self, i: int) -> memoryview:
+        return self.slice(i, 1)
+
+    def read_rows(self, first: int, count: int) -> List[List[str]]:
+        return _parse_lines(self.slice(first, count))
+
+    def read_row_numbers(self, rows: np.ndarray) -> List[List[str]]:
+        """Rows by number (e.g. a filtered window); consecutive runs are sliced together."""
+        out = []
+        if rows.size == 0:
+            return out
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        for run in np.split(rows, breaks):
+            out.extend(_parse_lines(self.slice(int(run[0]), run.size)))
+        return out
+
+    def tail_rows(self, count: int) -> List[List[str]]:
+        """Last `count` rows, found backwards from the end (no index needed)."""
+        mm = self._mapping()
+        if mm is None:
+            return []
+        end = mm.rfind(b"\n") + 1
+        pos = end - 1
+        for _ in range(count + 1):
+            if pos < 0:
+                break
+            pos = mm.rfind(b"\n", 0, pos)
+        lines = mm[pos + 1:end].split(b"\n")[:-1]
+        if pos < 0 and lines:
+            lines = lines[1:]       # reached the header
+        return _parse_lines(b"\n".join(lines[-count:]) + b"\n") if lines else []
+
+    # ---------- time lookups ----------
+    def _row_time(self, i: int) -> Optional[datetime]:
+        raw = bytes(self.row_bytes(i))
+        field = raw.split(b",", 1)[0].strip().strip(b'"').decode("utf-8", errors="replace")
+        try:
+            return datetime.strptime(field, self._fmt)
+        except ValueError:
+            pass
+        for fmt in TIME_FORMATS:
+            try:
+                t = datetime.strptime(field, fmt)
+                self._fmt = fmt
+                return t
+            except ValueError:
+                pass
+        return None
+
+    def timestamp(self, i: int) -> Optional[datetime]:
+        """Timestamp of data row i; an unparseable row borrows the next parseable one."""
+        for j in range(i, min(self.row_count(), i + 16)):
+            t = self._row_time(j)
+            if t is not None:
+                return t
+        return None
+
+    def base_date(self) -> Optional[date]:
+        """Date of the first row, used for time-of-day lookups."""
+        if self._base_date is None and self.row_count():
+            t = self.timestamp(0)
+            self._base_date = t.date() if t is not None else None
+        return self._base_date
+
+    def _resolve(self, t: TimeLike) -> Optional[datetime]:
+        if isinstance(t, str):
+            t = parse_time(t)
+        if isinstance(t, dtime):
+            base = self.base_date()
+            return datetime.combine(base, t) if base is not None else None
+        return t
+
+    def bisect_time(self, t: datetime, side: str = "left") -> int:
+        """First row whose timestamp is >= t (side="left") or > t (side="right")."""
+        lo, hi = 0, self.row_count()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = self.timestamp(mid)
+            if ts is None or ts < t or (side == "right" and ts == t):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows_between(self, start: TimeLike = None, end: TimeLike = None) -> Tuple[int, int]:
+        """
+        Row range [first, last) with start <= timestamp <= end, by binary search.
+        Times of day ("14:02", datetime.time) are taken on the log's first date;
+        an end time of day earlier than the start is on the following day.
+        """
+        a, b = _window(self._resolve(start), self._resolve(end), end)
+        first = self.bisect_time(a) if a is not None else 0
+        last = self.bisect_time(b, "right") if b is not None else self.row_count()
+        return first, max(first, last)
+
+    def slice_between(self, start: TimeLike = None, end: TimeLike = None) -> memoryview:
+        first, last = self.rows_between(start, end)
+        return self.slice(first, last - first)
+
+
+def _window(a: Optional[datetime], b: Optional[datetime], end: TimeLike):
+    if a is not None and b is not None and b < a and isinstance(end, (dtime, str)):
+        b += timedelta(days=1)
+    return a, b
+
+
+class BinaryLogSource:
+    """.tlb records are fixed width: row i is at HEADER_SIZE + i * RECORD_SIZE."""
+
+    header = ["Timestamp", "EventType", "State"]
+    complete = True
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def ensure(self, background: bool = True):
+        return self
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def wait(self, timeout: float = None):
+        pass
+
+    def row_count(self) -> int:
+        try:
+            return max(0, (os.path.getsize(self.path) - binlog.HEADER_SIZE) // binlog.RECORD_SIZE)
+        except OSError:
+            return 0
+
+    def records(self):
+        """All records as a read-only memmap (nothing is read until sliced)."""
+        n = self.row_count()
+        if n == 0:
+            return np.zeros(0, dtype=binlog.record_dtype())
+        return np.memmap(self.path, dtype=binlog.record_dtype(), mode="r",
+                         offset=binlog.HEADER_SIZE, shape=(n,))
+
+    def _rows(self, rec) -> List[List[str]]:
+        out = []
+        for ts_ms, ev, st in zip(rec["ts_ms"].tolist(), rec["event"].tolist(), rec["state"].tolist()):
+            out.append([datetime.fromtimestamp(ts_ms / 1000.0).strftime("%Y-%m-%d %H:%M:%S"),
+                        binlog.EVENT_NAMES[ev] if ev < len(binlog.EVENT_NAMES) else "",
+                        binlog.STATE_LABELS[st] if st < len(binlog.STATE_LABELS) else ""])
+        return out
+
+    def read_rows(self, first: int, count: int) -> List[List[str]]:
+        first = max(0, first)
+        return self._rows(self.records()[first:first + max(0, count)])
+
+    def read_row_numbers(self, rows: np.ndarray) -> List[List[str]]:
+        if rows.size == 0:
+            return []
+        # only the pages holding the requested records are touched
+        return self._rows(self.records()[rows.astype(np.int64)])
+
+    def tail_rows(self, count: int) -> List[List[str]]:
+        n = self.row_count()
+        return self.read_rows(max(0, n - count), count)
+
+    def _resolve(self, t: TimeLike) -> Optional[datetime]:
+        if isinstance(t, str):
+            t = parse_time(t)
+        if isinstance(t, dtime):
+            rec = self.records()
+            if rec.size == 0:
+                return None
+            return datetime.combine(datetime.fromtimestamp(int(rec["ts_ms"][0]) / 1000.0).date(), t)
+        return t
+
+    def rows_between(self, start: TimeLike = None, end: TimeLike = None) -> Tuple[int, int]:
+        """Same as TripLogReader.rows_between; ts_ms is searched directly."""
+        ts_ms = self.records()["ts_ms"]
+        a, b = _window(self._resolve(start), self._resolve(end), end)
+        first = int(np.searchsorted(ts_ms, int(a.timestamp() * 1000), "left")) if a is not None else 0
+        last = int(np.searchsorted(ts_ms, int(b.timestamp() * 1000), "right")) if b is not None else ts_ms.size
+        return first, max(first, last)
+
+
+class EventFilter:
+    """
+    Row numbers whose EventType equals `event_type`, found by scanning the
+    log block by block in the background (only matching row numbers are kept).
+    """
+
+    def __init__(self, source, event_type: str):
+        self.source = source
+        self.event_type = event_type
+        self._rows = _GrowableArray(1 << 12)
+        self.scanned_rows = 0
+        self.complete = False
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="EventFilter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = False, timeout: float = 5.0):
+        """Stop the scan; wait=True also lets go of its views of the log (before a delete)."""
+        self._stop = True
+        if wait and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def rows(self) -> np.ndarray:
+        return self._rows.view()
+
+    def _run(self):
+        try:
+            if isinstance(self.source, BinaryLogSource):
+                self._scan_binary()
+            else:
+                self._scan_csv()
+        except Exception:
+            pass
+        self.complete = True
+
+    def _scan_binary(self):
+        code = binlog.EVENT_CODES.get(self.event_type, -1)
+        events = self.source.records()["event"]
+        step = CHUNK_BYTES // binlog.RECORD_SIZE
+        for first in range(0, events.size, step):
+            if self._stop:
+                return
+            hits = np.flatnonzero(events[first:first + step] == code) + first
+            self._rows.extend(hits.astype(np.uint64))
+            self.scanned_rows = min(events.size, first + step)
+
+    def _scan_csv(self):
+        reader = self.source
+        target = np.frombuffer(self.event_type.encode("utf-8"), dtype=np.uint8)
+        row = 0
+        while not self._stop:
+            n = reader.row_count()
+            if row >= n:
+                if reader.complete:
+                    return
+                reader.wait(0.05)
+                continue
+            # rows per block: about CHUNK_BYTES worth
+            starts = reader.offsets()
+            a = int(starts[row + 1])
+            hi = int(np.searchsorted(starts, np.uint64(a + CHUNK_BYTES), side="right"))
+            count = max(1, min(n - row, hi - 1 - row))
+            buf = np.frombuffer(reader.slice(row, count), dtype=np.uint8)
+            line_starts = (starts[row + 1:row + count + 1] - np.uint64(a)).astype(np.int64)
+            commas = np.flatnonzero(buf == 44)
+            # EventType is the 2nd field: between the first and second comma of each line
+            c = np.searchsorted(commas, line_starts)
+            ok = c + 1 < commas.size
+            hits = np.zeros(count, dtype=bool)
+            if ok.any():
+                c1 = commas[c[ok]]
+                c2 = commas[c[ok] + 1]
+                match = (c2 - c1 - 1) == target.size
+                for k in range(target.size):
+                    idx = np.minimum(c1 + 1 + k, buf.size - 1)
+                    match &= buf[idx] == target[k]
+                hits[np.flatnonzero(ok)] = match
+            del buf
+            self._rows.extend((np.flatnonzero(hits) + row).astype(np.uint64))
+            row += count
+            self.scanned_rows = row
+
+
+# ---------- shared readers ----------
+_sources = OrderedDict()
+_sources_lock = threading.Lock()
+MAX_CACHED = 16
+
+
+def open_log(path: str, background: bool = True):
+    """
+    Shared reader for a .csv (TripLogReader) or .tlb (BinaryLogSource) log,
+    brought up to date; background=False waits for the index.
+    """
+    key = os.path.abspath(path)
+    with _sources_lock:
+        src = _sources.get(key)
+        if src is None:
+            src = BinaryLogSource(key) if key.lower().endswith(binlog.EXT) else TripLogReader(key)
+            _sources[key] = src
+            while len(_sources) > MAX_CACHED:
+                _, old = _sources.popitem(last=False)
+                old.close()
+        _sources.move_to_end(key)
+    return src.ensure(background=background)
+
+
+def forget(path: str):
+    """Drop and unmap the shared reader of path; call before deleting or truncating the file."""
+    with _sources_lock:
+        src = _sources.pop(os.path.abspath(path), None)
+    if src is not None:
+        src.close()
+
+
+def state_window(csv_path: str, start: TimeLike, end: TimeLike, parse_text) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (ts_ns, codes) of the rows between start and end only, without reading
+    the rest of the log. Uses the .tlb sidecar when there is one;
+    parse_text is utils.log_parse.parse_csv_text.
+    """
+    tlb = binlog.sidecar_path(csv_path)
+    try:
+        if os.path.getsize(tlb) > binlog.HEADER_SIZE:
+            src = open_log(tlb)
+            first, last = src.rows_between(start, end)
+            return binlog.state_arrays(np.array(src.records()[first:last]))
+    except OSError:
+        pass
+    reader = open_log(csv_path, background=False)
+    first, last = reader.rows_between(start, end)
+    if last <= first:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+    text = bytes(reader.slice(first, last - first)).decode("utf-8", errors="replace")
+    return parse_text(text, reader.header)
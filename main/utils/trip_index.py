@@ -0,0 +1,606 @@
+# utils/trip_index.py
+"""
+SQLite catalog of trips, their log/report files, per-trip counters and
+per-minute state rollups.
+
+The trip log writer updates it incrementally after every batch it writes
+(record_log_rows) and generate_report registers the report (record_report),
+so the Analytics / Raw Logs / Reports views list trips with one indexed
+query instead of scanning and re-reading the directories.
+
+Each trip remembers how many bytes of its CSV the counters cover
+(log_indexed_bytes). A batch is only counted for the part of the file past
+that offset, so a sync_logs rebuild racing the live writer (forced Refresh
+during a trip) never counts the same rows twice.
+
+state_minutes holds Attentive/Yawn/Drowsy counts per trip and minute,
+classified like the analytics parser does (every row, by its EventType and
+Details text), so minute-or-wider analytics buckets are summed from it
+instead of parsing the logs (minute_rollups / fresh_minute_rollups).
+
+Logs or reports written by older versions (or copied in by hand) are picked
+up by sync_logs / sync_reports, which only re-read files whose size or mtime
+differ from the catalog and drop entries for files that disappeared.
+
+Times are "wall" seconds: the naive local timestamps of the CSV, counted
+from 1970-01-01 as if they were UTC. That is the time axis analytics plots.
+
+Each call opens its own short-lived connection (WAL mode), so the writer
+thread and the UI thread can use the index concurrently.
+"""
+import calendar
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+from utils import binlog
+from utils.log_reader import TIME_FORMATS
+
+_LOG_RE = re.compile(r"^Trip_Log_(.+)\.csv$", re.IGNORECASE)
+_REPORT_RE = re.compile(r"^Trip_Report_(.+)\.txt$", re.IGNORECASE)
+# bump to rebuild every log's counters and rollups on the next sync
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trips (
+    trip_key        TEXT PRIMARY KEY,
+    start_ts        INTEGER,
+    end_ts          INTEGER,
+    duration_s      REAL,
+    yawn_warnings   INTEGER NOT NULL DEFAULT 0,
+    drowsy_warnings INTEGER NOT NULL DEFAULT 0,
+    state_samples   INTEGER NOT NULL DEFAULT 0,
+    safety_score    INTEGER,
+    log_dir         TEXT,
+    log_file        TEXT,
+    log_bytes       INTEGER,
+    log_mtime       REAL,
+    log_indexed_bytes INTEGER,
+    report_dir      TEXT,
+    report_file     TEXT,
+    report_bytes    INTEGER,
+    report_mtime    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trips_start ON trips(start_ts);
+CREATE INDEX IF NOT EXISTS idx_trips_warnings ON trips(drowsy_warnings, yawn_warnings);
+CREATE INDEX IF NOT EXISTS idx_trips_log ON trips(log_dir, log_file);
+CREATE INDEX IF NOT EXISTS idx_trips_report ON trips(report_dir, report_file);
+
+CREATE TABLE IF NOT EXISTS state_minutes (
+    trip_key  TEXT NOT NULL,
+    minute    INTEGER NOT NULL,
+    attentive INTEGER NOT NULL DEFAULT 0,
+    yawn      INTEGER NOT NULL DEFAULT 0,
+    drowsy    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (trip_key, minute)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_state_minutes_minute ON state_minutes(minute);
+"""
+
+_STATE_COLUMNS = {binlog.STATE_ATTENTIVE: "attentive", binlog.STATE_YAWN: "yawn", binlog.STATE_DROWSY: "drowsy"}
+
+
+def trip_key_for(filename: str) -> str:
+    """Trip_Log_<key>.csv / Trip_Report_<key>.txt -> <key>; other names map to their stem."""
+    name = os.path.basename(filename)
+    m = _LOG_RE.match(name) or _REPORT_RE.match(name)
+    return m.group(1) if m else os.path.splitext(name)[0]
+
+
+def wall_seconds(ts: str) -> Optional[int]:
+    # same formats as the analytics parser, the app's own first
+    for fmt in TIME_FORMATS:
+        try:
+            return calendar.timegm(datetime.strptime(ts, fmt).timetuple())
+        except Exception:
+            continue
+    return None
+
+
+class _Rollup:
+    """Aggregates log rows into trip counters and per-minute state counts."""
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+        self.first = None
+        self.last = None
+        self.yawn = 0
+        self.drowsy = 0
+        self.samples = 0
+        self.minutes: Dict[int, List[int]] = {}
+
+    def add(self, ts: str, event_type: str, details: str):
+        t = wall_seconds(ts)
+        if t is None:
+            return
+        self.first = t if self.first is None else min(self.first, t)
+        self.last = t if self.last is None else max(self.last, t)
+        if event_type == "Trip_Start":
+            self.start = t
+        elif event_type == "Trip_End":
+            self.end = t
+        elif event_type == "Yawn_Warning":
+            self.yawn += 1
+        elif event_type == "Drowsy_Warning":
+            self.drowsy += 1
+        code = binlog.classify_state(f"{event_type} {details}")
+        if code in _STATE_COLUMNS:
+            if event_type == "State":
+                self.samples += 1
+            row = self.minutes.setdefault(t // 60, [0, 0, 0])
+            row[code - 1] += 1
+
+
+def _roll_file(path: str, start: int = 0, end: int = None):
+    """
+    Roll up the complete CSV lines of path from byte `start` (up to `end`).
+    Returns (rollup, offset just past the last line read); a line still
+    being written (no newline yet) is left for the next call.
+    """
+    import csv
+    roll = _Rollup()
+    pos = start
+
+    def lines(fh):
+        nonlocal pos
+        for raw in fh:
+            if not raw.endswith(b"\n") or (end is not None and pos + len(raw) > end):
+                break
+            pos += len(raw)
+            yield raw.decode("utf-8", errors="ignore")
+
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        # the header row has no parseable timestamp, so _Rollup.add skips it
+        for r in csv.reader(lines(fh)):
+            if len(r) >= 3:
+                roll.add(r[0], r[1], r[2])
+    return roll, pos
+
+
+class TripIndex:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.db_path, timeout=5.0)
+        con.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    con.execute("PRAGMA journal_mode=WAL")
+                    con.executescript(_SCHEMA)
+                    cols = {r["name"] for r in con.execute("PRAGMA table_info(trips)")}
+                    if "log_indexed_bytes" not in cols:
+                        con.execute("ALTER TABLE trips ADD COLUMN log_indexed_bytes INTEGER")
+                        con.commit()
+                    if con.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                        # rollups of older versions are missing or counted State rows only: re-read every log
+                        with con:
+                            con.execute("DELETE FROM state_minutes")
+                            con.execute("UPDATE trips SET log_bytes=NULL, log_mtime=NULL, log_indexed_bytes=NULL")
+                        con.execute("PRAGMA user_version=%d" % _SCHEMA_VERSION)
+                    self._schema_ready = True
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    # ---------- writes ----------
+    def _apply(self, con, key: str, roll: _Rollup, log_path: str, replace: bool = False, indexed: int = None):
+        if replace:
+            con.execute("DELETE FROM state_minutes WHERE trip_key=?", (key,))
+            con.execute("UPDATE trips SET yawn_warnings=0, drowsy_warnings=0, state_samples=0, "
+                        "start_ts=NULL, end_ts=NULL WHERE trip_key=?", (key,))
+        try:
+            st = os.stat(log_path)
+            size, mtime = st.st_size, st.st_mtime
+        except Exception:
+            size, mtime = None, None
+        con.execute("INSERT OR IGNORE INTO trips(trip_key) VALUES (?)", (key,))
+        con.execute(
+            """UPDATE trips SET
+                 start_ts = COALESCE(start_ts, ?, ?),
+                 end_ts = COALESCE(?, end_ts),
+                 yawn_warnings = yawn_warnings + ?,
+                 drowsy_warnings = drowsy_warnings + ?,
+                 state_samples = state_samples + ?,
+                 log_dir = ?, log_file = ?, log_bytes = ?, log_mtime = ?,
+                 log_indexed_bytes = COALESCE(?, log_indexed_bytes)
+               WHERE trip_key = ?""",
+            (roll.start, roll.first, roll.end, roll.yawn, roll.drowsy, roll.samples,
+             os.path.dirname(os.path.abspath(log_path)), os.path.basename(log_path), size, mtime, indexed, key))
+        # duration: explicit end, else the latest row seen so far
+        con.execute("UPDATE trips SET duration_s = MAX(0, COALESCE(end_ts, ?) - start_ts) "
+                    "WHERE trip_key=? AND start_ts IS NOT NULL AND COALESCE(end_ts, ?) IS NOT NULL",
+                    (roll.last, key, roll.last))
+        if roll.minutes:
+            con.executemany(
+                """INSERT INTO state_minutes(trip_key, minute, attentive, yawn, drowsy) VALUES (?,?,?,?,?)
+                   ON CONFLICT(trip_key, minute) DO UPDATE SET
+                     attentive = attentive + excluded.attentive,
+                     yawn = yawn + excluded.yawn,
+                     drowsy = drowsy + excluded.drowsy""",
+                [(key, m, a, y, d) for m, (a, y, d) in roll.minutes.items()])
+
+    def record_log_rows(self, log_path: str, rows, start: int = None, end: int = None):
+        """
+        rows: iterable of [Timestamp, EventType, Details] just appended to
+        log_path, occupying bytes [start, end) of the file. When the counters
+        already cover a different offset (a sync_logs rebuild got there
+        first), only the bytes past it are counted, re-read from the file.
+        A known trip without an offset (catalog of an older version) is
+        rebuilt from the start of the file.
+        """
+        key = trip_key_for(log_path)
+        con = self._connect()
+        try:
+            with con:
+                # IMMEDIATE: read the offset and update it in one write transaction
+                con.execute("BEGIN IMMEDIATE")
+                row = indexed = None
+                if end is not None:
+                    row = con.execute("SELECT log_indexed_bytes FROM trips WHERE trip_key=?", (key,)).fetchone()
+                    indexed = row["log_indexed_bytes"] if row is not None else None
+                if row is not None and indexed is None:
+                    roll, indexed = _roll_file(log_path, 0, end)
+                    self._apply(con, key, roll, log_path, replace=True, indexed=indexed)
+                    return
+                if end is None or indexed is None or indexed == start:
+                    roll = _Rollup()
+                    for r in rows:
+                        if len(r) >= 3:
+                            roll.add(str(r[0]), str(r[1]), str(r[2]))
+                    indexed = end
+                elif indexed >= end:
+                    return
+                else:
+                    roll, indexed = _roll_file(log_path, indexed, end)
+                self._apply(con, key, roll, log_path, indexed=indexed)
+        finally:
+            con.close()
+
+    def record_report(self, report_path: str, log_path: Optional[str] = None, yawn_warnings: int = None,
+                      drowsy_warnings: int = None, duration_s: float = None, safety_score: int = None):
+        key = trip_key_for(log_path or report_path)
+        try:
+            st = os.stat(report_path)
+            size, mtime = st.st_size, st.st_mtime
+        except Exception:
+            size, mtime = None, None
+        con = self._connect()
+        try:
+            with con:
+                con.execute("INSERT OR IGNORE INTO trips(trip_key) VALUES (?)", (key,))
+                con.execute(
+                    """UPDATE trips SET report_dir=?, report_file=?, report_bytes=?, report_mtime=?,
+                         yawn_warnings = COALESCE(?, yawn_warnings),
+                         drowsy_warnings = COALESCE(?, drowsy_warnings),
+                         duration_s = COALESCE(?, duration_s),
+                         safety_score = COALESCE(?, safety_score)
+                       WHERE trip_key=?""",
+                    (os.path.dirname(os.path.abspath(report_path)), os.path.basename(report_path), size, mtime,
+                     yawn_warnings, drowsy_warnings, duration_s, safety_score, key))
+        finally:
+            con.close()
+
+    def forget(self, path: str):
+        """Drop a deleted log or report from the catalog (the trip row goes when both are gone)."""
+        d, f = os.path.dirname(os.path.abspath(path)), os.path.basename(path)
+        con = self._connect()
+        try:
+            with con:
+                con.execute("UPDATE trips SET log_dir=NULL, log_file=NULL, log_bytes=NULL, log_mtime=NULL "
+                            "WHERE log_dir=? AND log_file=?", (d, f))
+                con.execute("UPDATE trips SET report_dir=NULL, report_file=NULL, report_bytes=NULL, report_mtime=NULL "
+                            "WHERE report_dir=? AND report_file=?", (d, f))
+                con.execute("DELETE FROM state_minutes WHERE trip_key IN "
+                            "(SELECT trip_key FROM trips WHERE log_file IS NULL)")
+                con.execute("DELETE FROM trips WHERE log_file IS NULL AND report_file IS NULL")
+        finally:
+            con.close()
+
+    # ---------- backfill ----------
+    def _scan(self, directory: str, ext: str):
+        out = {}
+        try:
+            with os.scandir(directory) as it:
+                for e in it:
+                    if e.is_file() and e.name.lower().endswith(ext):
+                        st = e.stat()
+                        out[e.name] = (st.st_size, st.st_mtime)
+        except Exception:
+            pass
+        return out
+
+    def sync_logs(self, log_dir: str) -> int:
+        """Index CSV logs that are new or changed on disk; returns how many were (re)read."""
+        log_dir = os.path.abspath(log_dir)
+        on_disk = self._scan(log_dir, ".csv")
+        con = self._connect()
+        changed = 0
+        try:
+            known = {r["log_file"]: (r["log_bytes"], r["log_mtime"])
+                     for r in con.execute("SELECT log_file, log_bytes, log_mtime FROM trips WHERE log_dir=?", (log_dir,))}
+            with con:
+                for name in set(known) - set(on_disk):
+                    con.execute("UPDATE trips SET log_dir=NULL, log_file=NULL, log_bytes=NULL, log_mtime=NULL "
+                                "WHERE log_dir=? AND log_file=?", (log_dir, name))
+                con.execute("DELETE FROM state_minutes WHERE trip_key IN (SELECT trip_key FROM trips WHERE log_file IS NULL)")
+                con.execute("DELETE FROM trips WHERE log_file IS NULL AND report_file IS NULL")
+            for name, (size, mtime) in on_disk.items():
+                if known.get(name) == (size, mtime):
+                    continue
+                path = os.path.join(log_dir, name)
+                try:
+                    roll, indexed = _roll_file(path)
+                except Exception:
+                    continue
+                with con:
+                    # serialized with the live writer's record_log_rows through the write lock
+                    con.execute("BEGIN IMMEDIATE")
+                    self._apply(con, trip_key_for(name), roll, path, replace=True, indexed=indexed)
+                changed += 1
+        finally:
+            con.close()
+        return changed
+
+    def sync_reports(self, report_dir: str) -> int:
+        """Index report files that are new or changed on disk; returns how many were (re)read."""
+        report_dir = os.path.abspath(report_dir)
+        on_disk = self._scan(report_dir, ".txt")
+        con = self._connect()
+        try:
+            known = {r["report_file"]: (r["report_bytes"], r["report_mtime"])
+                     for r in con.execute("SELECT report_file, report_bytes, report_mtime FROM trips WHERE report_dir=?",
+                                          (report_dir,))}
+            with con:
+                for name in set(known) - set(on_disk):
+                    con.execute("UPDATE trips SET report_dir=NULL, report_file=NULL, report_bytes=NULL, report_mtime=NULL "
+                                "WHERE report_dir=? AND report_file=?", (report_dir, name))
+                con.execute("DELETE FROM trips WHERE log_file IS NULL AND report_file IS NULL")
+        finally:
+            con.close()
+        changed = 0
+        for name, meta in on_disk.items():
+            if known.get(name) == meta:
+                continue
+            summary = parse_report_summary(os.path.join(report_dir, name))
+            self.record_report(os.path.join(report_dir, name), **summary)
+            changed += 1
+        return changed
+
+    # ---------- queries ----------
+    def _query(self, sql: str, args=()):
+        con = self._connect()
+        try:
+            return [dict(r) for r in con.execute(sql, args)]
+        finally:
+            con.close()
+
+    def list_logs(self, log_dir: str) -> List[str]:
+        """Log file names in log_dir, newest first (same order as file_utils.list_log_files)."""
+        rows = self._query("SELECT log_file FROM trips WHERE log_dir=? ORDER BY log_file DESC",
+                           (os.path.abspath(log_dir),))
+        return [r["log_file"] for r in rows]
+
+    def list_reports(self, report_dir: str, limit: int = None, offset: int = 0) -> List[dict]:
+        """Trip rows that have a report in report_dir, newest first (optionally one page of them)."""
+        sql = "SELECT * FROM trips WHERE report_dir=? ORDER BY report_file DESC"
+        if limit is not None:
+            sql += " LIMIT %d OFFSET %d" % (int(limit), max(0, int(offset)))
+        return self._query(sql, (os.path.abspath(report_dir),))
+
+    def count_reports(self, report_dir: str) -> int:
+        rows = self._query("SELECT COUNT(*) AS n FROM trips WHERE report_dir=?", (os.path.abspath(report_dir),))
+        return int(rows[0]["n"]) if rows else 0
+
+    def trips(self, since: int = None, until: int = None, min_drowsy: int = None, limit: int = None) -> List[dict]:
+        """Trips filtered by start time (wall seconds) and drowsy warning count, newest first."""
+        where, args = [], []
+        if since is not None:
+            where.append("start_ts >= ?"); args.append(int(since))
+        if until is not None:
+            where.append("start_ts < ?"); args.append(int(until))
+        if min_drowsy is not None:
+            where.append("drowsy_warnings >= ?"); args.append(int(min_drowsy))
+        sql = "SELECT * FROM trips" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY start_ts DESC"
+        if limit:
+            sql += " LIMIT %d" % int(limit)
+        return self._query(sql, args)
+
+    def minute_rollups(self, log_dir: str, log_files: Optional[List[str]] = None) -> List[dict]:
+        """Per-minute Attentive/Yawn/Drowsy counts summed over the given logs (all logs if None)."""
+        sql = ("SELECT m.minute AS minute, SUM(m.attentive) AS attentive, SUM(m.yawn) AS yawn, SUM(m.drowsy) AS drowsy "
+               "FROM state_minutes m JOIN trips t ON t.trip_key = m.trip_key WHERE t.log_dir=?")
+        args = [os.path.abspath(log_dir)]
+        if log_files is not None:
+            if not log_files:
+                return []
+            sql += " AND t.log_file IN (%s)" % ",".join("?" * len(log_files))
+            args += list(log_files)
+        sql += " GROUP BY m.minute ORDER BY m.minute"
+        return self._query(sql, args)
+
+    def logs_current(self, log_dir: str, log_files: List[str]) -> bool:
+        """True when every given log is indexed up to its current size and mtime on disk."""
+        log_dir = os.path.abspath(log_dir)
+        known = {r["log_file"]: (r["log_bytes"], r["log_mtime"])
+                 for r in self._query("SELECT log_file, log_bytes, log_mtime FROM trips "
+                                      "WHERE log_dir=? AND log_indexed_bytes IS NOT NULL", (log_dir,))}
+        for name in log_files:
+            try:
+                st = os.stat(os.path.join(log_dir, name))
+            except OSError:
+                return False
+            if known.get(name) != (st.st_size, st.st_mtime):
+                return False
+        return True
+
+
+_REPORT_FIELDS = {
+    "duration_s": (re.compile(r"Total Drive Time:\s*([\d.]+)\s*minutes"), lambda v: float(v) * 60.0),
+    "safety_score": (re.compile(r"Safety Score:\s*(\d+)"), int),
+    "yawn_warnings": (re.compile(r"Yawn Warnings:\s*(\d+)"), int),
+    "drowsy_warnings": (re.compile(r"Drowsy Warnings:\s*(\d+)"), int),
+}
+
+
+def parse_report_summary(path: str) -> dict:
+    """Summary numbers from the header of a generated trip report."""
+    out = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fh:
+            head = fh.read(4096)
+    except Exception:
+        return out
+    for field, (rx, conv) in _REPORT_FIELDS.items():
+        m = rx.search(head)
+        if m:
+            try:
+                out[field] = conv(m.group(1))
+            except Exception:
+                pass
+    return out
+
+
+_index = None
+_index_lock = threading.Lock()
+_synced = set()
+_synced_lock = threading.Lock()   # ensure_synced also runs on sync_in_background threads
+
+
+def get_index() -> Optional[TripIndex]:
+    """Shared index at config.TRIP_INDEX_DB, or None when disabled/unavailable."""
+    global _index
+    if not getattr(config, "TRIP_INDEX_ENABLED", True):
+        return None
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = TripIndex(getattr(config, "TRIP_INDEX_DB", os.path.join(config.SCRIPT_DIR, "trip_index.sqlite3")))
+            except Exception:
+                return None
+        return _index
+
+
+def ensure_synced(log_dir: str = None, report_dir: str = None, force: bool = False) -> Optional[TripIndex]:
+    """Backfill the index from disk once per directory and process (or again with force=True)."""
+    idx = get_index()
+    if idx is None:
+        return None
+    try:
+        for kind, d in (("log", log_dir), ("report", report_dir)):
+            if not d:
+                continue
+            with _synced_lock:
+                if not force and (kind, d) in _synced:
+                    continue
+            if kind == "log":
+                idx.sync_logs(d)
+            else:
+                idx.sync_reports(d)
+            with _synced_lock:
+                _synced.add((kind, d))
+    except Exception:
+        return None
+    return idx
+
+
+def indexed_log_files(log_dir: str, force: bool = False) -> List[str]:
+    """Log file names from the index; falls back to listing the directory."""
+    idx = ensure_synced(log_dir=log_dir, force=force)
+    if idx is not None:
+        try:
+            return idx.list_logs(log_dir)
+        except Exception:
+            pass
+    from utils.file_utils import list_log_files
+    return list_log_files(log_dir)
+
+
+def indexed_reports(report_dir: str, force: bool = False) -> List[dict]:
+    """Report rows (report_file, report_mtime, counters...) from the index; falls back to the directory."""
+    idx = ensure_synced(report_dir=report_dir, force=force)
+    if idx is not None:
+        try:
+            return idx.list_reports(report_dir)
+        except Exception:
+            pass
+    from utils.file_utils import list_report_files
+    rows = []
+    for f in list_report_files(report_dir):
+        try:
+            mtime = os.path.getmtime(os.path.join(report_dir, f))
+        except Exception:
+            mtime = None
+        rows.append({"report_file": f, "report_mtime": mtime})
+    return rows
+
+
+def sync_in_background(log_dir: str = None, report_dir: str = None, force: bool = False) -> threading.Thread:
+    """ensure_synced on a daemon thread; poll is_alive() from the UI (views render from the index meanwhile)."""
+    t = threading.Thread(target=ensure_synced, args=(log_dir, report_dir, force), name="TripIndexSync", daemon=True)
+    t.start()
+    return t
+
+
+def report_count(report_dir: str) -> int:
+    """Number of reports in the index (no directory scan); falls back to the directory."""
+    idx = get_index()
+    if idx is not None:
+        try:
+            return idx.count_reports(report_dir)
+        except Exception:
+            pass
+    from utils.file_utils import list_report_files
+    return len(list_report_files(report_dir))
+
+
+def report_window(report_dir: str, offset: int, limit: int) -> List[dict]:
+    """One page of report rows, newest first, straight from the index (no sync)."""
+    idx = get_index()
+    if idx is not None:
+        try:
+            return idx.list_reports(report_dir, limit=limit, offset=offset)
+        except Exception:
+            pass
+    from utils.file_utils import list_report_files
+    rows = []
+    for f in list_report_files(report_dir)[max(0, offset):max(0, offset) + limit]:
+        try:
+            mtime = os.path.getmtime(os.path.join(report_dir, f))
+        except Exception:
+            mtime = None
+        rows.append({"report_file": f, "report_mtime": mtime})
+    return rows
+
+
+def fresh_minute_rollups(log_dir: str, log_files: List[str]) -> Optional[List[dict]]:
+    """
+    minute_rollups for the given logs, or None when the index is unavailable
+    or lags behind any of them on disk (the caller then parses the logs).
+    """
+    idx = get_index()
+    if idx is None:
+        return None
+    try:
+        if not idx.logs_current(log_dir, log_files):
+            return None
+        return idx.minute_rollups(log_dir, log_files)
+    except Exception:
+        return None
+
+
+def forget_file(path: str):
+    idx = get_index()
+    if idx is not None:
+        try:
+            idx.forget(path)
+        except Exception:
+            pass